@@ -3,6 +3,9 @@ import pandas as pd
 import plotly.graph_objs as go
 from PIL import Image
 import os
+from grille import afficher_grille
+from moteur_alertes import calculer_alertes_projets, calculer_historique_alertes, detecter_transitions, etat_alertes_projet, formater_alertes, nom_colonne_regle
+from regles_alertes import charger_regles, style_regle
 
 # Les noms des projets
 projets = {
@@ -72,29 +75,12 @@ styles = """
 """
 st.markdown(styles, unsafe_allow_html=True)
 
-# Fonction pour déterminer le niveau d'alerte en fonction du nombre d'indices
-def determiner_niveau_alerte(compte):
-    if compte < 3:
-        return "Tout va bien"
-    elif 3 <= compte <= 6:
-        return "Attention ! Des indices à surveiller"
-    else:
-        return "Alerte !!! Trop d’indice à haut risque !!!"
-
 # Fonction pour créer un graphique circulaire à partir des données
-def create_pie_chart(data, column, title):
+def create_pie_chart(data, column, title, color_map):
     labels = data[column].value_counts().index.tolist()
     values = data[column].value_counts().values.tolist()
 
-    color_map = {
-        "Tout va bien": "lightgreen",
-        "Attention ! Des indices à surveiller": "yellow",
-        "Alerte !!! Trop d’indice à haut risque !!!": "red",
-        "Tout va bien !": "lightgreen",
-        "Attention ! Des indices à surveiller !": "orange"
-    }
-
-    colors = [color_map[label] for label in labels]
+    colors = [color_map.get(label, 'lightgrey') for label in labels]
 
     trace = go.Pie(labels=labels, values=values, hole=0.3,
                    marker=dict(colors=colors),
@@ -126,6 +112,7 @@ st.markdown("""
         <li><span class='lightgreen'>Tout va bien ! (vert)</span> : Les deux premiers indices les plus fréquents représentent 80% ou plus du total des indices, indiquant une bonne maîtrise des révisions.</li>
         <li><span class='orange'>Attention (orange)</span> : Signalant une dispersion des révisions et nécessitant une surveillance.</li>
     </ul>
+    <p>Des règles complémentaires (visas en retard, groupes sans dépôt récent, pics de dépôt inhabituels) et les seuils de chaque règle sont définis dans le fichier regles_alertes.json.</p>
     <p>Établir des indicateurs pour surveiller et prévenir les risques liés aux indices.</p>
     """, unsafe_allow_html=True)
 
@@ -137,94 +124,113 @@ with col1:
 with col2:
     selected_file_path = st.selectbox("Projet", list(projets.keys()))
 
-# Fonction pour charger les données depuis un fichier
-def charger_donnees(chemin_fichier):
-    spec_types = {
-        'Date dépôt GED': str,
-        'TYPE DE DOCUMENT': str,
-        'PROJET': str,
-        'EMET': str,
-        'LOT': str,
-        'INDICE': str,
-        'Libellé du document': str
-    }
-    donnees = pd.read_csv(chemin_fichier, encoding='iso-8859-1', sep=';', dtype=spec_types, low_memory=False)
-    donnees['Date dépôt GED'] = pd.to_datetime(donnees['Date dépôt GED'], format='%d/%m/%Y', errors='coerce')
-    return donnees
-
-# Charger les données du fichier sélectionné
-df = charger_donnees(projets[selected_file_path])
-
-# Calcul des indices et alertes
+# Règles d'alerte (seuils, niveaux et couleurs définis dans regles_alertes.json)
+regles = charger_regles()
+with st.expander("Règles d'alerte actives"):
+    st.dataframe(pd.DataFrame({
+        'Règle': [regle['nom'] for regle in regles],
+        'Métrique': [regle['metrique'] for regle in regles],
+        'Sens': ['valeur élevée défavorable' if regle['croissant'] else 'valeur faible défavorable' for regle in regles],
+        'Seuils': [', '.join(f'{seuil:g}' for seuil in regle['seuils']) for regle in regles],
+        'Surcharges': [len(regle['surcharges']) for regle in regles]
+    }))
+
+# Calcul des alertes pour tous les projets et tous les regroupements (mis en cache), mise en forme du projet sélectionné
 group_column = 'LOT' if onglet == "Par LOT" else 'TYPE DE DOCUMENT'
-total_indices = df.groupby(group_column).size().rename(f"Total Indices par {group_column}")
-indices_groupes = df.groupby([group_column, 'INDICE']).size().reset_index(name="Nombre de documents")
-indices_groupes = indices_groupes.merge(total_indices, on=group_column)
-indices_groupes['Proportion'] = (indices_groupes['Nombre de documents'] / indices_groupes[f"Total Indices par {group_column}"] * 100).round(2)
-
-top_deux_indices = indices_groupes.sort_values(by=[group_column, 'Proportion'], ascending=[True, False]).groupby(group_column).head(2)
-somme_proportions_top_deux = top_deux_indices.groupby(group_column)['Proportion'].sum().reset_index(name='Somme des deux principales proportions')
-somme_proportions_top_deux['Somme des deux principales proportions'] = somme_proportions_top_deux['Somme des deux principales proportions'].round(0).astype(int).astype(str) + '%'
-
-indices_uniques = df.groupby(group_column)['INDICE'].nunique().reset_index(name='Compteur Indice')
-dernier_indice = df.sort_values(by=[group_column, 'INDICE'], ascending=[True, False]).drop_duplicates(subset=group_column, keep='first')[[group_column, 'INDICE']].rename(columns={'INDICE': 'Dernier Indice'})
-
-donnees_finales = somme_proportions_top_deux.merge(indices_uniques, on=group_column)
-donnees_finales = donnees_finales.merge(dernier_indice, on=group_column)
-donnees_finales['Alerte 1 : nbre d\'indices'] = donnees_finales['Compteur Indice'].apply(determiner_niveau_alerte)
-donnees_finales['Alerte 2: Frequence d\'indices'] = donnees_finales['Somme des deux principales proportions'].apply(lambda x: "Tout va bien !" if x[:-1].isdigit() and int(x[:-1]) >= 80 else "Attention ! Des indices à surveiller")
-
-# Abréger ou faire un saut de ligne pour les longues chaînes
-donnees_finales['Somme des deux principales proportions'] = donnees_finales['Somme des deux principales proportions'].apply(lambda x: x.replace(' ', '\n'))
-
-colonnes_ordonnees = [group_column, 'Compteur Indice', 'Dernier Indice', 'Alerte 1 : nbre d\'indices', 'Somme des deux principales proportions', 'Alerte 2: Frequence d\'indices']
-donnees_finales = donnees_finales[colonnes_ordonnees]
-
-# Fonctions pour colorer les cellules en fonction des alertes
-def color_alerte(val):
-    if val == "Tout va bien":
-        color = 'lightgreen'
-    elif val == "Attention ! Des indices à surveiller":
-        color = 'yellow'
-    else:
-        color = 'red'
-    return f'background-color: {color}'
-
-def color_alerte2(val):
-    if val == "Tout va bien !":
-        color = 'lightgreen'
-    else:
-        color = 'orange'
-    return f'background-color: {color}'
+alertes = calculer_alertes_projets(projets, regles)
+donnees_finales = formater_alertes(alertes, selected_file_path, group_column, regles)
+nb_nouveaux, nb_groupes = etat_alertes_projet(selected_file_path)['derniere_actualisation']
+st.caption(f"Dernière actualisation de l'export : {nb_nouveaux} nouveaux dépôts intégrés, {nb_groupes} groupes reclassés")
 
 # Recherche par lots et alertes
 st.markdown("<div class='subheader section'>Recherche</div>", unsafe_allow_html=True)
-col3, col4, col5 = st.columns([1, 1, 1])
-with col3:
+colonnes_recherche = st.columns(len(regles) + 1)
+with colonnes_recherche[0]:
     search_value = st.selectbox(f"Rechercher par {group_column}...", ["Tous"] + list(donnees_finales[group_column].unique()))
-with col4:
-    search_value_alert = st.selectbox("Rechercher par Alerte 1...", ["Tous"] + list(donnees_finales['Alerte 1 : nbre d\'indices'].unique()))
-with col5:
-    search_value_alert2 = st.selectbox("Rechercher par Alerte 2...", ["Tous"] + list(donnees_finales['Alerte 2: Frequence d\'indices'].unique()))
+recherches_alertes = {}
+for colonne_recherche, regle in zip(colonnes_recherche[1:], regles):
+    with colonne_recherche:
+        recherches_alertes[regle['nom']] = st.selectbox(f"Rechercher par {regle['nom']}...", ["Tous"] + list(regle['libelles'].values()), key=f"recherche_{regle['identifiant']}")
 
 # Filtrer les données en fonction de la recherche
 df_filtered = donnees_finales.copy()
 if search_value != "Tous":
     df_filtered = df_filtered[df_filtered[group_column] == search_value]
-if search_value_alert != "Tous":
-    df_filtered = df_filtered[df_filtered['Alerte 1 : nbre d\'indices'] == search_value_alert]
-if search_value_alert2 != "Tous":
-    df_filtered = df_filtered[df_filtered['Alerte 2: Frequence d\'indices'] == search_value_alert2]
+for nom_regle, valeur in recherches_alertes.items():
+    if valeur != "Tous":
+        df_filtered = df_filtered[df_filtered[nom_regle] == valeur]
 
 # Afficher le tableau des données filtrées
 def display_table(dataframe):
-    styled_dataframe = dataframe.style.applymap(color_alerte, subset=['Alerte 1 : nbre d\'indices']).applymap(color_alerte2, subset=['Alerte 2: Frequence d\'indices'])
-    st.dataframe(styled_dataframe, height=600)
-
-    col6, col7 = st.columns(2)
-    with col6:
-        st.plotly_chart(create_pie_chart(dataframe, 'Alerte 1 : nbre d\'indices', 'Alerte 1'), use_container_width=True)
-    with col7:
-        st.plotly_chart(create_pie_chart(dataframe, 'Alerte 2: Frequence d\'indices', 'Alerte 2'), use_container_width=True)
+    # Le style n'est appliqué qu'à la page affichée par la grille
+    def styler_page(page):
+        style = page.style
+        for regle in regles:
+            style = style.applymap(style_regle(regle), subset=[nom_colonne_regle(regle)])
+        return style
+    afficher_grille(dataframe, cle='alertes', style=styler_page, hauteur=600)
+
+    # Un graphique circulaire par règle, deux par ligne
+    for debut in range(0, len(regles), 2):
+        for colonne_graphique, regle in zip(st.columns(2), regles[debut:debut + 2]):
+            with colonne_graphique:
+                st.plotly_chart(create_pie_chart(dataframe, nom_colonne_regle(regle), regle['nom'].split(':')[0].strip(), regle['couleurs']), use_container_width=True)
 
 display_table(df_filtered)
+
+# Historique des alertes : niveau de chaque groupe semaine par semaine et passages d'un niveau à l'autre
+def display_history(projet, group_column):
+    st.markdown("<div class='subheader section'>Historique des alertes</div>", unsafe_allow_html=True)
+    if not os.path.exists(projets[projet]):
+        st.write("Pas d'export disponible pour ce projet.")
+        return
+    historique = calculer_historique_alertes(projet, projets[projet], regles)
+    historique = historique[historique['Regroupement'] == group_column]
+    # Seules les règles dont la métrique est renseignée dans l'historique sont proposées
+    regles_historique = {regle['nom']: regle for regle in regles if regle['metrique'] in historique.columns and historique[regle['metrique']].notna().any()}
+    if not regles_historique:
+        st.write("Pas d'historique d'alerte pour ce regroupement.")
+        return
+
+    col8, col9 = st.columns([1, 2])
+    with col8:
+        alerte_historique = st.selectbox("Alerte", list(regles_historique), key='historique_alerte')
+    regle = regles_historique[alerte_historique]
+    colonne_niveau, libelles = regle['colonne'], regle['libelles']
+    transitions = detecter_transitions(historique, colonne_niveau)
+
+    # Par défaut, les groupes ayant changé de niveau
+    groupes_modifies = list(transitions['Groupe'].unique())
+    with col9:
+        groupes = st.multiselect(f"{group_column} à afficher", list(historique['Groupe'].unique()), default=groupes_modifies[:10], key='historique_groupes')
+    if not groupes:
+        st.write("Sélectionnez au moins un groupe pour afficher la chronologie.")
+        return
+
+    fig = go.Figure()
+    for groupe in groupes:
+        serie = historique[historique['Groupe'] == groupe]
+        fig.add_trace(go.Scatter(x=serie['Semaine'], y=serie[colonne_niveau], mode='lines', line_shape='hv', name=str(groupe)))
+    passages = transitions[transitions['Groupe'].isin(groupes)]
+    fig.add_trace(go.Scatter(
+        x=passages['Semaine'], y=passages[colonne_niveau], mode='markers', name='Changement de niveau',
+        marker=dict(size=10, color='black', symbol='diamond'), text=passages['Groupe'].astype(str),
+        hovertemplate='%{text}<br>%{x|%d %b %Y}<extra></extra>'
+    ))
+    fig.update_layout(
+        title=f"Chronologie de l'{alerte_historique.split(':')[0].strip().lower()} par {group_column}",
+        xaxis_title='Semaine',
+        yaxis=dict(title='Niveau', tickmode='array', tickvals=list(libelles.keys()), ticktext=list(libelles.values())),
+        height=500
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    tableau_transitions = pd.DataFrame({
+        group_column: passages['Groupe'].to_numpy(),
+        'Semaine': passages['Semaine'].dt.strftime('%d/%m/%Y').to_numpy(),
+        'Niveau précédent': passages['Niveau précédent'].map(libelles).to_numpy(),
+        'Nouveau niveau': passages[colonne_niveau].map(libelles).to_numpy()
+    })
+    afficher_grille(tableau_transitions, cle='historique_transitions')
+
+display_history(selected_file_path, group_column)
@@ -1,6 +1,8 @@
 import streamlit as st
-import pandas as pd
 import plotly.graph_objs as go
+from grille import afficher_grille
+from moteur_alertes import calculer_alertes_projets, etat_alertes_projet, formater_alertes
+from regles_alertes import charger_regles, style_regle
 
 # Les noms des projets
 projets = {
@@ -69,29 +71,12 @@ styles = """
 """
 st.markdown(styles, unsafe_allow_html=True)
 
-# Fonction pour déterminer le niveau d'alerte en fonction du nombre d'indices
-def determiner_niveau_alerte(compte):
-    if compte < 3:
-        return "Tout va bien"
-    elif 3 <= compte <= 6:
-        return "Attention ! Des indices à surveiller"
-    else:
-        return "Alerte !!! Trop d’indice à haut risque !!!"
-
 # Fonction pour créer un graphique circulaire à partir des données
-def create_pie_chart(data, column, title):
+def create_pie_chart(data, column, title, color_map):
     labels = data[column].value_counts().index.tolist()
     values = data[column].value_counts().values.tolist()
 
-    color_map = {
-        "Tout va bien": "lightgreen",
-        "Attention ! Des indices à surveiller": "yellow",
-        "Alerte !!! Trop d’indice à haut risque !!!": "red",
-        "Tout va bien !": "lightgreen",
-        "Attention ! Des indices à surveiller !": "orange"
-    }
-
-    colors = [color_map[label] for label in labels]
+    colors = [color_map.get(label, 'lightgrey') for label in labels]
 
     trace = go.Pie(labels=labels, values=values, hole=0.3,
                    marker=dict(colors=colors),
@@ -130,65 +115,30 @@ def display_table(dataframe):
     if search_value_alert2:
         dataframe = dataframe[dataframe['Alerte 2'].str.contains(search_value_alert2, case=False)]
 
-    styled_dataframe = dataframe.style.applymap(color_alerte, subset=['Alerte 1']).applymap(color_alerte2, subset=['Alerte 2'])
-    st.dataframe(styled_dataframe, height=600)
+    # Le style n'est appliqué qu'à la page affichée par la grille
+    def styler_page(page):
+        return page.style.applymap(style_regle(regles_affichees['Alerte 1']), subset=['Alerte 1']).applymap(style_regle(regles_affichees['Alerte 2']), subset=['Alerte 2'])
+    afficher_grille(dataframe, cle='alertes', style=styler_page, hauteur=600)
 
     col6, col7 = st.columns(2)
     with col6:
-        st.plotly_chart(create_pie_chart(dataframe, 'Alerte 1', 'Alerte 1'), use_container_width=True)
+        st.plotly_chart(create_pie_chart(dataframe, 'Alerte 1', 'Alerte 1', regles_affichees['Alerte 1']['couleurs']), use_container_width=True)
     with col7:
-        st.plotly_chart(create_pie_chart(dataframe, 'Alerte 2', 'Alerte 2'), use_container_width=True)
-
-def color_alerte(val):
-    if val == "Tout va bien":
-        color = 'lightgreen'
-    elif val == "Attention ! Des indices à surveiller":
-        color = 'yellow'
-    else:
-        color = 'red'
-    return f'background-color: {color}'
-
-def color_alerte2(val):
-    if val == "Tout va bien !":
-        color = 'lightgreen'
-    else:
-        color = 'orange'
-    return f'background-color: {color}'
-
-df = pd.read_csv(selected_file_path, encoding='iso-8859-1', sep=';', low_memory=False)
-
-if onglet == "Par LOT":
-    df['LOT'] = df['LOT'].astype(str)
-    if search_value:
-        df = df[df['LOT'].str.contains(search_value, case=False)]
-    group_column = 'LOT'
-elif onglet == "Par TYPE DE DOCUMENT":
-    df['TYPE DE DOCUMENT'] = df['TYPE DE DOCUMENT'].astype(str)
-    if search_value:
-        df = df[df['TYPE DE DOCUMENT'].str.contains(search_value, case=False)]
-    group_column = 'TYPE DE DOCUMENT'
-
-total_indices = df.groupby(group_column).size().rename(f"Total Indices par {group_column}")
-indices_groupes = df.groupby([group_column, 'INDICE']).size().reset_index(name="Nombre de documents")
-indices_groupes = indices_groupes.merge(total_indices, on=group_column)
-indices_groupes['Proportion'] = (indices_groupes['Nombre de documents'] / indices_groupes[f"Total Indices par {group_column}"] * 100).round(2)
-
-top_deux_indices = indices_groupes.sort_values(by=[group_column, 'Proportion'], ascending=[True, False]).groupby(group_column).head(2)
-somme_proportions_top_deux = top_deux_indices.groupby(group_column)['Proportion'].sum().reset_index(name='Somme des deux principales proportions')
-somme_proportions_top_deux['Somme des deux principales proportions'] = somme_proportions_top_deux['Somme des deux principales proportions'].round(0).astype(int).astype(str) + '%'
-
-indices_uniques = df.groupby(group_column)['INDICE'].nunique().reset_index(name='Compteur Indice')
-dernier_indice = df.sort_values(by=[group_column, 'INDICE'], ascending=[True, False]).drop_duplicates(subset=group_column, keep='first')[[group_column, 'INDICE']].rename(columns={'INDICE': 'Dernier Indice'})
-
-donnees_finales = somme_proportions_top_deux.merge(indices_uniques, on=group_column)
-donnees_finales = donnees_finales.merge(dernier_indice, on=group_column)
-donnees_finales['Alerte 1'] = donnees_finales['Compteur Indice'].apply(determiner_niveau_alerte)
-donnees_finales['Alerte 2'] = donnees_finales['Somme des deux principales proportions'].apply(lambda x: "Tout va bien !" if x[:-1].isdigit() and int(x[:-1]) >= 80 else "Attention ! Des indices à surveiller")
-
-# Abréger ou faire un saut de ligne pour les longues chaînes
-donnees_finales['Somme des deux principales proportions'] = donnees_finales['Somme des deux principales proportions'].apply(lambda x: x.replace(' ', '\n'))
-
-colonnes_ordonnees = [group_column, 'Compteur Indice', 'Dernier Indice', 'Alerte 1', 'Somme des deux principales proportions', 'Alerte 2']
-donnees_finales = donnees_finales[colonnes_ordonnees]
+        st.plotly_chart(create_pie_chart(dataframe, 'Alerte 2', 'Alerte 2', regles_affichees['Alerte 2']['couleurs']), use_container_width=True)
+
+# Cette page n'affiche que les deux règles sur les indices, sous des noms de colonnes courts
+regles = [regle for regle in charger_regles() if regle['identifiant'] in ('alerte 1', 'alerte 2')]
+noms_colonnes = {'alerte 1': 'Alerte 1', 'alerte 2': 'Alerte 2'}
+regles_affichees = {noms_colonnes[regle['identifiant']]: regle for regle in regles}
+
+# Calcul des alertes pour tous les projets et tous les regroupements (mis en cache)
+group_column = 'LOT' if onglet == "Par LOT" else 'TYPE DE DOCUMENT'
+alertes = calculer_alertes_projets(projets, regles)
+projet_selectionne = next(nom for nom, fichier in projets.items() if fichier == selected_file_path)
+donnees_finales = formater_alertes(alertes, projet_selectionne, group_column, regles, noms_colonnes)
+nb_nouveaux, nb_groupes = etat_alertes_projet(projet_selectionne)['derniere_actualisation']
+st.caption(f"Dernière actualisation de l'export : {nb_nouveaux} nouveaux dépôts intégrés, {nb_groupes} groupes reclassés")
+if search_value:
+    donnees_finales = donnees_finales[donnees_finales[group_column].astype(str).str.contains(search_value, case=False)]
 
 display_table(donnees_finales)
@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from clusters_depots import empreinte_lots
+
+# Poids du dernier jour dans les moyennes mobiles exponentielles (EWMA) du rythme de dépôt
+ALPHA = 0.1
+
+# Score au-delà duquel un jour est anormal (écart à la moyenne attendue, en unités d'échelle robuste)
+SEUIL_SCORE = 3.5
+
+# Passage de l'écart absolu moyen à un écart-type équivalent (loi normale)
+FACTEUR_ECHELLE = 1.2533
+
+# Échelle minimale, en dépôts par jour : évite de signaler un seul dépôt sur un lot habituellement silencieux
+ECHELLE_MIN = 1.0
+
+# Nombre de jours d'historique d'un groupe avant de pouvoir y signaler une anomalie
+JOURS_CHAUFFE = 14
+
+# Fenêtre (en jours) sur laquelle les anomalies récentes sont comptées pour les alertes
+FENETRE_RECENTE = 30
+
+# Clés d'une série de dépôts journaliers
+CLES_SERIE = ['Regroupement', 'Groupe']
+
+# Fonction pour compter les dépôts par groupe et par jour (seuls les jours avec dépôt sont présents)
+def compter_depots_journaliers(regroupements, groupes, jours):
+    comptes = pd.DataFrame({'Regroupement': regroupements, 'Groupe': groupes, 'Jour': jours})
+    comptes = comptes[comptes['Jour'].notna() & comptes['Groupe'].notna()]
+    comptes['Jour'] = comptes['Jour'].astype('int64')
+    return comptes.groupby(CLES_SERIE + ['Jour']).size().rename('Nombre de dépôts')
+
+# Fonction pour compléter les séries journalières par des zéros, du premier jour à scorer de chaque groupe jusqu'au dernier jour
+def completer_jours(comptes, debuts, dernier_jour):
+    longueurs = np.maximum(dernier_jour - debuts.to_numpy() + 1, 0)
+    positions = np.arange(longueurs.sum()) - np.repeat(np.cumsum(longueurs) - longueurs, longueurs)
+    dense = pd.DataFrame({
+        'Regroupement': np.repeat(debuts.index.get_level_values('Regroupement'), longueurs),
+        'Groupe': np.repeat(debuts.index.get_level_values('Groupe'), longueurs),
+        'Jour': np.repeat(debuts.to_numpy(), longueurs) + positions
+    })
+    dense['Nombre de dépôts'] = comptes.reindex(pd.MultiIndex.from_frame(dense), fill_value=0).to_numpy()
+    return dense
+
+# Fonction pour scorer des séries journalières avec une moyenne et un écart absolu moyen exponentiels
+# (les groupes présents dans 'statistiques' reprennent à leur dernier état au lieu de repartir de zéro)
+def scorer_series(dense, statistiques=None):
+    lignes = dense.assign(Fictive=False, **{'Jours initiaux': 0})
+    if statistiques is not None and not statistiques.empty:
+        # Une ligne fictive par groupe repris porte son dernier état : les EWMA continuent exactement où elles s'étaient arrêtées
+        fictives = statistiques.reset_index().rename(columns={'Dernier jour': 'Jour', 'Moyenne': 'Nombre de dépôts', 'Jours vus': 'Jours initiaux'})
+        lignes = pd.concat([fictives.assign(Fictive=True), lignes], ignore_index=True)
+    lignes = lignes.sort_values(CLES_SERIE + ['Jour', 'Fictive'], ascending=[True, True, True, False], kind='mergesort').reset_index(drop=True)
+    code = lignes.groupby(CLES_SERIE, sort=False).ngroup().to_numpy()
+    nouveau_groupe = np.diff(code, prepend=-1) != 0
+    fictive = lignes['Fictive'].to_numpy(dtype=bool)
+
+    valeurs = lignes['Nombre de dépôts'].to_numpy(dtype=float)
+    moyenne = pd.Series(valeurs).groupby(code).ewm(alpha=ALPHA, adjust=False).mean().to_numpy()
+    moyenne_prevue = np.where(nouveau_groupe, np.nan, np.r_[np.nan, moyenne[:-1]])
+
+    # Écart absolu à la moyenne attendue, suivi lui aussi en EWMA (la ligne fictive porte l'écart déjà accumulé)
+    ecart = np.abs(valeurs - moyenne_prevue)
+    if fictive.any():
+        ecart[fictive] = lignes.loc[fictive, 'Ecart'].to_numpy()
+    ecart_moyen = pd.Series(ecart).groupby(code).ewm(alpha=ALPHA, adjust=False).mean().to_numpy()
+    ecart_prevu = np.where(nouveau_groupe, np.nan, np.r_[np.nan, ecart_moyen[:-1]])
+
+    echelle = np.maximum(FACTEUR_ECHELLE * np.nan_to_num(ecart_prevu, nan=0.0), ECHELLE_MIN)
+    score = (valeurs - moyenne_prevue) / echelle
+    jours_vus = pd.Series(lignes['Jours initiaux'].to_numpy() + ~fictive).groupby(code).cumsum().to_numpy()
+    lignes = lignes.assign(**{
+        'Moyenne attendue': moyenne_prevue,
+        'Echelle': echelle,
+        'Score': score,
+        'Anomalie': (score > SEUIL_SCORE) & (jours_vus > JOURS_CHAUFFE) & (valeurs > 0),
+        'Moyenne': moyenne,
+        'Ecart': ecart_moyen,
+        'Jours vus': jours_vus
+    })
+
+    # Dernier état de chaque groupe, pour reprendre au prochain export
+    derniers = lignes[np.diff(code, append=-1) != 0]
+    statistiques = derniers.set_index(CLES_SERIE)[['Jour', 'Moyenne', 'Ecart', 'Jours vus']].rename(columns={'Jour': 'Dernier jour'})
+    scores = lignes.loc[~fictive, CLES_SERIE + ['Jour', 'Nombre de dépôts', 'Moyenne attendue', 'Echelle', 'Score', 'Anomalie']]
+    return scores.reset_index(drop=True), statistiques
+
+# Fonction pour scorer entièrement des séries de dépôts comptées par jour
+def detecter_anomalies_comptes(comptes, dernier_jour=None):
+    if comptes.empty:
+        return scorer_series(completer_jours(comptes, pd.Series(dtype='int64', index=pd.MultiIndex.from_tuples([], names=CLES_SERIE)), 0))
+    dernier_jour = comptes.index.get_level_values('Jour').max() if dernier_jour is None else dernier_jour
+    debuts = comptes.reset_index().groupby(CLES_SERIE)['Jour'].min()
+    return scorer_series(completer_jours(comptes, debuts, dernier_jour))
+
+# Fonction pour créer l'état vide du détecteur d'anomalies d'un projet
+def creer_etat_anomalies():
+    scores, statistiques = detecter_anomalies_comptes(pd.Series(dtype='int64', index=pd.MultiIndex.from_tuples([], names=CLES_SERIE + ['Jour'])))
+    return {'comptes': pd.Series(dtype='int64', index=pd.MultiIndex.from_tuples([], names=CLES_SERIE + ['Jour'])),
+            'statistiques': statistiques, 'anomalies': scores, 'dernier_jour': None}
+
+# Fonction pour intégrer de nouveaux comptes journaliers : les groupes dont seuls des jours postérieurs à leur dernier état
+# ont changé reprennent leurs EWMA, les autres (dépôt antidaté, dépôt retiré) sont rescorés depuis leur premier jour
+def integrer_comptes(etat, comptes):
+    if comptes.empty:
+        etat.update(creer_etat_anomalies())
+        return []
+    dernier_jour = int(comptes.index.get_level_values('Jour').max())
+    if etat['dernier_jour'] is not None and dernier_jour < etat['dernier_jour']:
+        etat.update(creer_etat_anomalies())
+
+    differences = comptes.sub(etat['comptes'], fill_value=0)
+    changes = differences[differences != 0].reset_index().groupby(CLES_SERIE)['Jour'].min()
+    debuts = comptes.reset_index().groupby(CLES_SERIE)['Jour'].min()
+    statistiques = etat['statistiques'].reindex(debuts.index)
+    prolonges = statistiques['Dernier jour'] < dernier_jour
+    # Un groupe est repris s'il a un état et qu'aucun jour déjà scoré n'a changé
+    repris = statistiques['Dernier jour'].notna() & ~(changes.reindex(debuts.index) <= statistiques['Dernier jour'])
+    a_rescorer = ~repris
+    a_reprendre = repris & prolonges
+
+    debuts_calcul = pd.concat([
+        debuts[a_rescorer],
+        (statistiques.loc[a_reprendre, 'Dernier jour'] + 1).astype('int64')
+    ])
+    groupes_touches = debuts_calcul.index
+    scores, nouvelles_statistiques = scorer_series(
+        completer_jours(comptes, debuts_calcul, dernier_jour),
+        etat['statistiques'].loc[statistiques.index[a_reprendre]]
+    )
+
+    # Seules les anomalies sont conservées : ce sont elles qui alimentent les alertes
+    anomalies = etat['anomalies']
+    cles_anomalies = pd.MultiIndex.from_frame(anomalies[CLES_SERIE])
+    rescores = cles_anomalies.isin(debuts[a_rescorer].index) | ~cles_anomalies.isin(debuts.index)
+    etat['anomalies'] = pd.concat([anomalies[~rescores], scores[scores['Anomalie']]], ignore_index=True)
+    etat['statistiques'] = pd.concat([etat['statistiques'].drop(groupes_touches, errors='ignore'), nouvelles_statistiques]).reindex(debuts.index)
+    etat['comptes'] = comptes
+    etat['dernier_jour'] = dernier_jour
+    return list(groupes_touches)
+
+# Fonction pour résumer les anomalies récentes de chaque groupe (nombre de jours anormaux dans la fenêtre, dernière anomalie)
+def resumer_anomalies(etat, projet):
+    anomalies = etat['anomalies']
+    if etat['dernier_jour'] is not None:
+        anomalies = anomalies[anomalies['Jour'] > etat['dernier_jour'] - FENETRE_RECENTE]
+    resume = anomalies.groupby(CLES_SERIE).agg(**{
+        'Jours de dépôt anormaux': ('Jour', 'size'),
+        'Dernière anomalie': ('Jour', 'max')
+    }).reindex(etat['statistiques'].index)
+    resume['Jours de dépôt anormaux'] = resume['Jours de dépôt anormaux'].fillna(0).astype('int64')
+    resume = resume.reset_index()
+    resume.insert(0, 'Projet', projet)
+    return resume
+
+# Fonction pour scorer les lots d'un jeu de données (mis en cache par empreinte des dépôts, les données ne sont pas hachées)
+@st.cache_data(show_spinner=False)
+def _detecter_anomalies_lots(empreinte, _donnees, colonne_lot, colonne_date):
+    jours = (_donnees[colonne_date] - pd.Timestamp('1970-01-01')).dt.days
+    comptes = compter_depots_journaliers(colonne_lot, _donnees[colonne_lot].to_numpy(), jours.to_numpy())
+    return detecter_anomalies_comptes(comptes)[0]
+
+# Fonction pour obtenir les séries journalières scorées de chaque lot d'un jeu de données
+def detecter_anomalies_lots(donnees, colonne_lot='LOT', colonne_date='Date dépôt GED'):
+    return _detecter_anomalies_lots(empreinte_lots(donnees, colonne_lot, colonne_date), donnees, colonne_lot, colonne_date)
@@ -0,0 +1,285 @@
+import argparse
+import hashlib
+import json
+import os
+import secrets
+import shutil
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlparse
+import pandas as pd
+import pyarrow as pa
+from donnees_ged import ACTUALISATION, donnees_brutes, donnees_pretraitees, signature_fichier, versions_publiees
+from pipeline_documents import lister_exports, nom_projet
+from regles_alertes import FICHIER_REGLES
+
+# Adresse d'écoute de l'API (locale uniquement)
+HOTE_API = '127.0.0.1'
+PORT_API = 8502
+
+# Nombre de réponses sérialisées gardées en mémoire (les plus anciennes sont oubliées)
+NB_REPONSES_CACHE = 256
+
+# Type de contenu des réponses au format Arrow (flux IPC), demandé par ?format=arrow ou l'en-tête Accept
+TYPE_ARROW = 'application/vnd.apache.arrow.stream'
+
+# Colonnes de regroupement acceptées par les agrégats et regroupement par défaut des comptes
+COLONNES_REGROUPEMENT = ['LOT', 'TYPE DE DOCUMENT', 'INDICE', 'EMET', 'ZONE', 'NIVEAU']
+REGROUPEMENT_COMPTES = ['LOT', 'TYPE DE DOCUMENT', 'INDICE']
+
+# Mesures de durée acceptées par l'agrégat des durées
+MESURES_DUREES = ['Différence en jours', 'Durée entre versions', 'Nombre d\'indices']
+
+# Taille des morceaux lus sur disque et envoyés pour un fichier téléchargé
+TAILLE_MORCEAU_ENVOI = 1 << 20
+
+# État de l'API dans le processus : projets servis, réponses en cache, fichiers téléchargeables, serveur démarré
+API = {'projets': {}, 'reponses': OrderedDict(), 'fichiers': {}, 'serveur': None}
+_verrou = threading.Lock()
+
+# Erreur de requête renvoyée au client avec son code HTTP
+class ErreurRequete(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+# Fonction pour lire une liste de colonnes de regroupement dans les paramètres d'une requête
+def _regroupement(parametres, defaut):
+    colonnes = parametres['par'].split(',') if parametres.get('par') else defaut
+    inconnues = [colonne for colonne in colonnes if colonne not in COLONNES_REGROUPEMENT]
+    if inconnues:
+        raise ErreurRequete(400, f"Regroupement inconnu : {', '.join(inconnues)} (possibles : {', '.join(COLONNES_REGROUPEMENT)})")
+    return colonnes
+
+# Fonction pour compter les dépôts par combinaison de colonnes (par défaut LOT, TYPE DE DOCUMENT et INDICE)
+def agregat_comptes(chemin_fichier, parametres):
+    colonnes = _regroupement(parametres, REGROUPEMENT_COMPTES)
+    donnees = donnees_brutes(chemin_fichier)
+    colonnes = [colonne for colonne in colonnes if colonne in donnees.columns]
+    return donnees.groupby(colonnes, dropna=False).size().reset_index(name='Nombre de documents')
+
+# Fonction pour résumer les durées entre versions par groupe (quartiles, moustaches, moyenne, nombre)
+def agregat_durees(chemin_fichier, parametres):
+    # Importé au premier appel : le tableau de bord démarre l'API sans charger les modules des boxplots
+    from boites import statistiques_boites
+
+    colonne_groupe = _regroupement(parametres, ['TYPE DE DOCUMENT'])[0]
+    mesure = parametres.get('mesure', 'Différence en jours')
+    if mesure not in MESURES_DUREES:
+        raise ErreurRequete(400, f"Mesure inconnue : {mesure} (possibles : {', '.join(MESURES_DUREES)})")
+    resume, _ = statistiques_boites(donnees_pretraitees(chemin_fichier), colonne_groupe, mesure)
+    return resume.rename(columns={'Groupe': colonne_groupe})
+
+# Fonction pour calculer le calendrier d'un projet par lot ou type de document (premier et dernier dépôt, nombre de dépôts)
+def agregat_calendrier(chemin_fichier, parametres):
+    colonne_groupe = _regroupement(parametres, ['LOT'])[0]
+    donnees = donnees_pretraitees(chemin_fichier)
+    calendrier = donnees.groupby(colonne_groupe).agg(**{
+        'Date début': ('Date dépôt GED', 'min'),
+        'Date fin': ('Date dépôt GED', 'max'),
+        'Nombre de documents': ('Libellé du document', 'count')
+    }).reset_index()
+    calendrier['Durée en jours'] = (calendrier['Date fin'] - calendrier['Date début']).dt.days
+    return calendrier.sort_values('Date début')
+
+# Fonction pour calculer les alertes d'un projet par lot et type de document (règles du fichier de règles)
+def agregat_alertes(chemin_fichier, parametres):
+    # Importé au premier appel : le tableau de bord démarre l'API sans charger le moteur d'alertes
+    from moteur_alertes import calculer_alertes_export
+    from regles_alertes import charger_regles
+
+    alertes = calculer_alertes_export(nom_projet(chemin_fichier), chemin_fichier, charger_regles())
+    if parametres.get('regroupement'):
+        alertes = alertes[alertes['Regroupement'] == parametres['regroupement']]
+    return alertes
+
+# Fonction pour résumer les délais de visa de chaque viseur (visas demandés, rendus, en attente, en retard, délais de réponse)
+def agregat_visas(chemin_fichier, parametres):
+    donnees = donnees_brutes(chemin_fichier)
+    lignes = []
+    for colonne in donnees.columns:
+        if not colonne.startswith('Date demande visa'):
+            continue
+        viseur = colonne[len('Date demande visa'):]
+        demande = pd.to_datetime(donnees[colonne], format='%d/%m/%Y', errors='coerce')
+        rendu = pd.to_datetime(donnees.get(f'Date visa{viseur}'), format='%d/%m/%Y', errors='coerce')
+        # Un visa attendu est exporté en jours restants : négatif, il est en retard
+        restants = pd.to_numeric(donnees.get(f'Visa{viseur}'), errors='coerce')
+        delais = (rendu - demande).dt.days[demande.notna() & rendu.notna()]
+        lignes.append({
+            'Viseur': viseur,
+            'Visas demandés': int(demande.notna().sum()),
+            'Visas rendus': int((demande.notna() & rendu.notna()).sum()),
+            'Visas en attente': int((demande.notna() & rendu.isna()).sum()),
+            'Visas en retard': int((restants < 0).sum()),
+            'Délai moyen (jours)': round(float(delais.mean()), 1) if len(delais) else None,
+            'Délai médian (jours)': float(delais.median()) if len(delais) else None
+        })
+    return pd.DataFrame(lignes)
+
+# Agrégats servis par l'API : /projets/<projet>/<agrégat>
+AGREGATS = {
+    'comptes': agregat_comptes,
+    'durees': agregat_durees,
+    'calendrier': agregat_calendrier,
+    'alertes': agregat_alertes,
+    'visas': agregat_visas
+}
+
+# Fonction pour calculer l'ETag d'une réponse : version de l'export (et des règles pour les alertes), agrégat, paramètres et format
+def etag_reponse(chemin_fichier, agregat, parametres, format_reponse):
+    # Avec l'actualisation en arrière-plan, la version servie est la version publiée, qui peut précéder le fichier sur disque
+    signature = versions_publiees([chemin_fichier])[chemin_fichier] if ACTUALISATION['reveil'] is not None else None
+    signatures = [signature or signature_fichier(chemin_fichier)]
+    if agregat == 'alertes' and os.path.exists(FICHIER_REGLES):
+        signatures.append(signature_fichier(FICHIER_REGLES))
+    cle = json.dumps([os.path.abspath(chemin_fichier), signatures, agregat, sorted(parametres.items()), format_reponse], ensure_ascii=False)
+    return '"' + hashlib.sha1(cle.encode('utf-8')).hexdigest() + '"'
+
+# Fonction pour sérialiser un tableau en JSON (une ligne par objet, dates ISO) ou en flux Arrow
+def serialiser(tableau, format_reponse):
+    if format_reponse == 'arrow':
+        table = pa.Table.from_pandas(tableau, preserve_index=False)
+        sortie = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sortie, table.schema) as flux:
+            flux.write_table(table)
+        return sortie.getvalue().to_pybytes(), TYPE_ARROW
+    return tableau.to_json(orient='records', date_format='iso', force_ascii=False).encode('utf-8'), 'application/json; charset=utf-8'
+
+# Fonction pour obtenir la réponse sérialisée d'un agrégat, calculée une fois par ETag
+def reponse_agregat(chemin_fichier, agregat, parametres, format_reponse, etag):
+    with _verrou:
+        if etag in API['reponses']:
+            API['reponses'].move_to_end(etag)
+            return API['reponses'][etag]
+    reponse = serialiser(AGREGATS[agregat](chemin_fichier, parametres), format_reponse)
+    with _verrou:
+        API['reponses'][etag] = reponse
+        while len(API['reponses']) > NB_REPONSES_CACHE:
+            API['reponses'].popitem(last=False)
+    return reponse
+
+# Fonction pour rendre un fichier préparé téléchargeable par l'API sous un jeton non devinable
+# (None si l'API ne tourne pas dans ce processus : le fichier n'y serait pas trouvé)
+def publier_fichier(chemin_fichier, nom_fichier, type_contenu):
+    with _verrou:
+        if not API['serveur']:
+            return None
+        # Les fichiers supprimés depuis leur publication (remplacés ou purgés) sont oubliés
+        for jeton in [jeton for jeton, fichier in API['fichiers'].items() if not os.path.exists(fichier[0])]:
+            del API['fichiers'][jeton]
+        jeton = secrets.token_urlsafe(16)
+        API['fichiers'][jeton] = (chemin_fichier, nom_fichier, type_contenu)
+        hote, port = API['serveur'].server_address[:2]
+    return f'http://{hote}:{port}/telechargements/{jeton}'
+
+# Gestionnaire des requêtes HTTP de l'API (lecture seule)
+class GestionnaireAPI(BaseHTTPRequestHandler):
+    # Fonction pour envoyer une réponse complète
+    def _envoyer(self, code, corps, type_contenu='application/json; charset=utf-8', etag=None):
+        self.send_response(code)
+        self.send_header('Content-Type', type_contenu)
+        self.send_header('Content-Length', str(len(corps)))
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(corps)
+
+    # Fonction pour envoyer une erreur au format JSON
+    def _erreur(self, code, message):
+        self._envoyer(code, json.dumps({'erreur': message}, ensure_ascii=False).encode('utf-8'))
+
+    # Fonction pour envoyer un fichier publié depuis le disque, par morceaux (le fichier n'est jamais chargé en mémoire)
+    def _envoyer_fichier(self, jeton):
+        chemin_fichier, nom_fichier, type_contenu = API['fichiers'].get(jeton, (None, None, None))
+        try:
+            fichier = open(chemin_fichier, 'rb') if chemin_fichier else None
+        except OSError:
+            fichier = None
+        if fichier is None:
+            raise ErreurRequete(404, "Fichier inconnu ou expiré : préparez-le de nouveau")
+        with fichier:
+            self.send_response(200)
+            self.send_header('Content-Type', type_contenu)
+            self.send_header('Content-Length', str(os.fstat(fichier.fileno()).st_size))
+            self.send_header('Content-Disposition', f"attachment; filename*=UTF-8''{quote(nom_fichier)}")
+            self.end_headers()
+            try:
+                shutil.copyfileobj(fichier, self.wfile, TAILLE_MORCEAU_ENVOI)
+            except ConnectionError:
+                # Téléchargement interrompu par le navigateur : rien d'autre à envoyer
+                pass
+
+    # Fonction pour répondre à une requête GET : liste des projets, agrégat d'un projet ou fichier préparé
+    def do_GET(self):
+        url = urlparse(self.path)
+        morceaux = [unquote(morceau) for morceau in url.path.strip('/').split('/') if morceau]
+        parametres = {cle: valeurs[-1] for cle, valeurs in parse_qs(url.query).items()}
+        format_reponse = parametres.pop('format', 'arrow' if TYPE_ARROW in self.headers.get('Accept', '') else 'json')
+        projets = API['projets']
+        try:
+            if morceaux == ['projets']:
+                corps = [{'projet': projet, 'agregats': [f'/projets/{projet}/{agregat}' for agregat in AGREGATS]}
+                         for projet, chemin in projets.items() if os.path.exists(chemin)]
+                self._envoyer(200, json.dumps(corps, ensure_ascii=False).encode('utf-8'))
+                return
+            if len(morceaux) == 2 and morceaux[0] == 'telechargements':
+                self._envoyer_fichier(morceaux[1])
+                return
+            if len(morceaux) != 3 or morceaux[0] != 'projets' or morceaux[2] not in AGREGATS:
+                raise ErreurRequete(404, f"Chemin inconnu : {url.path} (voir /projets)")
+            if morceaux[1] not in projets or not os.path.exists(projets[morceaux[1]]):
+                raise ErreurRequete(404, f"Projet inconnu : {morceaux[1]}")
+            chemin = projets[morceaux[1]]
+            etag = etag_reponse(chemin, morceaux[2], parametres, format_reponse)
+            # Le client a déjà la version courante : rien n'est recalculé ni renvoyé
+            if etag in [valeur.strip() for valeur in self.headers.get('If-None-Match', '').split(',')]:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            corps, type_contenu = reponse_agregat(chemin, morceaux[2], parametres, format_reponse, etag)
+            self._envoyer(200, corps, type_contenu, etag)
+        except ErreurRequete as erreur:
+            self._erreur(erreur.code, str(erreur))
+        except Exception as erreur:
+            self._erreur(500, f"{type(erreur).__name__} : {erreur}")
+
+    # Fonction pour taire le journal des requêtes (une ligne par requête sur la sortie d'erreur sinon)
+    def log_message(self, format, *arguments):
+        pass
+
+# Fonction pour créer le serveur de l'API sur les projets donnés (nom -> chemin de l'export)
+def creer_serveur(projets, hote=HOTE_API, port=PORT_API):
+    API['projets'] = dict(projets)
+    serveur = ThreadingHTTPServer((hote, port), GestionnaireAPI)
+    serveur.daemon_threads = True
+    return serveur
+
+# Fonction pour démarrer l'API dans un fil du processus du tableau de bord (une seule fois : les appels suivants
+# mettent à jour les projets servis) ; les agrégats lisent les mêmes données partagées que les onglets
+def demarrer_api(projets, hote=HOTE_API, port=PORT_API):
+    with _verrou:
+        API['projets'] = dict(projets)
+        if API['serveur'] is None:
+            try:
+                API['serveur'] = creer_serveur(projets, hote, port)
+            except OSError:
+                # Port déjà utilisé (autre processus du tableau de bord) : l'API n'est pas démarrée ici
+                API['serveur'] = False
+                return None
+            threading.Thread(target=API['serveur'].serve_forever, name='api_ged', daemon=True).start()
+    return API['serveur'] or None
+
+# Exécution en ligne de commande : python api_ged.py [EXPORT.csv ...] [--port 8502]
+if __name__ == '__main__':
+    analyseur = argparse.ArgumentParser(description="Sert les agrégats des exports GED en JSON ou Arrow")
+    analyseur.add_argument('exports', nargs='*', help="exports servis (par défaut : tous les exports du dossier courant)")
+    analyseur.add_argument('--hote', default=HOTE_API, help="adresse d'écoute")
+    analyseur.add_argument('--port', type=int, default=PORT_API, help="port d'écoute")
+    arguments = analyseur.parse_args()
+    serveur = creer_serveur({nom_projet(chemin): chemin for chemin in arguments.exports or lister_exports()}, arguments.hote, arguments.port)
+    print(f"API GED sur http://{arguments.hote}:{arguments.port}/projets")
+    serveur.serve_forever()
@@ -3,6 +3,7 @@ import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 from streamlit_option_menu import option_menu
+from boites import figure_boites
 from datetime import timedelta
 from PIL import Image
 import os
@@ -331,8 +332,8 @@ def afficher_graphique(selectionne, donnees, projets, projet_selectionne):
             resultats = resultats.sort_values(by=resultats.columns[1], ascending=False)
             st.dataframe(resultats)
         elif representation == "Boxplot":
-            fig = px.box(donnees, x='TYPE DE DOCUMENT', y='Différence en jours', title='Durée entre Versions par Type de Document',
-                         labels={'Différence en jours': 'Durée entre Versions (jours)', 'TYPE DE DOCUMENT': 'Type de Document'})
+            fig = figure_boites(donnees, 'TYPE DE DOCUMENT', 'Différence en jours', title='Durée entre Versions par Type de Document',
+                                labels={'Différence en jours': 'Durée entre Versions (jours)', 'TYPE DE DOCUMENT': 'Type de Document'})
             st.plotly_chart(fig, use_container_width=True)
         elif representation == "Graphique barre":
             if type_calcul == 'mean':
@@ -3,6 +3,7 @@ import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 from streamlit_option_menu import option_menu
+from boites import figure_boites
 from datetime import timedelta
 
 # Les noms des projets et le chemin des fichiers.
@@ -80,7 +81,7 @@ def afficher_resultats(donnees, type_calcul, representation, y_column, title_suf
     if representation == "Tableau":
         st.dataframe(calcul)
     elif representation == "Boxplot":
-        fig = px.box(donnees, x='TYPE DE DOCUMENT', y=y_column, title=title)
+        fig = figure_boites(donnees, 'TYPE DE DOCUMENT', y_column, title=title)
         st.plotly_chart(fig, use_container_width=True)
 
 # Menu latéral pour les onglets
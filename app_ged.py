@@ -0,0 +1,181 @@
+import time
+DEBUT_DEMARRAGE = time.perf_counter()
+
+import os
+import streamlit as st
+from streamlit_option_menu import option_menu
+from PIL import Image
+from onglets import ONGLETS, afficher_onglet, mesurer_demarrage, tableau_mesures
+from instrumentation import afficher_panneau, panneau_demande, relance
+from donnees_ged import versions_publiees
+from surveillance_exports import INTERVALLE_SURVEILLANCE, surveiller
+
+# Durée des imports de l'application au premier lancement (les modules des onglets ne sont pas encore importés)
+DUREE_DEMARRAGE = mesurer_demarrage(time.perf_counter() - DEBUT_DEMARRAGE)
+
+# Dictionnaire pour stocker les projets chargés
+projects = {
+    'GOODLIFE': 'GOODLIFE.csv',
+    '40_LAFFITE': '40_LAFFITE.csv',
+    'LIGTHWELL': 'LIGTHWELL.csv',
+    'MDLF': 'MDLF.csv',
+    'AXA_MAT': 'AXA_MAT.csv',
+    'LEDGER': 'LEDGER.csv',
+    'PECM': 'PECM.csv'
+}
+
+# Configurer le thème Streamlit
+st.set_page_config(layout="wide")
+st.markdown("""
+    <style>
+    .css-18e3th9 {
+        background-color: #FFFFFF;
+    }
+    .css-1d391kg {
+        color: #343641;
+    }
+    .css-1v3fvcr {
+        background-color: #17D0B1;
+    }
+    .css-12ttj6m {
+        background-color: #FFFFFF;
+    }
+    </style>
+""", unsafe_allow_html=True)
+
+# Fonction pour afficher le logo
+def afficher_logo():
+    chemin_logo = os.path.join('logo1.jpeg')
+    try:
+        logo = Image.open(chemin_logo)
+        st.image(logo, width=150)
+    except FileNotFoundError:
+        st.error(f"Le fichier logo n'a pas été trouvé à l'emplacement : {chemin_logo}")
+
+# Fonction pour styliser l'en-tête
+def style_entete():
+    st.markdown(f"""
+        <style>
+        .entete {{
+            background-color: #004080;
+            color: white;
+            font-weight: bold;
+            text-align: center;
+            padding: 20px;
+            font-size: 24px;
+        }}
+        .sidebar .css-1d391kg {{
+            background-color: #f8f9fa;
+        }}
+        .sidebar .css-1v3fvcr {{
+            background-color: #f8f9fa;
+        }}
+        .main .block-container {{
+            padding-top: 1rem;
+        }}
+        </style>
+        <div class="entete">
+            Suivi et Analyse des Documents GED
+        </div>
+        """, unsafe_allow_html=True)
+
+# Fonction pour afficher le menu latéral (un élément par onglet enregistré)
+def afficher_menu():
+    with st.sidebar:
+        selectionne = option_menu(
+            menu_title="Menu",
+            options=[onglet['nom'] for onglet in ONGLETS],
+            icons=[onglet['icone'] for onglet in ONGLETS],
+            menu_icon="cast",
+            default_index=0,
+            orientation="vertical"
+        )
+    return selectionne
+
+# Fonction pour gérer le téléchargement de nouveaux fichiers
+def gerer_telechargement():
+    uploaded_files = st.file_uploader("Téléchargez vos fichiers CSV", type=["csv"], accept_multiple_files=True)
+    if uploaded_files:
+        for uploaded_file in uploaded_files:
+            nom_projet = os.path.splitext(uploaded_file.name)[0]
+            chemin_fichier = f"{nom_projet}.csv"
+            with open(chemin_fichier, "wb") as f:
+                f.write(uploaded_file.getbuffer())
+            projects[nom_projet] = chemin_fichier
+        st.success("Les fichiers ont été téléchargés avec succès.")
+    return projects
+
+# Fonction pour supprimer un projet
+def supprimer_projet():
+    projets_a_supprimer = st.multiselect('Sélectionnez les projets à supprimer', list(projects.keys()))
+    if st.button("Supprimer les projets sélectionnés"):
+        for projet in projets_a_supprimer:
+            os.remove(projects[projet])
+            del projects[projet]
+        st.success("Les projets sélectionnés ont été supprimés.")
+    return projects
+
+# Fonction pour synchroniser les filtres entre les onglets
+def synchroniser_filtres(chemins):
+    if st.session_state.get('projet_selectionne') not in chemins:
+        st.session_state['projet_selectionne'] = list(chemins.keys())[0]
+    projet_selectionne = st.selectbox('Sélectionnez un projet', list(chemins.keys()), key='projet_global', index=list(chemins.keys()).index(st.session_state['projet_selectionne']))
+    st.session_state['projet_selectionne'] = projet_selectionne
+    return projet_selectionne
+
+# Fonction pour afficher les temps de chargement des onglets (démarrage, import du module, affichage)
+def afficher_mesures():
+    with st.sidebar.expander("Temps de chargement"):
+        st.caption(f"Démarrage de l'application : {DUREE_DEMARRAGE} ms")
+        st.dataframe(tableau_mesures(), hide_index=True)
+
+# Fonction pour signaler à la session que des données plus récentes ont été publiées depuis son dernier affichage
+# (fragment relancé périodiquement, seul : le reste de la page n'est pas recalculé)
+@st.fragment(run_every=INTERVALLE_SURVEILLANCE)
+def afficher_notification(chemins):
+    affichees = st.session_state.get('versions_affichees', {})
+    publiees = versions_publiees(chemins.values())
+    nouveaux = [nom for nom, chemin in chemins.items() if affichees.get(chemin) is not None and publiees[chemin] != affichees[chemin]]
+    if nouveaux:
+        st.info(f"Données plus récentes disponibles : {', '.join(nouveaux)}")
+        if st.button("Actualiser l'affichage", key='actualiser_donnees'):
+            st.rerun()
+
+# Fonction principale
+def main():
+    # Chaque relance est mesurée (étapes de chargement, de prétraitement, d'agrégation et de tracé) et ajoutée au fichier d'instrumentation
+    with relance() as mesures:
+        afficher_logo()
+        style_entete()
+        selectionne = afficher_menu()
+
+        # Gérer le téléchargement et la suppression des projets
+        gerer_telechargement()
+        supprimer_projet()
+
+        # Seuls les chemins des projets sont connus ici : chaque onglet charge les données dont il a besoin
+        chemins = {nom: fichier for nom, fichier in projects.items() if os.path.exists(fichier)}
+        if chemins:
+            # Les exports affichés sont surveillés : un export modifié est relu en arrière-plan, sans bloquer les relances
+            surveiller(chemins.values())
+            # Les mêmes données partagées sont servies en JSON ou Arrow par l'API locale (api_ged.py), importée ici :
+            # le démarrage de l'application ne charge que le menu et le registre des onglets
+            from api_ged import demarrer_api
+            demarrer_api(chemins)
+            projet_selectionne = synchroniser_filtres(chemins)
+            mesures['projet'] = projet_selectionne
+            st.session_state['versions_affichees'] = versions_publiees(chemins.values())
+            with st.sidebar:
+                afficher_notification(chemins)
+            afficher_onglet(selectionne, {'projet_selectionne': projet_selectionne, 'chemins': chemins})
+        else:
+            st.write("Veuillez vérifier les fichiers des projets pour continuer.")
+        afficher_mesures()
+
+    # Panneau d'administration caché, affiché avec ?admin=1 dans l'URL
+    if panneau_demande():
+        afficher_panneau()
+
+# Exécution principale de l'application
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,7 @@ from streamlit_option_menu import option_menu
 from datetime import timedelta
 from PIL import Image
 import os
+from grille import afficher_grille
 
 # Fonction pour afficher le logo
 def afficher_logo():
@@ -373,7 +374,7 @@ def afficher_graphique(selectionne, donnees, projets, projet_selectionne):
                     })
         df_durées_indices = pd.DataFrame(durées_indices)
         if not df_durées_indices.empty:
-            st.dataframe(df_durées_indices)
+            afficher_grille(df_durées_indices, cle='durees_indices')
         else:
             st.write("Pas de données disponibles pour les durées entre indices.")
 
@@ -0,0 +1,189 @@
+import argparse
+import gc
+import logging
+import os
+import platform
+import time
+import threading
+import tracemalloc
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+import pandas as pd
+from generateur_exports import SOURCES, apprendre_modele, generer_export
+from pipeline_documents import DOSSIER_DERIVES
+
+# Tailles d'export mesurées par défaut, en nombre de dépôts
+TAILLES = [10000, 100000, 1000000]
+
+# Dossier des exports synthétiques (générés une fois par taille et par graine, puis réutilisés)
+DOSSIER_BANCS = os.path.join(DOSSIER_DERIVES, 'bancs')
+
+# Fichier où les résultats de chaque exécution sont ajoutés
+FICHIER_RESULTATS = os.path.join(DOSSIER_BANCS, 'resultats.csv')
+
+# Onglets non mesurés sur l'export synthétique : leurs données ne dépendent pas du projet sélectionné
+# (la comparaison profile tous les exports du dossier)
+ONGLETS_EXCLUS = ['comparaison']
+
+# Nombres de clients simultanés et requêtes par client du banc de charge de l'API
+NIVEAUX_API = [1, 8, 32]
+NB_REQUETES_API = 50
+
+# Requêtes envoyées à l'API par le banc de charge (tirées à tour de rôle)
+REQUETES_API = ['comptes', 'comptes?par=EMET', 'durees', 'durees?par=LOT', 'calendrier', 'visas', 'alertes', 'calendrier?format=arrow']
+
+# Fonction pour mesurer une étape : durée d'exécution, puis pic de mémoire allouée lors d'une seconde exécution sous tracemalloc
+def mesurer(fonction, memoire=True):
+    gc.collect()
+    debut = time.perf_counter()
+    resultat = fonction()
+    duree = time.perf_counter() - debut
+    pic = None
+    if memoire:
+        del resultat
+        gc.collect()
+        tracemalloc.start()
+        resultat = fonction()
+        pic = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return resultat, duree, pic
+
+# Fonction pour obtenir l'export synthétique d'une taille donnée (généré au premier besoin)
+def export_synthetique(nb_lignes, graine=0, dossier=DOSSIER_BANCS, modele=None):
+    os.makedirs(dossier, exist_ok=True)
+    chemin = os.path.join(dossier, f'SYN_{nb_lignes}_{graine}.csv')
+    if not os.path.exists(chemin):
+        generer_export(modele if modele is not None else apprendre_modele(SOURCES), nb_lignes, chemin, graine, projet=f'SYN_{nb_lignes}')
+    return chemin
+
+# Fonction pour mesurer toutes les étapes du tableau de bord sur un export : chargement, prétraitement,
+# préparation et tracé de chaque onglet (données en cache, comme lors d'une relance) et calcul des alertes
+def mesurer_export(chemin_export, memoire=True):
+    import donnees_ged
+    import onglets
+    from moteur_alertes import calculer_alertes_export
+    from pipeline_documents import nom_projet
+    from regles_alertes import charger_regles
+
+    projet = nom_projet(chemin_export)
+    contexte = {'projet_selectionne': projet, 'chemins': {projet: chemin_export}}
+    mesures = []
+
+    def ajouter(etape, fonction, lignes=None):
+        resultat, duree, pic = mesurer(fonction, memoire)
+        mesures.append({
+            'Étape': etape,
+            'Lignes traitées': lignes if lignes is not None else (len(resultat) if isinstance(resultat, pd.DataFrame) else None),
+            'Durée (s)': round(duree, 3),
+            'Mémoire max (Mo)': None if pic is None else round(pic / 2 ** 20, 1)
+        })
+        return resultat
+
+    # Fonctions appelées hors du magasin partagé : le coût mesuré est celui d'un premier chargement
+    donnees = ajouter('charger_donnees', lambda: donnees_ged.charger_donnees(chemin_export))
+    ajouter('pretraiter_donnees', lambda: donnees_ged.pretraiter_donnees(donnees))
+    regles = charger_regles()
+    ajouter('Calcul des alertes', lambda: calculer_alertes_export(projet, chemin_export, regles), lignes=len(donnees))
+
+    # Les onglets lisent les données du magasin partagé, rempli une première fois hors mesure
+    donnees_ged.donnees_projet(contexte)
+    for onglet in onglets.ONGLETS:
+        if onglet['module'] in ONGLETS_EXCLUS:
+            continue
+        module = onglets.charger_onglet(onglet)
+        ajouter(f"Onglet : {onglet['nom']}", lambda: module.afficher(contexte), lignes=len(donnees))
+    return pd.DataFrame(mesures)
+
+# Fonction pour mesurer l'API sous charge : des clients simultanés rejouent les requêtes, en renvoyant l'ETag reçu
+# une fois sur deux (réponse 304 attendue), et le débit, les latences et la part de réponses 304 sont relevés par niveau
+def mesurer_api(chemin_export, niveaux=NIVEAUX_API, nb_requetes=NB_REQUETES_API):
+    from api_ged import creer_serveur
+    from pipeline_documents import nom_projet
+
+    projet = nom_projet(chemin_export)
+    serveur = creer_serveur({projet: chemin_export}, port=0)
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{serveur.server_address[1]}/projets/{projet}/'
+
+    def requete(chemin, etag=None):
+        entetes = {'If-None-Match': etag} if etag else {}
+        debut = time.perf_counter()
+        try:
+            with urllib.request.urlopen(urllib.request.Request(base + chemin, headers=entetes)) as reponse:
+                reponse.read()
+                code, etag = reponse.status, reponse.headers.get('ETag')
+        except HTTPError as erreur:
+            code = erreur.code
+        return code, etag, time.perf_counter() - debut
+
+    def client(numero):
+        etags, resultats = {}, []
+        for position in range(nb_requetes):
+            chemin = REQUETES_API[(numero + position) % len(REQUETES_API)]
+            code, etag, duree = requete(chemin, etags.get(chemin) if position % 2 else None)
+            etags[chemin] = etag or etags.get(chemin)
+            resultats.append((code, duree))
+        return resultats
+
+    # Première réponse de chaque requête (chargement et agrégats) hors mesure
+    for chemin in REQUETES_API:
+        requete(chemin)
+    mesures = []
+    try:
+        for niveau in niveaux:
+            debut = time.perf_counter()
+            with ThreadPoolExecutor(niveau) as executeur:
+                resultats = [resultat for resultats_client in executeur.map(client, range(niveau)) for resultat in resultats_client]
+            duree = time.perf_counter() - debut
+            latences = pd.Series([latence for _, latence in resultats]) * 1000
+            codes = pd.Series([code for code, _ in resultats])
+            mesures.append({
+                'Étape': f'API : {niveau} clients',
+                'Lignes traitées': len(resultats),
+                'Durée (s)': round(duree, 3),
+                'Requêtes/s': round(len(resultats) / duree, 1),
+                'Latence p50 (ms)': round(latences.quantile(0.5), 1),
+                'Latence p95 (ms)': round(latences.quantile(0.95), 1),
+                'Réponses 304 (%)': round(100 * (codes == 304).mean(), 1),
+                'Erreurs': int((codes >= 400).sum())
+            })
+    finally:
+        serveur.shutdown()
+        serveur.server_close()
+    return pd.DataFrame(mesures)
+
+# Fonction pour exécuter le banc d'essai sur plusieurs tailles d'export et ajouter les résultats au fichier de résultats
+def executer_banc(tailles=TAILLES, graine=0, memoire=True, fichier_resultats=FICHIER_RESULTATS, api=False):
+    # Streamlit s'exécute sans serveur : ses avertissements (pas de runtime, pas de session) sont attendus
+    logging.disable(logging.WARNING)
+    modele = None
+    resultats = []
+    for nb_lignes in tailles:
+        chemin = os.path.join(DOSSIER_BANCS, f'SYN_{nb_lignes}_{graine}.csv')
+        if not os.path.exists(chemin):
+            modele = modele if modele is not None else apprendre_modele(SOURCES)
+            export_synthetique(nb_lignes, graine, modele=modele)
+        mesures = mesurer_export(chemin, memoire)
+        if api:
+            mesures = pd.concat([mesures, mesurer_api(chemin)], ignore_index=True)
+        mesures.insert(0, 'Dépôts', nb_lignes)
+        resultats.append(mesures)
+        print(mesures.to_string(index=False))
+    resultats = pd.concat(resultats, ignore_index=True)
+    resultats.insert(0, 'Date', pd.Timestamp.now().strftime('%Y-%m-%d %H:%M'))
+    resultats.insert(1, 'Machine', f'{platform.node()} / pandas {pd.__version__}')
+    os.makedirs(os.path.dirname(fichier_resultats) or '.', exist_ok=True)
+    resultats.to_csv(fichier_resultats, sep=';', index=False, mode='a', header=not os.path.exists(fichier_resultats), encoding='utf-8')
+    return resultats
+
+# Exécution en ligne de commande : python banc_essai.py [--tailles 10000 100000 1000000] [--api]
+if __name__ == '__main__':
+    analyseur = argparse.ArgumentParser(description="Mesure le temps et la mémoire du tableau de bord GED sur des exports synthétiques")
+    analyseur.add_argument('--tailles', nargs='+', type=int, default=TAILLES, help="nombres de dépôts des exports mesurés")
+    analyseur.add_argument('--graine', type=int, default=0, help="graine des exports synthétiques")
+    analyseur.add_argument('--sans-memoire', action='store_true', help="ne mesure que les durées (pas de seconde exécution sous tracemalloc)")
+    analyseur.add_argument('--api', action='store_true', help="mesure aussi l'API (débit et latences sous plusieurs niveaux de clients simultanés)")
+    analyseur.add_argument('--resultats', default=FICHIER_RESULTATS, help="fichier CSV auquel les résultats sont ajoutés")
+    arguments = analyseur.parse_args()
+    executer_banc(arguments.tailles, arguments.graine, not arguments.sans_memoire, arguments.resultats, arguments.api)
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+from clusters_depots import empreinte_colonnes
+
+# Longueur des moustaches, en écarts interquartiles (convention de Tukey, comme les boxplots Plotly)
+COEFFICIENT_MOUSTACHES = 1.5
+
+# Nombre maximal de valeurs aberrantes tracées par groupe (échantillon régulier, extrêmes toujours compris)
+NB_ABERRANTS = 30
+
+# Fonction pour calculer le résumé en cinq nombres de chaque groupe (quartiles, moustaches) et un échantillon de valeurs aberrantes
+def statistiques_boites(donnees, colonne_groupe, colonne_valeur, nb_aberrants=NB_ABERRANTS):
+    valeurs = pd.DataFrame({
+        'Groupe': donnees[colonne_groupe].to_numpy(),
+        'Valeur': pd.to_numeric(donnees[colonne_valeur], errors='coerce').to_numpy()
+    }).dropna()
+    groupes = valeurs.groupby('Groupe')['Valeur']
+    resume = groupes.quantile([0.25, 0.5, 0.75]).unstack()
+    resume.columns = ['Q1', 'Médiane', 'Q3']
+    resume['Moyenne'] = groupes.mean()
+    resume['Nombre'] = groupes.size()
+
+    # Moustaches : valeurs extrêmes restant à moins de COEFFICIENT_MOUSTACHES écarts interquartiles des quartiles
+    ecart = resume['Q3'] - resume['Q1']
+    borne_basse = (resume['Q1'] - COEFFICIENT_MOUSTACHES * ecart).reindex(valeurs['Groupe']).to_numpy()
+    borne_haute = (resume['Q3'] + COEFFICIENT_MOUSTACHES * ecart).reindex(valeurs['Groupe']).to_numpy()
+    dans_moustaches = (valeurs['Valeur'].to_numpy() >= borne_basse) & (valeurs['Valeur'].to_numpy() <= borne_haute)
+    moustaches = valeurs[dans_moustaches].groupby('Groupe')['Valeur'].agg(['min', 'max'])
+    resume['Moustache basse'] = moustaches['min'].reindex(resume.index).fillna(resume['Q1'])
+    resume['Moustache haute'] = moustaches['max'].reindex(resume.index).fillna(resume['Q3'])
+
+    # Échantillon des valeurs aberrantes : une sur 'pas' dans l'ordre croissant, plus la plus grande
+    aberrants = valeurs[~dans_moustaches].sort_values(['Groupe', 'Valeur'])
+    rang = aberrants.groupby('Groupe').cumcount().to_numpy()
+    nombre = aberrants.groupby('Groupe')['Valeur'].transform('size').to_numpy()
+    pas = np.ceil(nombre / max(nb_aberrants, 1)).astype('int64')
+    aberrants = aberrants[(rang % np.maximum(pas, 1) == 0) | (rang == nombre - 1)]
+    return resume.reset_index(), aberrants.reset_index(drop=True)
+
+# Fonction pour calculer les résumés de boxplot d'un projet (mis en cache par empreinte, les données ne sont pas hachées)
+@st.cache_data(show_spinner=False)
+def _calculer_boites(empreinte, _donnees, colonne_groupe, colonne_valeur):
+    return statistiques_boites(_donnees, colonne_groupe, colonne_valeur)
+
+# Fonction pour obtenir les résumés de boxplot d'un projet pour un regroupement et une valeur
+def calculer_boites(donnees, colonne_groupe, colonne_valeur):
+    empreinte = empreinte_colonnes(donnees, [colonne_groupe, colonne_valeur])
+    return _calculer_boites(empreinte, donnees, colonne_groupe, colonne_valeur)
+
+# Fonction pour tracer un boxplot à partir des résumés précalculés (seuls les résumés et l'échantillon d'aberrants sont envoyés au navigateur)
+def figure_boites(donnees, colonne_groupe, colonne_valeur, title=None, labels=None):
+    resume, aberrants = calculer_boites(donnees, colonne_groupe, colonne_valeur)
+    labels = labels or {}
+    fig = go.Figure(go.Box(
+        x=resume['Groupe'], q1=resume['Q1'], median=resume['Médiane'], q3=resume['Q3'], mean=resume['Moyenne'],
+        lowerfence=resume['Moustache basse'], upperfence=resume['Moustache haute'],
+        name=labels.get(colonne_valeur, colonne_valeur), marker_color='#636efa', showlegend=False
+    ))
+    fig.add_trace(go.Scatter(
+        x=aberrants['Groupe'], y=aberrants['Valeur'], mode='markers', name='Valeurs aberrantes',
+        marker=dict(color='#636efa', size=5, symbol='circle-open'), showlegend=False
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis_title=labels.get(colonne_groupe, colonne_groupe),
+        yaxis_title=labels.get(colonne_valeur, colonne_valeur)
+    )
+    return fig
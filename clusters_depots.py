@@ -0,0 +1,110 @@
+import hashlib
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Nombre maximal de phases proposé à l'utilisateur (toutes les valeurs de 1 à K_MAX sont calculées en une fois)
+K_MAX = 8
+
+# Nombre de colonnes de la matrice des coûts traitées à la fois (limite la mémoire sur les lots très étalés)
+TAILLE_BLOC = 512
+
+# Fonction pour calculer l'empreinte de quelques colonnes d'un jeu de données, utilisée comme clé de cache
+def empreinte_colonnes(donnees, colonnes):
+    empreinte = pd.util.hash_pandas_object(donnees[list(colonnes)], index=False)
+    return hashlib.sha1(empreinte.to_numpy().tobytes()).hexdigest()
+
+# Fonction pour calculer l'empreinte des dépôts de chaque lot
+def empreinte_lots(donnees, colonne_lot='LOT', colonne_date='Date dépôt GED'):
+    return empreinte_colonnes(donnees, [colonne_lot, colonne_date])
+
+# Fonction pour calculer la segmentation optimale d'une série de jours pour tous les nombres de phases de 1 à k_max
+# (k-means exact en une dimension : programmation dynamique sur les jours distincts pondérés par leur nombre de dépôts)
+def segmenter_jours(jours, k_max=K_MAX):
+    valeurs, poids = np.unique(np.asarray(jours, dtype='int64'), return_counts=True)
+    n = len(valeurs)
+    k_max = max(1, min(k_max, n))
+    if n == 0:
+        return {'valeurs': valeurs, 'poids': poids, 'couts': np.zeros(0), 'coupures': np.zeros((0, 0), dtype='int64')}
+
+    # Sommes cumulées centrées sur le premier jour pour limiter les erreurs d'arrondi
+    x = (valeurs - valeurs[0]).astype(float)
+    w = poids.astype(float)
+    cumul_poids = np.concatenate([[0.0], np.cumsum(w)])
+    cumul_x = np.concatenate([[0.0], np.cumsum(w * x)])
+    cumul_x2 = np.concatenate([[0.0], np.cumsum(w * x * x)])
+
+    # Coût (inertie) du segment [j, i] pour tous les débuts j et les fins i du bloc
+    def couts_segments(debut_bloc, fin_bloc):
+        j = np.arange(n)[:, None]
+        i = np.arange(debut_bloc, fin_bloc)[None, :]
+        poids_segment = cumul_poids[i + 1] - cumul_poids[j]
+        somme_segment = cumul_x[i + 1] - cumul_x[j]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cout = cumul_x2[i + 1] - cumul_x2[j] - somme_segment ** 2 / poids_segment
+        cout = np.maximum(cout, 0.0)
+        cout[j > i] = np.inf
+        return cout
+
+    # couts_optimaux[k, i] : inertie minimale des jours 0..i répartis en k + 1 phases ; coupures[k, i] : début de la dernière phase
+    couts_optimaux = np.full((k_max, n), np.inf)
+    coupures = np.zeros((k_max, n), dtype='int64')
+    blocs = [(debut_bloc, min(debut_bloc + TAILLE_BLOC, n)) for debut_bloc in range(0, n, TAILLE_BLOC)]
+    # Les blocs de coûts sont conservés d'un nombre de phases à l'autre tant que la matrice reste de taille raisonnable
+    conserver = n <= 4 * TAILLE_BLOC
+    couts_blocs = {}
+    for debut_bloc, fin_bloc in blocs:
+        cout = couts_segments(debut_bloc, fin_bloc)
+        couts_optimaux[0, debut_bloc:fin_bloc] = cout[0]
+        if conserver:
+            couts_blocs[debut_bloc] = cout
+    for k in range(1, k_max):
+        # La phase k commence au jour j : coût des k premières phases sur 0..j-1 plus le coût du segment [j, i]
+        precedent = np.concatenate([[np.inf], couts_optimaux[k - 1, :-1]])[:, None]
+        for debut_bloc, fin_bloc in blocs:
+            cout = couts_blocs[debut_bloc] if conserver else couts_segments(debut_bloc, fin_bloc)
+            candidats = precedent + cout
+            coupures[k, debut_bloc:fin_bloc] = np.argmin(candidats, axis=0)
+            couts_optimaux[k, debut_bloc:fin_bloc] = candidats[coupures[k, debut_bloc:fin_bloc], np.arange(fin_bloc - debut_bloc)]
+    return {'valeurs': valeurs, 'poids': poids, 'couts': couts_optimaux[:, -1], 'coupures': coupures}
+
+# Fonction pour obtenir le numéro de phase de chaque jour distinct pour k phases (phase 0 = la plus ancienne)
+def phases_segmentation(segmentation, k):
+    n = len(segmentation['valeurs'])
+    k = max(1, min(k, len(segmentation['couts'])))
+    phases = np.zeros(n, dtype='int64')
+    fin = n
+    for niveau in range(k - 1, 0, -1):
+        debut = segmentation['coupures'][niveau, fin - 1]
+        phases[debut:fin] = niveau
+        fin = debut
+    return phases
+
+# Fonction pour attribuer une phase à chaque dépôt à partir de la segmentation de son lot
+def attribuer_phases(dates, segmentation, k):
+    phases = phases_segmentation(segmentation, k)
+    jours = pd.to_datetime(dates).to_numpy().astype('datetime64[D]')
+    positions = np.searchsorted(segmentation['valeurs'], jours.astype('int64'))
+    positions = np.clip(positions, 0, max(len(phases) - 1, 0))
+    resultat = pd.Series(phases[positions] + 1 if len(phases) else np.zeros(len(jours), dtype='int64'), index=dates.index, dtype='float')
+    return resultat.where(pd.notna(dates).to_numpy())
+
+# Fonction pour calculer la part de l'inertie expliquée par chaque nombre de phases
+def part_expliquee(segmentation):
+    couts = segmentation['couts']
+    if len(couts) == 0 or couts[0] == 0:
+        return np.ones(len(couts))
+    return 1 - couts / couts[0]
+
+# Fonction pour segmenter tous les lots d'un projet (mis en cache par empreinte des dépôts, les données ne sont pas hachées)
+@st.cache_data(show_spinner=False)
+def _segmenter_lots(empreinte, _donnees, colonne_lot, colonne_date, k_max):
+    jours = _donnees[colonne_date].to_numpy().astype('datetime64[D]').astype('int64')
+    valides = _donnees[colonne_date].notna().to_numpy()
+    lots = _donnees[colonne_lot].to_numpy()[valides]
+    jours = jours[valides]
+    return {lot: segmenter_jours(jours[lots == lot], k_max) for lot in pd.unique(lots)}
+
+# Fonction pour obtenir la segmentation en phases de dépôt de chaque lot d'un projet
+def segmenter_lots(donnees, colonne_lot='LOT', colonne_date='Date dépôt GED', k_max=K_MAX):
+    return _segmenter_lots(empreinte_lots(donnees, colonne_lot, colonne_date), donnees, colonne_lot, colonne_date, k_max)
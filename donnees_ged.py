@@ -0,0 +1,238 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+from doublons_libelles import cle_document
+from index_filtres import construire_index_filtres, filtrer_positions, restreindre_index
+from index_temporel import EPOQUE, bornes_periode, construire_index, jours_tries, tranche_periode
+from instrumentation import appel_en_cache, noter_calcul
+from qualite_donnees import controler_qualite
+
+# Fonction pour charger les données depuis un fichier (avec controle=True, le rapport de qualité de l'export est calculé
+# dans le même passage, sur les valeurs lues avant conversion, et renvoyé avec les données)
+def charger_donnees(chemin_fichier, controle=False):
+    spec_types = {
+        'Date dépôt GED': str,
+        'TYPE DE DOCUMENT': str,
+        'PROJET': str,
+        'EMET': str,
+        'LOT': str,
+        'INDICE': str,
+        'Libellé du document': str
+    }
+    donnees = pd.read_csv(chemin_fichier, encoding='iso-8859-1', sep=';', dtype=spec_types, low_memory=False)
+    dates_lues = donnees['Date dépôt GED']
+    donnees['Date dépôt GED'] = pd.to_datetime(dates_lues, format='%d/%m/%Y', errors='coerce')
+    rapport = controler_qualite(donnees, dates_lues) if controle else None
+    # Dépôts rangés par date (ordre du fichier conservé à date égale, dépôts sans date en fin) : une période est une tranche de lignes
+    donnees = donnees.sort_values('Date dépôt GED', kind='stable', na_position='last')
+    return (donnees, rapport) if controle else donnees
+
+# Fonction pour prétraiter les données
+def pretraiter_donnees(donnees):
+    # Clé de document corrigée : les libellés quasi identiques d'un même document (révisions, formats) sont regroupés
+    donnees = donnees.assign(Document=cle_document(donnees))
+    donnees = donnees.sort_values(by=['TYPE DE DOCUMENT', 'Date dépôt GED'])
+    group = donnees.groupby(['TYPE DE DOCUMENT', 'LOT', 'Document'])
+    donnees['Date première version'] = group['Date dépôt GED'].transform('min')
+    donnees['Date dernière version'] = group['Date dépôt GED'].transform('max')
+    donnees['Différence en jours'] = (donnees['Date dernière version'] - donnees['Date première version']).dt.days
+    donnees['Nombre d\'indices'] = group['INDICE'].transform('nunique')
+    
+    # Remplir les valeurs manquantes avant la transformation
+    donnees['INDICE'] = donnees['INDICE'].fillna('')
+    donnees['Indices utilisés'] = group['INDICE'].transform(lambda x: ', '.join(sorted(set(x))))
+
+    # Ajouter les colonnes Date début et Date fin pour chaque LOT
+    donnees['Date début'] = donnees.groupby('LOT')['Date dépôt GED'].transform('min')
+    donnees['Date fin'] = donnees.groupby('LOT')['Date dépôt GED'].transform('max')
+    
+    # Calculer les durées entre chaque version pour chaque document
+    donnees = donnees.sort_values(by=['Document', 'Date dépôt GED'])
+    donnees['Durée entre versions'] = donnees.groupby('Document')['Date dépôt GED'].diff().dt.days
+
+    # Remplacer les valeurs manquantes dans 'Durée entre versions' par 0
+    donnees['Durée entre versions'] = donnees['Durée entre versions'].fillna(0)
+
+    # Dépôts rangés à nouveau par date, dans le même ordre que les données chargées
+    return donnees.sort_values('Date dépôt GED', kind='stable', na_position='last')
+
+# Fonction pour calculer la tranche de lignes d'une période d'analyse ('6 mois', '1 an' ou toute la période depuis le premier dépôt)
+# dans des données triées par date, à partir de leurs numéros de jour
+def tranche_analyse(jours, periode):
+    return tranche_periode(jours, *bornes_periode(jours, periode))
+
+# Filtrer les données par période (données triées par date : la période est une tranche de lignes, sans copie)
+def filtrer_donnees_par_periode(donnees, periode, jours):
+    debut, fin = tranche_analyse(jours, periode)
+    return donnees.iloc[debut:fin]
+
+# Fonction pour extraire les dépôts d'un lot sur une tranche de lignes : positions du lot lues dans l'index des filtres,
+# puis restreintes à la tranche (les positions sont croissantes)
+def depots_lot_periode(donnees, index, lot, tranche):
+    positions = filtrer_positions(index, {'LOT': [lot]})
+    return donnees.iloc[positions[np.searchsorted(positions, tranche[0]):np.searchsorted(positions, tranche[1])]]
+
+# Fonction pour rendre un tableau de données immuable : chaque colonne repose sur un tableau NumPy en lecture seule
+# (toute écriture en place lève une erreur au lieu de modifier les données partagées entre les sessions)
+def figer(donnees):
+    colonnes = {}
+    for colonne in donnees.columns:
+        valeurs = donnees[colonne].to_numpy(copy=True)
+        valeurs.setflags(write=False)
+        colonnes[colonne] = valeurs
+    return pd.DataFrame(colonnes, index=donnees.index, copy=False)
+
+# Entrées partagées des exports (une par fichier), communes à toutes les sessions du processus
+_ENTREES = {}
+_verrou_entrees = threading.Lock()
+
+# Actualisation en arrière-plan : quand un fil de surveillance est actif, les relances servent la version publiée
+# et réveillent le fil au lieu de relire elles-mêmes un export modifié
+ACTUALISATION = {'reveil': None}
+
+# Fonction pour obtenir l'entrée partagée d'un export, créée au premier besoin (deux sessions ne créent jamais chacune la leur)
+def _entree_partagee(chemin_fichier):
+    with _verrou_entrees:
+        return _ENTREES.setdefault(os.path.abspath(chemin_fichier), {
+            'verrou': threading.Lock(),
+            'version': {'signature': None, 'brutes': None, 'jours': None, 'qualite': None, 'pretraitees': None, 'index': None, 'masse': None}
+        })
+
+# Fonction pour lire la signature d'un export (date de modification et taille)
+def signature_fichier(chemin_fichier):
+    etat = os.stat(chemin_fichier)
+    return (etat.st_mtime_ns, etat.st_size)
+
+# Fonction pour obtenir la version à jour des données partagées d'un export : un seul chargement à la fois par export,
+# les sessions arrivées pendant le chargement attendent son résultat au lieu de relire le fichier
+def _version_partagee(chemin_fichier, pretraitees=False):
+    entree = _entree_partagee(chemin_fichier)
+    signature = signature_fichier(chemin_fichier)
+    version = entree['version']
+    if version['signature'] == signature and (not pretraitees or version['pretraitees'] is not None):
+        return version
+    # Export modifié, actualisé en arrière-plan : la version publiée reste servie sans attendre la relecture
+    if ACTUALISATION['reveil'] is not None and version['brutes'] is not None and (not pretraitees or version['pretraitees'] is not None):
+        ACTUALISATION['reveil'].set()
+        return version
+    with entree['verrou']:
+        version = entree['version']
+        if version['signature'] != signature:
+            noter_calcul()
+            # Nouvelle version publiée d'un seul bloc : une session en cours garde la version qu'elle a déjà lue
+            brutes, qualite = charger_donnees(chemin_fichier, controle=True)
+            brutes = figer(brutes)
+            version = {'signature': signature, 'brutes': brutes, 'jours': jours_tries(brutes['Date dépôt GED']), 'qualite': qualite,
+                       'pretraitees': None, 'index': None, 'masse': None}
+            entree['version'] = version
+        if pretraitees and version['pretraitees'] is None:
+            noter_calcul()
+            version['pretraitees'] = figer(pretraiter_donnees(version['brutes']))
+    return version
+
+# Fonction pour relire un export modifié dont une version est déjà partagée (appelée hors des relances, par le fil de surveillance) :
+# la nouvelle version est construite à côté de l'ancienne, qui reste servie, puis publiée d'un seul bloc
+def actualiser_projet(chemin_fichier):
+    with _verrou_entrees:
+        entree = _ENTREES.get(os.path.abspath(chemin_fichier))
+    if entree is None or entree['version']['brutes'] is None:
+        return False
+    with entree['verrou']:
+        ancienne = entree['version']
+        signature = signature_fichier(chemin_fichier)
+        if ancienne['signature'] == signature:
+            return False
+        brutes, qualite = charger_donnees(chemin_fichier, controle=True)
+        brutes = figer(brutes)
+        pretraitees = figer(pretraiter_donnees(brutes)) if ancienne['pretraitees'] is not None else None
+        # Les index de la nouvelle version sont reconstruits à la première relance qui en a besoin
+        entree['version'] = {'signature': signature, 'brutes': brutes, 'jours': jours_tries(brutes['Date dépôt GED']), 'qualite': qualite,
+                             'pretraitees': pretraitees, 'index': None, 'masse': None}
+    return True
+
+# Fonction pour lire la signature de la version publiée de chaque export (None si l'export n'a pas encore été chargé)
+def versions_publiees(chemins):
+    with _verrou_entrees:
+        entrees = {chemin: _ENTREES.get(os.path.abspath(chemin)) for chemin in chemins}
+    return {chemin: entree['version']['signature'] if entree is not None else None for chemin, entree in entrees.items()}
+
+# Fonction pour extraire la fenêtre de dates d'une version (periode : dates de début et de fin incluses, ou None pour tout l'export) :
+# les lignes étant triées par date, la fenêtre est une tranche trouvée par recherche dichotomique dans les numéros de jour
+def _fenetre(donnees, jours, periode):
+    if periode is None:
+        return donnees.copy(deep=False)
+    debut, fin = tranche_periode(jours, *periode)
+    return donnees.iloc[debut:fin].copy(deep=False)
+
+# Fonction pour obtenir les données brutes partagées d'un export (copie superficielle : les colonnes ajoutées restent propres à l'appelant)
+def donnees_brutes(chemin_fichier, periode=None):
+    version = _version_partagee(chemin_fichier)
+    return _fenetre(version['brutes'], version['jours'], periode)
+
+# Fonction pour obtenir les données prétraitées partagées d'un export (copie superficielle, sans copie des valeurs)
+def donnees_pretraitees(chemin_fichier, periode=None):
+    version = _version_partagee(chemin_fichier, pretraitees=True)
+    return _fenetre(version['pretraitees'], version['jours'], periode)
+
+# Fonction pour obtenir les données prétraitées partagées d'un export et leur index des filtres, tirés de la même version
+# (l'index, numéros de jour compris, est construit une fois par version, au premier besoin, puis restreint à la fenêtre de dates)
+def donnees_indexees(chemin_fichier, periode=None):
+    version = _version_partagee(chemin_fichier, pretraitees=True)
+    if version['index'] is None:
+        with _entree_partagee(chemin_fichier)['verrou']:
+            if version['index'] is None:
+                noter_calcul()
+                version['index'] = dict(construire_index_filtres(version['pretraitees']), jours=version['jours'])
+    if periode is None:
+        return version['pretraitees'].copy(deep=False), version['index']
+    debut, fin = tranche_periode(version['jours'], *periode)
+    return version['pretraitees'].iloc[debut:fin].copy(deep=False), restreindre_index(version['index'], debut, fin)
+
+# Fonction pour obtenir l'index temporel d'un export (masse cumulée par jour depuis le premier dépôt), construit une fois par version
+# à partir de ses numéros de jour triés : les relances suivantes le lisent sans parcourir les dates
+def index_masse(chemin_fichier):
+    version = _version_partagee(chemin_fichier)
+    if version['masse'] is None:
+        with _entree_partagee(chemin_fichier)['verrou']:
+            if version['masse'] is None:
+                noter_calcul()
+                version['masse'] = construire_index(version['jours'])
+    return version['masse']
+
+# Fonction pour obtenir le rapport de qualité d'un export, calculé à son chargement et gardé avec ses données partagées
+def rapport_qualite(chemin_fichier):
+    return _version_partagee(chemin_fichier)['qualite']
+
+# Fonction pour obtenir les dates du premier et du dernier dépôt daté d'un export (None si aucun dépôt n'est daté)
+def etendue_export(chemin_fichier):
+    jours = _version_partagee(chemin_fichier)['jours']
+    if len(jours) == 0:
+        return None
+    return EPOQUE + pd.Timedelta(days=int(jours[0])), EPOQUE + pd.Timedelta(days=int(jours[-1]))
+
+# Fonction pour obtenir les données prétraitées du projet sélectionné sur la fenêtre de dates choisie (chargement et prétraitement mesurés séparément)
+def donnees_projet(contexte):
+    projet = contexte['projet_selectionne']
+    appel_en_cache(f'Chargement {projet}', 'chargement', donnees_brutes, contexte['chemins'][projet])
+    return appel_en_cache(f'Prétraitement {projet}', 'prétraitement', donnees_pretraitees, contexte['chemins'][projet], contexte.get('periode'))
+
+# Fonction pour obtenir les données prétraitées du projet sélectionné et leur index des filtres (construction de l'index mesurée)
+def index_projet(contexte):
+    projet = contexte['projet_selectionne']
+    donnees_projet(contexte)
+    return appel_en_cache(f'Index des filtres {projet}', 'prétraitement', donnees_indexees, contexte['chemins'][projet], contexte.get('periode'))
+
+# Fonction pour obtenir l'index temporel de chaque projet disponible, sur tout l'export (construction de chaque index mesurée)
+def index_masse_projets(contexte):
+    index_projets = {}
+    for nom, chemin in contexte['chemins'].items():
+        if os.path.exists(chemin):
+            appel_en_cache(f'Chargement {nom}', 'chargement', donnees_brutes, chemin)
+            index_projets[nom] = appel_en_cache(f'Index temporel {nom}', 'prétraitement', index_masse, chemin)
+    return index_projets
+
+# Fonction pour obtenir les données brutes de tous les projets disponibles sur la fenêtre de dates choisie (chargement de chaque projet mesuré)
+def donnees_projets(contexte):
+    return {nom: appel_en_cache(f'Chargement {nom}', 'chargement', donnees_brutes, chemin, contexte.get('periode'))
+            for nom, chemin in contexte['chemins'].items() if os.path.exists(chemin)}
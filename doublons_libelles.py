@@ -0,0 +1,129 @@
+import re
+import unicodedata
+import numpy as np
+import pandas as pd
+
+# Nombre de fonctions de hachage MinHash, découpées en bandes pour l'index LSH (seuil de collision ≈ (1/BANDES) ** (1/LIGNES_PAR_BANDE))
+NB_HACHAGES = 64
+BANDES = 16
+LIGNES_PAR_BANDE = NB_HACHAGES // BANDES
+
+# Similarité de Jaccard estimée minimale pour rattacher deux libellés au même document
+SEUIL_SIMILARITE = 0.9
+
+# Taille des fragments de caractères comparés
+TAILLE_FRAGMENT = 4
+
+# Nombre premier de Mersenne utilisé pour les permutations MinHash
+PREMIER = (1 << 31) - 1
+
+# Mots sans valeur pour identifier un document (extensions, mentions de diffusion ou de révision)
+MOTS_IGNORES = {'pdf', 'dwg', 'doc', 'docx', 'xls', 'xlsx', 'bat', 'ind', 'indice', 'rev', 'version'}
+
+# Coefficients des permutations MinHash (fixés pour que les regroupements soient identiques d'une exécution à l'autre)
+_generateur = np.random.default_rng(20240701)
+COEFFICIENTS_A = _generateur.integers(1, PREMIER, NB_HACHAGES, dtype='uint64')
+COEFFICIENTS_B = _generateur.integers(0, PREMIER, NB_HACHAGES, dtype='uint64')
+
+# Fonction pour normaliser un libellé : sans accents ni ponctuation, sans extension, sans l'indice de révision du dépôt
+def normaliser_libelle(libelle, indice=None):
+    texte = unicodedata.normalize('NFKD', str(libelle)).encode('ascii', 'ignore').decode('ascii').lower()
+    texte = re.sub(r'\.[a-z0-9]{2,4}$', '', texte.strip())
+    indice = str(indice).strip().lower() if isinstance(indice, str) and len(indice.strip()) <= 2 else None
+    mots = [mot for mot in re.split(r'[^a-z0-9]+', texte) if mot and mot not in MOTS_IGNORES and mot != indice]
+    return ' '.join(mots)
+
+# Fonction pour extraire la clé numérique d'un libellé normalisé : deux libellés aux numéros différents (zone 6 / zone 7) ne sont jamais rapprochés
+def cle_numerique(texte):
+    return ' '.join(sorted(mot for mot in texte.split() if any(caractere.isdigit() for caractere in mot)))
+
+# Fonction pour calculer les signatures MinHash des fragments de caractères de chaque texte, pour tous les textes à la fois
+# (chaque texte est complété après encodage pour donner au moins un fragment, même s'il ne contient aucun caractère ASCII)
+def signatures_minhash(textes):
+    octets = [texte.encode('ascii', 'ignore').ljust(TAILLE_FRAGMENT) for texte in textes]
+    longueurs = np.array([len(valeur) for valeur in octets], dtype='int64')
+    tampon = np.frombuffer(b''.join(octets), dtype='uint8').astype('uint64')
+    debuts = np.cumsum(longueurs) - longueurs
+
+    # Un fragment commence à chaque position laissant TAILLE_FRAGMENT caractères dans le même texte
+    nb_fragments = longueurs - TAILLE_FRAGMENT + 1
+    premiers_fragments = np.cumsum(nb_fragments) - nb_fragments
+    positions = np.repeat(debuts - premiers_fragments, nb_fragments) + np.arange(nb_fragments.sum())
+    fragments = np.zeros(len(positions), dtype='uint64')
+    for decalage in range(TAILLE_FRAGMENT):
+        fragments = (fragments << np.uint64(8)) | tampon[positions + decalage]
+
+    signatures = np.empty((len(textes), NB_HACHAGES), dtype='uint32')
+    for rang in range(NB_HACHAGES):
+        valeurs = (COEFFICIENTS_A[rang] * fragments + COEFFICIENTS_B[rang]) % np.uint64(PREMIER)
+        signatures[:, rang] = np.minimum.reduceat(valeurs, premiers_fragments)
+    return signatures
+
+# Fonction pour fusionner les paires candidates en composantes connexes (propagation de l'étiquette minimale)
+def composantes(nb_elements, origines, destinations):
+    etiquettes = np.arange(nb_elements)
+    while True:
+        minimum = np.minimum(etiquettes[origines], etiquettes[destinations])
+        nouvelles = etiquettes.copy()
+        np.minimum.at(nouvelles, origines, minimum)
+        np.minimum.at(nouvelles, destinations, minimum)
+        nouvelles = nouvelles[nouvelles]
+        if np.array_equal(nouvelles, etiquettes):
+            return etiquettes
+        etiquettes = nouvelles
+
+# Fonction pour regrouper des textes normalisés quasi identiques : chaque bande de signature sert de clé de seau,
+# chaque texte est comparé au premier texte de ses seaux (nombre de comparaisons linéaire)
+def regrouper_textes(textes, cles_numeriques):
+    nb_textes = len(textes)
+    if nb_textes == 0:
+        return np.zeros(0, dtype='int64')
+    signatures = signatures_minhash(textes)
+    # Un libellé vide ou trop court pour former un fragment (extension seule, caractères non ASCII) n'est rapproché d'aucun autre
+    courts = np.array([len(texte.encode('ascii', 'ignore')) < TAILLE_FRAGMENT for texte in textes])
+    codes_numeriques = pd.factorize(pd.Series(cles_numeriques))[0].astype('uint32')
+    codes_numeriques[courts] = codes_numeriques.max() + 1 + np.arange(courts.sum(), dtype='uint32')
+    origines, destinations = [], []
+    for bande in range(BANDES):
+        colonnes = signatures[:, bande * LIGNES_PAR_BANDE:(bande + 1) * LIGNES_PAR_BANDE]
+        cles_seau = np.column_stack([colonnes, codes_numeriques])
+        _, premier, seau = np.unique(cles_seau, axis=0, return_index=True, return_inverse=True)
+        representant = premier[seau.ravel()]
+        candidats = np.flatnonzero(representant != np.arange(nb_textes))
+        origines.append(candidats)
+        destinations.append(representant[candidats])
+    origines = np.concatenate(origines)
+    destinations = np.concatenate(destinations)
+
+    # Vérification des candidats par la similarité estimée sur l'ensemble de la signature
+    similarite = (signatures[origines] == signatures[destinations]).mean(axis=1)
+    retenus = similarite >= SEUIL_SIMILARITE
+    return composantes(nb_textes, origines[retenus], destinations[retenus])
+
+# Fonction pour calculer la clé de document corrigée de chaque dépôt : le libellé le plus fréquent de son groupe de libellés quasi identiques
+def cle_document(donnees, colonne_libelle='Libellé du document', colonne_indice='INDICE'):
+    libelles = donnees[colonne_libelle]
+    indices = donnees[colonne_indice] if colonne_indice in donnees.columns else pd.Series(None, index=donnees.index)
+    couples = pd.DataFrame({'Libellé': libelles.to_numpy(), 'Indice': indices.to_numpy()}, index=donnees.index).dropna(subset=['Libellé'])
+    distincts = couples.drop_duplicates()
+    normalises = pd.Series([normaliser_libelle(libelle, indice) or str(libelle).lower() for libelle, indice in zip(distincts['Libellé'], distincts['Indice'])], index=distincts.index)
+    textes = normalises.unique()
+    groupes_textes = regrouper_textes(textes, [cle_numerique(texte) for texte in textes])
+
+    # Groupe de chaque dépôt, puis libellé le plus fréquent (le plus court en cas d'égalité) comme nom du groupe
+    groupe_texte = pd.Series(groupes_textes, index=textes)
+    groupes = couples.merge(distincts.assign(Groupe=groupe_texte.reindex(normalises.to_numpy()).to_numpy()), on=['Libellé', 'Indice'], how='left')['Groupe'].to_numpy()
+    frequences = pd.DataFrame({'Groupe': groupes, 'Libellé': couples['Libellé'].to_numpy()}).value_counts().reset_index(name='Nombre')
+    frequences['Longueur'] = frequences['Libellé'].str.len()
+    noms = frequences.sort_values(['Groupe', 'Nombre', 'Longueur', 'Libellé'], ascending=[True, False, True, True]).drop_duplicates('Groupe').set_index('Groupe')['Libellé']
+    return pd.Series(noms.reindex(groupes).to_numpy(), index=couples.index).reindex(donnees.index)
+
+# Fonction pour lister les regroupements de libellés proposés (documents portant plusieurs libellés)
+def regroupements_proposes(donnees, colonne_libelle='Libellé du document', colonne_cle='Document'):
+    libelles = donnees[[colonne_cle, colonne_libelle]].dropna()
+    resume = libelles.groupby(colonne_cle).agg(**{
+        'Nombre de libellés': (colonne_libelle, 'nunique'),
+        'Nombre de dépôts': (colonne_libelle, 'size'),
+        'Libellés regroupés': (colonne_libelle, lambda valeurs: ' | '.join(sorted(set(valeurs))))
+    })
+    return resume[resume['Nombre de libellés'] > 1].sort_values('Nombre de libellés', ascending=False).reset_index()
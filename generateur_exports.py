@@ -0,0 +1,225 @@
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+# Exports réels dont les distributions sont apprises (le premier fixe la disposition des colonnes de l'export généré)
+SOURCES = ['GOODLIFE.csv', 'MDLF.csv']
+
+# Nombre de lignes écrites par bloc : l'export complet n'est jamais assemblé en mémoire
+TAILLE_BLOC = 50000
+
+# Colonnes décrivant un document, reprises telles quelles d'un document réel tiré au sort
+ATTRIBUTS_DOCUMENT = ['PHASE', 'EMET', 'LOT', 'LOT1', 'NIVEAU', 'ZONE', 'TYPE DE DOCUMENT', 'Ajouté par', 'Chemin vers le fichier']
+
+# Noms possibles de la colonne du numéro de document selon les exports
+COLONNES_NUMERO = ['Numéro', 'Numéro de document']
+
+# Préfixes des colonnes d'un bloc de visa (un bloc par viseur, le nom du viseur suit le préfixe)
+PREFIXES_VISA = ['Date demande visa', 'Retard visa', 'Date visa', 'Visa', 'Visa prévu', 'Numéro chrono visa', 'Numéro interne visa',
+                 'Commentaire visa', 'Réponse commentaire visa']
+
+# Nombre maximal de valeurs distinctes gardées pour tirer les colonnes secondaires
+NB_VALEURS_TIREES = 1000
+
+# Fonction pour lire un export brut sans interprétation (toutes les colonnes en texte)
+def lire_export(chemin_export):
+    return pd.read_csv(chemin_export, encoding='iso-8859-1', sep=';', dtype=str, keep_default_na=False, na_values=[''])
+
+# Fonction pour retrouver la colonne du numéro de document d'un export
+def colonne_numero(colonnes):
+    return next((colonne for colonne in COLONNES_NUMERO if colonne in colonnes), None)
+
+# Fonction pour retrouver les viseurs d'un export à partir des colonnes 'Date demande visa...'
+def viseurs_export(colonnes):
+    return [colonne[len('Date demande visa'):] for colonne in colonnes if colonne.startswith('Date demande visa')]
+
+# Fonction pour tirer des valeurs dans un échantillon (None si l'échantillon est vide)
+def _tirer(generateur, valeurs, taille):
+    valeurs = np.asarray(valeurs, dtype=object)
+    if len(valeurs) == 0:
+        return np.full(taille, None, dtype=object)
+    return valeurs[generateur.integers(0, len(valeurs), taille)]
+
+# Fonction pour apprendre les documents d'un export réel : attributs, suite des indices, position du premier dépôt dans le projet
+def _apprendre_documents(donnees, source):
+    dates = pd.to_datetime(donnees['Date dépôt GED'], format='%d/%m/%Y', errors='coerce')
+    donnees = donnees.assign(**{'Date dépôt GED': dates}).dropna(subset=['Date dépôt GED', 'LOT', 'TYPE DE DOCUMENT'])
+    numero = colonne_numero(donnees.columns)
+    cles = ['EMET', 'LOT', 'TYPE DE DOCUMENT'] + ([numero] if numero else ['Libellé du document'])
+    donnees = donnees.sort_values('Date dépôt GED', kind='stable')
+    groupes = donnees.groupby(cles, sort=False, dropna=False)
+    attributs = [colonne for colonne in ATTRIBUTS_DOCUMENT + ['Libellé du document'] if colonne in donnees.columns]
+    documents = groupes[attributs].first().reset_index(drop=True)
+    # Un export sans numéro de lot (LOT1) reprend le libellé du lot, comme le pipeline de préparation
+    if 'LOT1' not in documents.columns:
+        documents['LOT1'] = documents['LOT']
+    documents['Indices'] = groupes['INDICE'].agg(lambda indices: indices.fillna('').tolist()).to_numpy()
+    # Jours écoulés entre le premier dépôt du document et chacune de ses versions
+    documents['Décalages'] = groupes['Date dépôt GED'].agg(lambda dates: (dates - dates.min()).dt.days.tolist()).to_numpy()
+    debut, fin = donnees['Date dépôt GED'].min(), donnees['Date dépôt GED'].max()
+    documents['Position'] = ((groupes['Date dépôt GED'].min() - debut).dt.days / max((fin - debut).days, 1)).to_numpy()
+    documents['Source'] = source
+    return documents, (fin - debut).days
+
+# Fonction pour apprendre les blocs de visa d'un export : part des visas demandés, délais, réponses données ou en attente
+def _apprendre_visas(donnees):
+    visas = {}
+    depots = pd.to_datetime(donnees['Date dépôt GED'], format='%d/%m/%Y', errors='coerce')
+    for viseur in viseurs_export(donnees.columns):
+        demande = pd.to_datetime(donnees[f'Date demande visa{viseur}'], format='%d/%m/%Y', errors='coerce')
+        prevu = pd.to_datetime(donnees[f'Visa prévu{viseur}'], format='%d/%m/%Y', errors='coerce')
+        rendu = pd.to_datetime(donnees[f'Date visa{viseur}'], format='%d/%m/%Y', errors='coerce')
+        demandes = demande.notna()
+        reponses = donnees[f'Visa{viseur}'][demandes & rendu.notna()].dropna()
+        visas[viseur] = {
+            'taux_demande': float(demandes.mean()),
+            'taux_reponse': float(rendu[demandes].notna().mean()) if demandes.any() else 0.0,
+            'delai_demande': (demande - depots)[demandes].dt.days.dropna().clip(lower=0).to_numpy(dtype='int64'),
+            'delai_prevu': (prevu - demande)[demandes].dt.days.dropna().clip(lower=0).to_numpy(dtype='int64'),
+            'delai_reponse': (rendu - demande)[demandes].dt.days.dropna().clip(lower=0).to_numpy(dtype='int64'),
+            'reponses': reponses[pd.to_numeric(reponses, errors='coerce').isna()].to_numpy()
+        }
+    return visas
+
+# Fonction pour apprendre les colonnes secondaires d'un export (taux de remplissage et échantillon de valeurs)
+def _apprendre_colonnes(donnees, colonnes):
+    secondaires = {}
+    for colonne in colonnes:
+        valeurs = donnees[colonne].dropna()
+        secondaires[colonne] = {
+            'taux': float(donnees[colonne].notna().mean()),
+            'valeurs': valeurs.drop_duplicates().head(NB_VALEURS_TIREES).to_numpy() if len(valeurs) else np.array([], dtype=object)
+        }
+    return secondaires
+
+# Fonction pour apprendre un modèle d'export à partir d'exports réels : disposition des colonnes du premier export,
+# documents de tous les exports (attributs, suites d'indices et de dates, position dans le projet)
+def apprendre_modele(sources=SOURCES):
+    exports = [lire_export(source) for source in sources]
+    reference = exports[0]
+    appris = [_apprendre_documents(donnees, source) for donnees, source in zip(exports, sources)]
+    viseurs = viseurs_export(reference.columns)
+    colonnes_visas = {f'{prefixe}{viseur}' for viseur in viseurs for prefixe in PREFIXES_VISA}
+    traitees = set(ATTRIBUTS_DOCUMENT + COLONNES_NUMERO) | colonnes_visas | {'PROJET', 'INDICE', 'Libellé du document', 'Dernier indice', 'Date dépôt GED'}
+    commentaires = pd.concat([donnees[colonne] for donnees in exports for colonne in donnees.columns
+                              if colonne == 'Commentaire libre' or colonne.startswith('Commentaire visa')]).dropna()
+    return {
+        'colonnes': list(reference.columns),
+        'documents': pd.concat([documents for documents, _ in appris], ignore_index=True),
+        'duree': int(np.median([duree for _, duree in appris])),
+        'visas': _apprendre_visas(reference),
+        'taux_commentaire_visa': float(np.mean([reference[f'Commentaire visa{viseur}'].notna().mean() for viseur in viseurs])) if viseurs else 0.0,
+        'commentaires': commentaires.to_numpy(),
+        'secondaires': _apprendre_colonnes(reference, [colonne for colonne in reference.columns if colonne not in traitees])
+    }
+
+# Fonction pour générer le squelette des dépôts : document, modèle, date et indice de chaque ligne (tableaux numériques seulement)
+def _generer_squelette(modele, nb_lignes, debut, duree, generateur):
+    documents = modele['documents']
+    versions = documents['Indices'].str.len().to_numpy()
+    tirages = []
+    total = 0
+    while total < nb_lignes:
+        tirage = generateur.integers(0, len(documents), max(int((nb_lignes - total) / versions.mean() * 1.1), 1))
+        tirages.append(tirage)
+        total += versions[tirage].sum()
+    tirage = np.concatenate(tirages)
+    nb_versions = versions[tirage]
+    document = np.repeat(np.arange(len(tirage)), nb_versions)[:nb_lignes]
+    modeles_documents = tirage[document]
+
+    # Premier dépôt placé comme dans le projet réel (position relative), versions suivantes espacées comme celles du document réel
+    premier = np.round(documents['Position'].to_numpy()[modeles_documents] * duree).astype('int64')
+    jours = premier + np.concatenate(documents['Décalages'].to_numpy()[tirage])[:nb_lignes].astype('int64')
+    indices = np.concatenate(documents['Indices'].to_numpy()[tirage])[:nb_lignes]
+    # Le dernier dépôt de chaque document porte la marque de dernier indice
+    dernier = np.r_[document[1:] != document[:-1], True]
+    return pd.DataFrame({
+        'Document': document,
+        'Modèle': modeles_documents,
+        'Date': debut + pd.to_timedelta(jours, unit='D'),
+        'INDICE': indices,
+        'Dernier': dernier
+    })
+
+# Fonction pour formater des dates au format des exports (jj/mm/aaaa, vide si manquante)
+def _formater_dates(dates):
+    return pd.Series(dates).dt.strftime('%d/%m/%Y').to_numpy()
+
+# Fonction pour générer les colonnes d'un bloc de visa pour un bloc de dépôts
+def _generer_visa(viseur, visa, modele, depots, date_export, generateur):
+    nb_lignes = len(depots)
+    demandes = generateur.random(nb_lignes) < visa['taux_demande']
+    demande = depots + pd.to_timedelta(_tirer(generateur, visa['delai_demande'] if len(visa['delai_demande']) else [0], nb_lignes).astype('int64'), unit='D')
+    prevu = demande + pd.to_timedelta(_tirer(generateur, visa['delai_prevu'] if len(visa['delai_prevu']) else [14], nb_lignes).astype('int64'), unit='D')
+    rendu = demande + pd.to_timedelta(_tirer(generateur, visa['delai_reponse'] if len(visa['delai_reponse']) else [14], nb_lignes).astype('int64'), unit='D')
+    # Réponse donnée si la date de réponse précède la date de l'export ; sinon le visa est exporté en jours restants (négatif : en retard)
+    repondus = demandes & (generateur.random(nb_lignes) < visa['taux_reponse']) & (rendu <= date_export)
+    attendus = demandes & ~repondus
+    retard = (prevu - rendu).days.to_numpy()
+    restants = (prevu - date_export).days.to_numpy()
+    commentes = repondus & (generateur.random(nb_lignes) < modele['taux_commentaire_visa'])
+    reponses = _tirer(generateur, visa['reponses'] if len(visa['reponses']) else ['VAO'], nb_lignes)
+    return {
+        f'Date demande visa{viseur}': np.where(demandes, _formater_dates(demande), None),
+        f'Retard visa{viseur}': np.where(repondus & (retard < 0), retard.astype(str), None),
+        f'Date visa{viseur}': np.where(repondus, _formater_dates(rendu), None),
+        f'Visa{viseur}': np.where(repondus, reponses, np.where(attendus, restants.astype(str), None)),
+        f'Visa prévu{viseur}': np.where(demandes, _formater_dates(prevu), None),
+        f'Commentaire visa{viseur}': np.where(commentes, _tirer(generateur, modele['commentaires'], nb_lignes), None)
+    }
+
+# Fonction pour construire les lignes d'un bloc de l'export généré, dans la disposition de l'export de référence
+def _generer_bloc(modele, squelette, projet, date_export, generateur):
+    nb_lignes = len(squelette)
+    documents = modele['documents'].iloc[squelette['Modèle'].to_numpy()].reset_index(drop=True)
+    depots = pd.DatetimeIndex(squelette['Date'])
+    colonnes = {'PROJET': np.full(nb_lignes, projet, dtype=object)}
+    for colonne in ATTRIBUTS_DOCUMENT:
+        colonnes[colonne] = documents[colonne].to_numpy() if colonne in documents.columns else np.full(nb_lignes, None, dtype=object)
+    numeros = (squelette['Document'].to_numpy() + 1).astype(str)
+    for colonne in COLONNES_NUMERO:
+        colonnes[colonne] = numeros
+    # Libellé réel complété du numéro du document généré : deux documents générés ne partagent jamais un libellé
+    libelles = documents['Libellé du document'].fillna('Document').str.rsplit('.', n=1)
+    colonnes['Libellé du document'] = (libelles.str[0] + ' ' + numeros + '.' + libelles.str[1].fillna('pdf')).to_numpy()
+    colonnes['INDICE'] = np.where(squelette['INDICE'] != '', squelette['INDICE'], None)
+    colonnes['Dernier indice'] = np.where(squelette['Dernier'], 'DI', None)
+    colonnes['Date dépôt GED'] = _formater_dates(depots)
+    for colonne, secondaire in modele['secondaires'].items():
+        remplis = generateur.random(nb_lignes) < secondaire['taux']
+        valeurs = modele['commentaires'] if colonne == 'Commentaire libre' else secondaire['valeurs']
+        colonnes[colonne] = np.where(remplis, _tirer(generateur, valeurs, nb_lignes), None)
+    for viseur, visa in modele['visas'].items():
+        colonnes.update(_generer_visa(viseur, visa, modele, depots, date_export, generateur))
+    return pd.DataFrame(colonnes).reindex(columns=modele['colonnes'])
+
+# Fonction pour générer un export GED synthétique de nb_lignes dépôts (latin-1, séparateur ';', commentaires multilignes entre guillemets),
+# écrit bloc par bloc dans l'ordre chronologique des dépôts
+def generer_export(modele, nb_lignes, chemin_sortie, graine=0, debut='2023-01-02', duree=None, projet='SYN', taille_bloc=TAILLE_BLOC):
+    generateur = np.random.default_rng(graine)
+    duree = modele['duree'] if duree is None else duree
+    squelette = _generer_squelette(modele, nb_lignes, pd.Timestamp(debut), duree, generateur)
+    squelette = squelette.sort_values('Date', kind='stable').reset_index(drop=True)
+    date_export = squelette['Date'].max() + pd.Timedelta(days=1)
+    with open(chemin_sortie, 'w', encoding='iso-8859-1', errors='replace', newline='') as fichier:
+        for position in range(0, max(len(squelette), 1), taille_bloc):
+            bloc = _generer_bloc(modele, squelette.iloc[position:position + taille_bloc], projet, date_export, generateur)
+            bloc.to_csv(fichier, sep=';', index=False, header=position == 0, lineterminator='\r\n')
+    return chemin_sortie
+
+# Exécution en ligne de commande : python generateur_exports.py --lignes 100000 --sortie SYN_100k.csv
+if __name__ == '__main__':
+    analyseur = argparse.ArgumentParser(description="Génère un export GED synthétique aux distributions apprises sur des exports réels")
+    analyseur.add_argument('--lignes', type=int, default=10000, help="nombre de dépôts générés")
+    analyseur.add_argument('--sortie', help="fichier CSV généré (par défaut : SYN_<lignes>.csv)")
+    analyseur.add_argument('--sources', nargs='+', default=SOURCES, help="exports réels appris (le premier fixe la disposition des colonnes)")
+    analyseur.add_argument('--graine', type=int, default=0, help="graine du générateur aléatoire")
+    analyseur.add_argument('--debut', default='2023-01-02', help="date du premier dépôt possible (aaaa-mm-jj)")
+    analyseur.add_argument('--duree', type=int, help="durée du projet en jours (par défaut : médiane des exports appris)")
+    arguments = analyseur.parse_args()
+    sortie = arguments.sortie or f'SYN_{arguments.lignes}.csv'
+    generer_export(apprendre_modele(arguments.sources), arguments.lignes, sortie, arguments.graine, arguments.debut, arguments.duree,
+                   os.path.splitext(os.path.basename(sortie))[0])
+    print(f"{arguments.lignes} dépôts générés -> {sortie}")
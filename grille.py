@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from telechargements import afficher_telechargement
+
+# Tailles de page proposées dans la grille
+TAILLES_PAGE = [25, 50, 100, 250]
+
+# Fonction pour formater une date à l'affichage d'une page
+def formater_date(valeur):
+    return valeur.strftime('%d %b %Y') if pd.notna(valeur) else ''
+
+# Fonction pour trier une colonne en renvoyant les positions (valeurs manquantes en fin de tableau)
+def _ordre_colonne(valeurs):
+    valeurs = valeurs.reset_index(drop=True)
+    try:
+        ordre = valeurs.sort_values(kind='mergesort', na_position='last').index.to_numpy()
+    except TypeError:
+        # Colonnes de types mélangés : on trie sur la représentation texte
+        ordre = valeurs.astype(str).where(valeurs.notna()).sort_values(kind='mergesort', na_position='last').index.to_numpy()
+    return ordre, int(valeurs.isna().sum())
+
+# Fonction pour précalculer les index de tri et les textes de recherche de chaque colonne
+@st.cache_data(show_spinner=False)
+def calculer_index_grille(tableau):
+    index_tri = {}
+    textes = {}
+    for colonne in tableau.columns:
+        index_tri[colonne] = _ordre_colonne(tableau[colonne])
+        textes[colonne] = tableau[colonne].astype(str).str.lower()
+    return index_tri, textes
+
+# Fonction pour calculer les positions visibles après filtre et tri, côté serveur
+def positions_triees(index_tri, textes, nb_lignes, colonne_tri=None, croissant=True, colonne_filtre=None, motif=''):
+    if colonne_tri is None:
+        ordre = np.arange(nb_lignes)
+    else:
+        ordre, nb_manquants = index_tri[colonne_tri]
+        if not croissant:
+            nb_valides = nb_lignes - nb_manquants
+            ordre = np.concatenate([ordre[:nb_valides][::-1], ordre[nb_valides:]])
+    if colonne_filtre is not None and motif:
+        masque = textes[colonne_filtre].str.contains(motif.lower(), regex=False).to_numpy()
+        ordre = ordre[masque[ordre]]
+    return ordre
+
+# Fonction pour afficher un tableau paginé, triable et filtrable : seule la page visible est envoyée au navigateur
+def afficher_grille(tableau, cle, taille_page=50, style=None, formats=None, hauteur=None):
+    tableau = tableau.reset_index(drop=True)
+    if tableau.empty:
+        st.dataframe(tableau)
+        return
+    index_tri, textes = calculer_index_grille(tableau)
+    colonnes = list(tableau.columns)
+
+    col1, col2, col3, col4 = st.columns([2, 1, 2, 2])
+    with col1:
+        colonne_tri = st.selectbox('Trier par', ['(aucun)'] + colonnes, key=f'{cle}_tri')
+    with col2:
+        ordre_tri = st.radio('Ordre', ['Croissant', 'Décroissant'], key=f'{cle}_ordre')
+    with col3:
+        colonne_filtre = st.selectbox('Filtrer la colonne', colonnes, key=f'{cle}_colonne_filtre')
+    with col4:
+        motif = st.text_input('Contient', key=f'{cle}_motif')
+
+    positions = positions_triees(
+        index_tri, textes, len(tableau),
+        colonne_tri=None if colonne_tri == '(aucun)' else colonne_tri,
+        croissant=ordre_tri == 'Croissant',
+        colonne_filtre=colonne_filtre,
+        motif=motif
+    )
+
+    col5, col6, col7 = st.columns([1, 1, 2])
+    with col5:
+        taille_page = st.selectbox('Lignes par page', TAILLES_PAGE, index=TAILLES_PAGE.index(taille_page) if taille_page in TAILLES_PAGE else 1, key=f'{cle}_taille')
+    nb_pages = max(1, -(-len(positions) // taille_page))
+    with col6:
+        page = st.number_input('Page', min_value=1, max_value=nb_pages, value=1, step=1, key=f'{cle}_page')
+    debut = (int(page) - 1) * taille_page
+    fin = min(debut + taille_page, len(positions))
+    with col7:
+        st.caption(f"Lignes {debut + 1 if fin else 0}–{fin} sur {len(positions)} (page {int(page)}/{nb_pages})")
+
+    # Téléchargement de la vue filtrée et triée complète (toutes les pages, valeurs non mises en forme)
+    afficher_telechargement(tableau, cle, nom_fichier=cle, positions=positions, etat_vue=(colonne_tri, ordre_tri, colonne_filtre, motif))
+
+    page_tableau = tableau.iloc[positions[debut:fin]]
+    # Mise en forme uniquement sur la page affichée
+    if formats:
+        page_tableau = page_tableau.copy()
+        for colonne, formateur in formats.items():
+            if colonne in page_tableau.columns:
+                page_tableau[colonne] = page_tableau[colonne].map(formateur)
+    if style is not None:
+        page_tableau = style(page_tableau)
+    if hauteur is not None:
+        st.dataframe(page_tableau, height=hauteur)
+    else:
+        st.dataframe(page_tableau)
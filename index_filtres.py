@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+# Colonnes filtrables indexées pour chaque projet
+COLONNES_INDEXEES = ['LOT', 'TYPE DE DOCUMENT', 'INDICE', 'EMET']
+
+# Fonction pour construire l'index d'une colonne : code de chaque ligne (valeurs triées, -1 pour une valeur manquante)
+# et un ensemble de bits compacté par valeur distincte (bit i à 1 si la ligne i porte la valeur)
+def _indexer_colonne(valeurs):
+    codes, distinctes = pd.factorize(valeurs, sort=True)
+    nb_lignes = len(codes)
+    nb_octets = (nb_lignes + 7) // 8
+    # Lignes regroupées par valeur : chaque ensemble de bits est rempli à partir des seules positions de sa valeur
+    ordre = np.argsort(codes, kind='stable')
+    bornes = np.searchsorted(codes[ordre], np.arange(len(distinctes) + 1))
+    bits = np.zeros((len(distinctes), nb_octets), dtype=np.uint8)
+    for code in range(len(distinctes)):
+        positions = ordre[bornes[code]:bornes[code + 1]]
+        # Les positions d'un même octet ont des bits distincts : leur somme est leur union
+        bits[code] = np.bincount(positions >> 3, weights=128 >> (positions & 7), minlength=nb_octets).astype(np.uint8)
+    return {
+        'valeurs': np.asarray(distinctes),
+        'positions': {valeur: code for code, valeur in enumerate(distinctes)},
+        'codes': codes.astype(np.int32),
+        'bits': bits
+    }
+
+# Fonction pour construire l'index des filtres d'un projet sur les colonnes filtrables présentes
+# (debut : position de la première ligne couverte, non nulle pour un index restreint à une tranche de lignes)
+def construire_index_filtres(donnees, colonnes=COLONNES_INDEXEES):
+    return {
+        'nb_lignes': len(donnees),
+        'debut': 0,
+        'colonnes': {colonne: _indexer_colonne(donnees[colonne]) for colonne in colonnes if colonne in donnees.columns}
+    }
+
+# Fonction pour restreindre un index à une tranche de lignes [début, fin[ (sans copie : les codes sont des vues,
+# les ensembles de bits restent ceux du projet ; les positions renvoyées sont relatives à la tranche)
+def restreindre_index(index, debut, fin):
+    restreint = {
+        'nb_lignes': fin - debut,
+        'debut': index['debut'] + debut,
+        'colonnes': {colonne: dict(index_colonne, codes=index_colonne['codes'][debut:fin]) for colonne, index_colonne in index['colonnes'].items()}
+    }
+    if 'jours' in index:
+        restreint['jours'] = index['jours'][debut:fin]
+    return restreint
+
+# Fonction pour combiner des filtres sur l'index : union des valeurs choisies dans une colonne, intersection entre colonnes
+# (filtres = {colonne: valeurs} ; une colonne sans valeur choisie ne filtre pas ; None si aucun filtre ne s'applique)
+def selection(index, filtres):
+    resultat = None
+    for colonne, valeurs in filtres.items():
+        if valeurs is None or len(valeurs) == 0:
+            continue
+        index_colonne = index['colonnes'][colonne]
+        codes = [index_colonne['positions'][valeur] for valeur in valeurs if valeur in index_colonne['positions']]
+        bits = np.bitwise_or.reduce(index_colonne['bits'][codes], axis=0) if codes else np.zeros(index_colonne['bits'].shape[1], dtype=np.uint8)
+        resultat = bits if resultat is None else resultat & bits
+    return resultat
+
+# Fonction pour obtenir les positions des lignes sélectionnées (toutes les lignes si la sélection est None)
+def positions_selection(index, bits):
+    if bits is None:
+        return np.arange(index['nb_lignes'])
+    return np.flatnonzero(np.unpackbits(bits, count=index['debut'] + index['nb_lignes'])[index['debut']:])
+
+# Fonction pour obtenir les positions des lignes qui satisfont des filtres
+def filtrer_positions(index, filtres):
+    return positions_selection(index, selection(index, filtres))
+
+# Fonction pour compter les lignes sélectionnées par combinaison de valeurs des colonnes indexées, sans copier les données
+# (même résultat que donnees.iloc[positions].groupby(colonnes).size() : combinaisons présentes, triées, valeurs manquantes exclues)
+def compter_combinaisons(index, colonnes, positions=None, nom='Nombre de documents'):
+    index_colonnes = [index['colonnes'][colonne] for colonne in colonnes]
+    codes = [index_colonne['codes'] if positions is None else index_colonne['codes'][positions] for index_colonne in index_colonnes]
+    tailles = [len(index_colonne['valeurs']) for index_colonne in index_colonnes]
+    presents = np.logical_and.reduce([code >= 0 for code in codes])
+    combinaison = np.ravel_multi_index([code[presents] for code in codes], tailles)
+    comptes = np.bincount(combinaison, minlength=int(np.prod(tailles)))
+    non_nuls = np.flatnonzero(comptes)
+    tableau = pd.DataFrame({colonne: index_colonne['valeurs'][code]
+                            for colonne, index_colonne, code in zip(colonnes, index_colonnes, np.unravel_index(non_nuls, tailles))})
+    tableau[nom] = comptes[non_nuls]
+    return tableau
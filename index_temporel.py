@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+# Origine des numéros de jour
+EPOQUE = pd.Timestamp('1970-01-01')
+
+# Horizon maximal proposé pour la masse de documents, en mois
+HORIZON_MAX_MOIS = 36
+
+# Fonction pour convertir une date en numéro de jour
+def numero_jour(date):
+    return (pd.Timestamp(date).normalize() - EPOQUE).days
+
+# Fonction pour calculer les numéros de jour des dépôts d'un tableau trié par date
+# (les dépôts sans date, placés en fin de tableau, n'ont pas de numéro)
+def jours_tries(dates):
+    dates = pd.Series(dates).to_numpy(dtype='datetime64[ns]')
+    return ((dates[~np.isnat(dates)] - np.datetime64(EPOQUE, 'ns')) // np.timedelta64(1, 'D')).astype('int64')
+
+# Fonction pour calculer la tranche de lignes [début, fin[ d'une période dans un tableau trié par date, par recherche dichotomique
+# (bornes incluses ; sans borne, la tranche commence au premier dépôt ou s'arrête au dernier dépôt daté)
+def tranche_periode(jours, debut=None, fin=None):
+    premiere = 0 if debut is None else int(np.searchsorted(jours, numero_jour(debut), side='left'))
+    derniere = len(jours) if fin is None else int(np.searchsorted(jours, numero_jour(fin), side='right'))
+    return premiere, max(premiere, derniere)
+
+# Fonction pour calculer les dates de début et de fin d'une période d'analyse à partir du premier dépôt daté
+# ('6 mois', '1 an' ou toute la période ; jours : numéros de jour triés)
+def bornes_periode(jours, periode):
+    if len(jours) == 0:
+        return None, None
+    debut = EPOQUE + pd.Timedelta(days=int(jours[0]))
+    if periode == '6 mois':
+        return debut, debut + pd.Timedelta(days=180)
+    if periode == '1 an':
+        return debut, debut + pd.Timedelta(days=365)
+    return debut, EPOQUE + pd.Timedelta(days=int(jours[-1]))
+
+# Fonction pour construire l'index temporel d'un projet à partir des numéros de jour triés de ses dépôts :
+# nombre cumulé de dépôts à chaque jour depuis le premier dépôt (cumul[j] = dépôts déposés au plus j jours après le début du projet)
+def construire_index(jours):
+    if len(jours) == 0:
+        return {'debut': None, 'cumul': np.zeros(0, dtype='int64')}
+    debut = int(jours[0])
+    return {'debut': debut, 'cumul': np.cumsum(np.bincount(jours - debut))}
+
+# Fonction pour lire le nombre de dépôts déposés au plus j jours après le début du projet (0 avant le début)
+def masse_au_jour(index, jour):
+    if jour < 0:
+        return 0
+    return int(index['cumul'][min(jour, len(index['cumul']) - 1)])
+
+# Fonction pour convertir une fenêtre de dates en jours depuis le début du projet (None : tout le projet)
+def jours_fenetre(index, periode=None):
+    if periode is None:
+        return 0, len(index['cumul']) - 1
+    return max(numero_jour(periode[0]) - index['debut'], 0), numero_jour(periode[1]) - index['debut']
+
+# Fonction pour obtenir la date de début d'un projet
+def date_debut(index):
+    return None if index['debut'] is None else EPOQUE + pd.Timedelta(days=index['debut'])
+
+# Fonction pour obtenir la date de fin d'un horizon donné en mois (None : toute la période)
+def date_horizon(index, mois=None):
+    if index['debut'] is None:
+        return None
+    if mois is None:
+        return date_debut(index) + pd.Timedelta(days=len(index['cumul']) - 1)
+    return date_debut(index) + pd.DateOffset(months=mois)
+
+# Fonction pour lire la masse de documents déposés depuis le premier dépôt du projet jusqu'à un horizon en mois
+# (deux lectures ; avec une fenêtre de dates, seuls les dépôts de la fenêtre sont comptés)
+def masse_a_horizon(index, mois=None, periode=None):
+    if index['debut'] is None:
+        return 0
+    premier, dernier = jours_fenetre(index, periode)
+    dernier = min(dernier, (date_horizon(index, mois) - date_debut(index)).days)
+    return max(masse_au_jour(index, dernier) - masse_au_jour(index, premier - 1), 0)
+
+# Fonction pour assembler les courbes de masse cumulée de plusieurs projets, alignées sur leur premier dépôt
+# (avec une fenêtre de dates, chaque courbe part de 0 au début de la fenêtre)
+def courbes_masse(index_projets, periode=None):
+    courbes = []
+    for projet, index in index_projets.items():
+        if index['debut'] is None:
+            continue
+        premier, dernier = jours_fenetre(index, periode)
+        dernier = min(dernier, len(index['cumul']) - 1)
+        if premier > dernier:
+            continue
+        # Seuls les jours où la masse change (et les bornes de la fenêtre) sont gardés : la courbe est tracée en escalier
+        cumul = index['cumul'][premier:dernier + 1] - masse_au_jour(index, premier - 1)
+        jours = np.flatnonzero(np.diff(cumul, prepend=0) != 0)
+        jours = np.union1d(jours, [0, len(cumul) - 1])
+        courbes.append(pd.DataFrame({'Projet': projet, 'Jours depuis le début': premier + jours, 'Masse cumulée': cumul[jours]}))
+    if not courbes:
+        return pd.DataFrame(columns=['Projet', 'Jours depuis le début', 'Masse cumulée'])
+    return pd.concat(courbes, ignore_index=True)
@@ -0,0 +1,209 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from pipeline_documents import DOSSIER_DERIVES
+
+# Fichier des mesures : une ligne JSON par relance du tableau de bord
+FICHIER_MESURES = os.path.join(DOSSIER_DERIVES, 'instrumentation.jsonl')
+
+# Nombre de relances détaillées dans le panneau d'administration
+NB_RELANCES = 20
+
+# Nombre de relances récentes sur lesquelles les percentiles de chaque onglet sont calculés
+FENETRE_PERCENTILES = 500
+
+# Paramètre d'URL qui affiche le panneau d'administration (?admin=1)
+PARAMETRE_ADMIN = 'admin'
+
+# Catégories des étapes mesurées, dans l'ordre de présentation
+CATEGORIES = ['chargement', 'prétraitement', 'agrégation', 'graphique']
+
+# Mesures de la relance en cours, propres au fil d'exécution de chaque session
+_local = threading.local()
+_verrou = threading.Lock()
+
+# Fonction pour obtenir la relance en cours dans ce fil d'exécution (None hors relance mesurée)
+def relance_courante():
+    return getattr(_local, 'relance', None)
+
+# Fonction pour signaler qu'une fonction en cache a été réellement exécutée (appelée dans le corps des fonctions en cache)
+def noter_calcul():
+    _local.calculs = getattr(_local, 'calculs', 0) + 1
+
+# Fonction pour compter les octets envoyés au navigateur pendant la relance (messages de la session)
+def _compter_octets(relance, envoyer):
+    def envoyer_compte(message):
+        relance['octets'] += message.ByteSize()
+        envoyer(message)
+    return envoyer_compte
+
+# Fonction pour mesurer une relance du tableau de bord et l'ajouter au fichier des mesures : relance complète du script,
+# ou partielle quand seul le fragment d'un onglet est relancé (à l'intérieur d'une relance déjà mesurée, la relance en cours est reprise)
+@contextmanager
+def relance(fichier=FICHIER_MESURES, partielle=False):
+    if relance_courante() is not None:
+        yield relance_courante()
+        return
+    contexte = get_script_run_ctx()
+    session = contexte.session_id if contexte is not None else None
+    relance = {'horodatage': time.time(), 'session': session, 'partielle': partielle, 'onglet': None, 'projet': None, 'duree_ms': None,
+               'octets': 0, 'etapes': [], 'pile': [{'enfants': 0.0}]}
+    envoyer = contexte._enqueue if contexte is not None else None
+    if contexte is not None:
+        contexte._enqueue = _compter_octets(relance, envoyer)
+    _local.relance = relance
+    debut = time.perf_counter()
+    try:
+        yield relance
+    finally:
+        relance['duree_ms'] = round((time.perf_counter() - debut) * 1000, 1)
+        _local.relance = None
+        if contexte is not None:
+            contexte._enqueue = envoyer
+        del relance['pile']
+        enregistrer_relance(relance, fichier)
+
+# Fonction pour mesurer une étape de la relance en cours : durée, lignes traitées, octets envoyés au navigateur
+# (l'étape est ignorée hors relance mesurée ; les lignes et l'état du cache peuvent être complétés dans le bloc)
+@contextmanager
+def etape(nom, categorie, lignes=None):
+    relance = relance_courante()
+    mesure = {'nom': nom, 'categorie': categorie, 'lignes': lignes, 'cache': None}
+    if relance is None:
+        yield mesure
+        return
+    relance['pile'].append({'enfants': 0.0})
+    octets = relance['octets']
+    debut = time.perf_counter()
+    try:
+        yield mesure
+    finally:
+        duree = (time.perf_counter() - debut) * 1000
+        enfants = relance['pile'].pop()['enfants']
+        relance['pile'][-1]['enfants'] += duree
+        mesure.update(duree_ms=round(duree, 1), octets=relance['octets'] - octets)
+        if categorie == 'onglet':
+            # Temps de l'onglet hors chargement et tracés mesurés : agrégations et mise en forme des données
+            relance['onglet'] = nom
+            relance['etapes'].append({'nom': 'Agrégation et mise en forme', 'categorie': 'agrégation', 'lignes': mesure['lignes'],
+                                      'cache': None, 'duree_ms': round(duree - enfants, 1), 'octets': None})
+        relance['etapes'].append(mesure)
+
+# Fonction pour appeler une fonction en cache en notant si le résultat vient du cache (la fonction appelle noter_calcul quand elle s'exécute)
+def appel_en_cache(nom, categorie, fonction, *arguments):
+    with etape(nom, categorie) as mesure:
+        calculs = getattr(_local, 'calculs', 0)
+        resultat = fonction(*arguments)
+        mesure['cache'] = 'miss' if getattr(_local, 'calculs', 0) > calculs else 'hit'
+        mesure['lignes'] = len(resultat) if isinstance(resultat, pd.DataFrame) else None
+    return resultat
+
+# Fonction pour compter les points tracés d'une figure Plotly (abscisses, ordonnées ou libellés de chaque trace)
+def _points_figure(figure):
+    return sum(max((len(valeurs) for valeurs in (getattr(trace, cle, None) for cle in ('x', 'y', 'labels')) if valeurs is not None), default=0)
+               for trace in figure.data)
+
+# Fonction pour afficher une figure Plotly en mesurant le temps d'envoi et la taille de la figure envoyée au navigateur
+def tracer_graphique(figure, **options):
+    nom = figure.layout.title.text or 'Graphique'
+    with etape(nom, 'graphique', _points_figure(figure)):
+        st.plotly_chart(figure, **options)
+
+# Fonction pour ajouter une relance au fichier des mesures
+def enregistrer_relance(relance, fichier=FICHIER_MESURES):
+    os.makedirs(os.path.dirname(fichier) or '.', exist_ok=True)
+    ligne = json.dumps(relance, ensure_ascii=False)
+    with _verrou:
+        with open(fichier, 'a', encoding='utf-8') as sortie:
+            sortie.write(ligne + '\n')
+
+# Fonction pour lire les dernières relances enregistrées
+def lire_relances(nb_relances=FENETRE_PERCENTILES, fichier=FICHIER_MESURES):
+    if not os.path.exists(fichier):
+        return []
+    with _verrou:
+        with open(fichier, encoding='utf-8') as entree:
+            lignes = deque(entree, maxlen=nb_relances)
+    return [json.loads(ligne) for ligne in lignes if ligne.strip()]
+
+# Fonction pour présenter des relances (une ligne par relance, durée par catégorie d'étape)
+def tableau_relances(relances):
+    lignes = []
+    for relance in relances:
+        ligne = {
+            'Heure': pd.Timestamp(relance['horodatage'], unit='s').strftime('%d/%m %H:%M:%S'),
+            'Onglet': relance['onglet'],
+            'Relance': 'partielle' if relance.get('partielle') else 'complète',
+            'Projet': relance['projet'],
+            'Durée (ms)': relance['duree_ms'],
+            'Envoyé (ko)': round(relance['octets'] / 1024, 1) if relance['octets'] is not None else None
+        }
+        for categorie in CATEGORIES:
+            etapes = [etape_relance for etape_relance in relance['etapes'] if etape_relance['categorie'] == categorie]
+            ligne[f'{categorie.capitalize()} (ms)'] = round(sum(etape_relance['duree_ms'] for etape_relance in etapes), 1) if etapes else None
+        caches = [etape_relance['cache'] for etape_relance in relance['etapes'] if etape_relance['cache'] is not None]
+        ligne['Cache'] = f"{caches.count('hit')} hit / {caches.count('miss')} miss" if caches else ''
+        ligne['Lignes'] = max((etape_relance['lignes'] or 0 for etape_relance in relance['etapes']), default=0)
+        lignes.append(ligne)
+    return pd.DataFrame(lignes)
+
+# Fonction pour présenter les étapes d'une relance
+def tableau_etapes(relance):
+    return pd.DataFrame([{
+        'Étape': etape_relance['nom'],
+        'Catégorie': etape_relance['categorie'],
+        'Durée (ms)': etape_relance['duree_ms'],
+        'Lignes': etape_relance['lignes'],
+        'Envoyé (ko)': round(etape_relance['octets'] / 1024, 1) if etape_relance['octets'] is not None else None,
+        'Cache': etape_relance['cache']
+    } for etape_relance in relance['etapes']])
+
+# Fonction pour calculer les percentiles 50 et 95 des durées de chaque onglet (relances complètes, relances partielles et chaque catégorie d'étape)
+def percentiles_onglets(relances):
+    lignes = []
+    for relance in relances:
+        if relance['onglet'] is None:
+            continue
+        mesure = 'Relance partielle (onglet seul)' if relance.get('partielle') else 'Relance complète'
+        lignes.append({'Onglet': relance['onglet'], 'Mesure': mesure, 'Durée (ms)': relance['duree_ms']})
+        for categorie in CATEGORIES:
+            durees = [etape_relance['duree_ms'] for etape_relance in relance['etapes'] if etape_relance['categorie'] == categorie]
+            if durees:
+                lignes.append({'Onglet': relance['onglet'], 'Mesure': categorie.capitalize(), 'Durée (ms)': sum(durees)})
+    if not lignes:
+        return pd.DataFrame(columns=['Onglet', 'Mesure', 'Relances', 'p50 (ms)', 'p95 (ms)'])
+    groupes = pd.DataFrame(lignes).groupby(['Onglet', 'Mesure'], sort=False)['Durée (ms)']
+    return pd.DataFrame({
+        'Relances': groupes.size(),
+        'p50 (ms)': groupes.quantile(0.5).round(1),
+        'p95 (ms)': groupes.quantile(0.95).round(1)
+    }).reset_index()
+
+# Fonction pour savoir si le panneau d'administration est demandé dans l'URL
+def panneau_demande():
+    return st.query_params.get(PARAMETRE_ADMIN) == '1'
+
+# Fonction pour afficher le panneau d'administration : dernières relances, détail d'une relance, percentiles par onglet
+def afficher_panneau(fichier=FICHIER_MESURES):
+    relances = lire_relances(FENETRE_PERCENTILES, fichier)
+    with st.expander("Instrumentation du tableau de bord", expanded=True):
+        if not relances:
+            st.write("Aucune relance mesurée pour l'instant.")
+            return
+        st.caption(f"{len(relances)} relances lues dans {fichier}")
+        # Relances les plus récentes en premier
+        recentes = relances[-NB_RELANCES:][::-1]
+        resume = tableau_relances(recentes)
+        st.subheader(f"{len(recentes)} dernières relances")
+        st.dataframe(resume, hide_index=True, use_container_width=True)
+        choix = st.selectbox('Détail de la relance', range(len(recentes)), key='instrumentation_relance',
+                             format_func=lambda position: f"{resume['Heure'][position]} - {resume['Onglet'][position]}")
+        st.dataframe(tableau_etapes(recentes[choix]), hide_index=True, use_container_width=True)
+        st.subheader("Percentiles par onglet")
+        st.dataframe(percentiles_onglets(relances), hide_index=True, use_container_width=True)
@@ -0,0 +1,299 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+import streamlit as st
+from regles_alertes import charger_regles, evaluer_regles
+from anomalies_depots import compter_depots_journaliers, creer_etat_anomalies, integrer_comptes, resumer_anomalies
+
+# Colonnes de regroupement pour lesquelles les alertes sont calculées
+REGROUPEMENTS = ['LOT', 'TYPE DE DOCUMENT']
+
+# Colonnes identifiant un dépôt, pour repérer les nouvelles lignes d'un export
+COLONNES_DEPOT = REGROUPEMENTS + ['INDICE', 'Libellé du document', 'Date dépôt GED']
+
+# Compteurs additifs tenus par groupe et par indice, en plus du nombre de documents
+COMPTEURS_VISAS = ['Visas demandés', 'Visas en retard']
+
+# Clés d'un groupe d'alerte
+CLES_GROUPE = ['Projet', 'Regroupement', 'Groupe']
+
+# Valeur utilisée pour les indices manquants : comptés dans le total, exclus des indices distincts
+INDICE_MANQUANT = ''
+
+# Fonction pour repérer les colonnes lues dans un export : identification du dépôt et blocs de visas
+def _colonne_alertes(colonne):
+    return colonne in COLONNES_DEPOT or colonne.startswith('Date demande visa') or (colonne.startswith('Visa') and not colonne.startswith('Visa prévu'))
+
+# Fonction pour lire uniquement les colonnes utiles aux alertes d'un export GED et les réduire en compteurs par dépôt
+def lire_export_alertes(chemin_fichier):
+    donnees = pd.read_csv(chemin_fichier, encoding='iso-8859-1', sep=';', usecols=_colonne_alertes, dtype=str)
+    demandes = [colonne for colonne in donnees.columns if colonne.startswith('Date demande visa')]
+    visas = [colonne for colonne in donnees.columns if colonne.startswith('Visa')]
+
+    # Un visa encore attendu est exporté en jours restants : négatif, il est en retard
+    jours_restants = donnees[visas].apply(pd.to_numeric, errors='coerce')
+    depots = donnees[COLONNES_DEPOT].copy()
+    depots['Visas demandés'] = donnees[demandes].notna().sum(axis=1).astype('int64')
+    depots['Visas en retard'] = (jours_restants < 0).sum(axis=1).astype('int64')
+    dates = pd.to_datetime(depots['Date dépôt GED'], format='%d/%m/%Y', errors='coerce')
+    depots['Jour dépôt'] = (dates - pd.Timestamp('1970-01-01')).dt.days.astype('float64')
+    return depots
+
+# Fonction pour empiler les dépôts une fois par regroupement (une seule passe pour LOT et TYPE)
+def _empiler(depots, colonnes):
+    nb_lignes = len(depots)
+    empile = {
+        'Regroupement': np.repeat(REGROUPEMENTS, nb_lignes),
+        'Groupe': np.concatenate([depots[colonne].to_numpy() for colonne in REGROUPEMENTS]),
+        'INDICE': np.tile(depots['INDICE'].fillna(INDICE_MANQUANT).to_numpy(), len(REGROUPEMENTS))
+    }
+    for colonne in colonnes:
+        empile[colonne] = np.tile(depots[colonne].to_numpy(), len(REGROUPEMENTS))
+    return pd.DataFrame(empile)
+
+# Fonction pour compter les dépôts par groupe et par jour, pour tous les regroupements
+def comptes_journaliers(depots):
+    nb_lignes = len(depots)
+    return compter_depots_journaliers(
+        np.repeat(REGROUPEMENTS, nb_lignes),
+        np.concatenate([depots[colonne].to_numpy() for colonne in REGROUPEMENTS]),
+        np.tile(depots['Jour dépôt'].to_numpy(), len(REGROUPEMENTS))
+    )
+
+# Fonction pour construire l'histogramme des indices par groupe, pour tous les regroupements en une seule passe
+def construire_histogramme(depots, projet):
+    empile = _empiler(depots, COMPTEURS_VISAS + ['Jour dépôt'])
+    histogramme = empile.groupby(['Regroupement', 'Groupe', 'INDICE'], sort=False).agg(**{
+        'Nombre de documents': ('INDICE', 'size'),
+        'Visas demandés': ('Visas demandés', 'sum'),
+        'Visas en retard': ('Visas en retard', 'sum'),
+        'Dernier dépôt': ('Jour dépôt', 'max')
+    }).reset_index()
+    histogramme.insert(0, 'Projet', projet)
+    return histogramme
+
+# Fonction pour agréger un histogramme d'indices en métriques par groupe (sans appliquer de règle)
+def agreger_histogramme(histogramme, cles=('Projet', 'Regroupement', 'Groupe')):
+    cles = list(cles)
+    groupes = histogramme.groupby(cles)
+    total = groupes['Nombre de documents'].transform('sum')
+    valides = histogramme[histogramme['INDICE'] != INDICE_MANQUANT]
+    valides = valides.assign(Proportion=(valides['Nombre de documents'] / total[valides.index] * 100).round(2))
+
+    # Les deux indices les plus fréquents de chaque groupe
+    valides = valides.sort_values(cles + ['Proportion'], ascending=[True] * len(cles) + [False])
+    rang = valides.groupby(cles).cumcount()
+    somme_top_deux = valides[rang < 2].groupby(cles)['Proportion'].sum().round(0)
+
+    agregats = valides.groupby(cles).agg(**{
+        'Compteur Indice': ('INDICE', 'size'),
+        'Dernier Indice': ('INDICE', 'max')
+    })
+    agregats['Somme des deux principales proportions'] = somme_top_deux
+    agregats['Nombre de dépôts'] = groupes['Nombre de documents'].sum()
+    for colonne in COMPTEURS_VISAS:
+        agregats[colonne] = groupes[colonne].sum() if colonne in histogramme.columns else np.nan
+    agregats['Dernier dépôt'] = groupes['Dernier dépôt'].max()
+    agregats['Taux de visas en retard'] = (agregats['Visas en retard'] / agregats['Visas demandés'].where(agregats['Visas demandés'] > 0) * 100).round(1)
+    return agregats.reset_index()
+
+# Fonction pour compléter les métriques relatives au projet (jours écoulés depuis le dernier dépôt de chaque groupe)
+def completer_metriques(agregats, cles_reference=('Projet',)):
+    reference = agregats.groupby(list(cles_reference))['Dernier dépôt'].transform('max')
+    return agregats.assign(**{'Jours sans dépôt': reference - agregats['Dernier dépôt']})
+
+# Fonction pour classer chaque groupe d'un histogramme d'indices selon les règles d'alerte
+def classer_histogramme(histogramme, cles=('Projet', 'Regroupement', 'Groupe'), regles=None):
+    regles = charger_regles() if regles is None else regles
+    cles_reference = [cle for cle in cles if cle not in ('Regroupement', 'Groupe')]
+    return evaluer_regles(completer_metriques(agreger_histogramme(histogramme, cles), cles_reference), regles)
+
+# Fonction pour calculer l'empreinte de chaque dépôt d'un export
+def empreintes_depots(depots):
+    return pd.util.hash_pandas_object(depots[COLONNES_DEPOT + COMPTEURS_VISAS], index=False)
+
+# Fonction pour créer un histogramme d'indices vide
+def histogramme_vide():
+    colonnes = {colonne: pd.Series(dtype=object) for colonne in CLES_GROUPE + ['INDICE']}
+    colonnes.update({colonne: pd.Series(dtype='int64') for colonne in ['Nombre de documents'] + COMPTEURS_VISAS})
+    colonnes['Dernier dépôt'] = pd.Series(dtype='float64')
+    return pd.DataFrame(colonnes)
+
+# Fonction pour créer l'état d'alerte vide d'un projet (compteurs par groupe, dépôts déjà intégrés)
+def creer_etat_alertes():
+    return {
+        'histogramme': histogramme_vide().set_index(CLES_GROUPE + ['INDICE']),
+        'depots': None,
+        'empreintes': pd.Series(dtype='int64'),
+        'agregats': agreger_histogramme(histogramme_vide()).set_index(CLES_GROUPE),
+        'date_modification': None,
+        'anomalies': creer_etat_anomalies(),
+        'derniere_actualisation': (0, 0),
+        'verrou': threading.Lock()
+    }
+
+# Fonction pour sélectionner les dépôts d'un export appartenant à des groupes donnés
+def _depots_des_groupes(depots, groupes):
+    masque = np.zeros(len(depots), dtype=bool)
+    for regroupement in REGROUPEMENTS:
+        noms = groupes.get_level_values('Groupe')[groupes.get_level_values('Regroupement') == regroupement]
+        masque |= depots[regroupement].isin(noms).to_numpy()
+    return depots[masque]
+
+# Fonction pour intégrer un nouvel export dans l'état d'alerte et réagréger uniquement les groupes touchés
+def integrer_depots(etat, depots, projet):
+    empreintes = empreintes_depots(depots)
+    comptes = empreintes.value_counts()
+
+    # Nouvelles occurrences : au-delà de celles déjà intégrées pour la même empreinte
+    deja_vus = etat['empreintes'].reindex(empreintes.to_numpy(), fill_value=0).to_numpy()
+    ajouts = depots[empreintes.groupby(empreintes.to_numpy()).cumcount().to_numpy() >= deja_vus]
+
+    # Occurrences disparues de l'export (dépôt supprimé ou visa qui a changé d'état)
+    if etat['depots'] is not None:
+        anciennes = etat['depots']['Empreinte']
+        restantes = comptes.reindex(anciennes.to_numpy(), fill_value=0).to_numpy()
+        retraits = etat['depots'][anciennes.groupby(anciennes.to_numpy()).cumcount().to_numpy() >= restantes]
+    else:
+        retraits = depots.iloc[:0]
+
+    etat['depots'] = depots.assign(Empreinte=empreintes.to_numpy())
+    etat['empreintes'] = comptes
+    if ajouts.empty and retraits.empty:
+        return ajouts, []
+
+    cles = CLES_GROUPE + ['INDICE']
+    histogramme = etat['histogramme']
+    if retraits.empty:
+        # Ajouts seuls : les compteurs s'additionnent, la date du dernier dépôt se combine par maximum
+        delta = construire_histogramme(ajouts, projet).set_index(cles)
+        groupes_touches = delta.index.droplevel('INDICE').unique()
+        compteurs = ['Nombre de documents'] + COMPTEURS_VISAS
+        cumul = histogramme[compteurs].add(delta[compteurs], fill_value=0).astype('int64')
+        dernier_depot = pd.concat([histogramme['Dernier dépôt'], delta['Dernier dépôt']], axis=1).max(axis=1)
+        etat['histogramme'] = cumul.assign(**{'Dernier dépôt': dernier_depot})
+    else:
+        # Des dépôts ont disparu : les groupes concernés sont recomptés depuis l'export courant
+        groupes_touches = pd.concat([
+            construire_histogramme(ajouts, projet), construire_histogramme(retraits, projet)
+        ]).set_index(cles).index.droplevel('INDICE').unique()
+        recompte = construire_histogramme(_depots_des_groupes(etat['depots'], groupes_touches), projet).set_index(cles)
+        recompte = recompte[recompte.index.droplevel('INDICE').isin(groupes_touches)]
+        conserve = histogramme[~histogramme.index.droplevel('INDICE').isin(groupes_touches)]
+        etat['histogramme'] = pd.concat([conserve, recompte])
+
+    # Réagrégation des seuls groupes touchés
+    histogramme_touche = etat['histogramme'][etat['histogramme'].index.droplevel('INDICE').isin(groupes_touches)]
+    reagreges = agreger_histogramme(histogramme_touche.reset_index()).set_index(CLES_GROUPE)
+    etat['agregats'] = pd.concat([etat['agregats'].drop(groupes_touches, errors='ignore'), reagreges]).sort_index()
+    return ajouts, list(groupes_touches)
+
+# Fonction pour conserver l'état d'alerte de chaque projet dans le processus, partagé entre les sessions
+@st.cache_resource(show_spinner=False)
+def etat_alertes_projet(projet):
+    return creer_etat_alertes()
+
+# Fonction pour mettre à jour l'état d'alerte d'un projet si son export a changé
+def actualiser_alertes_projet(projet, chemin_fichier):
+    etat = etat_alertes_projet(projet)
+    with etat['verrou']:
+        date_modification = os.path.getmtime(chemin_fichier)
+        if etat['date_modification'] == date_modification:
+            return etat, 0, []
+        nouveaux, groupes_touches = integrer_depots(etat, lire_export_alertes(chemin_fichier), projet)
+        # Le détecteur d'anomalies reprend ses moyennes mobiles là où il s'était arrêté
+        integrer_comptes(etat['anomalies'], comptes_journaliers(etat['depots']))
+        etat['date_modification'] = date_modification
+        etat['derniere_actualisation'] = (len(nouveaux), len(groupes_touches))
+        return etat, len(nouveaux), groupes_touches
+
+# Fonction pour obtenir les alertes des projets disponibles, à jour des derniers exports (règles appliquées aux agrégats en cache)
+def calculer_alertes_projets(projets, regles=None):
+    regles = charger_regles() if regles is None else regles
+    tables = []
+    for nom, chemin in projets.items():
+        if os.path.exists(chemin):
+            etat, _, _ = actualiser_alertes_projet(nom, chemin)
+            tables.append(agregats_etat(etat, nom))
+    agregats = pd.concat(tables) if tables else creer_etat_alertes()['agregats']
+    return evaluer_regles(completer_metriques(agregats.reset_index()), regles)
+
+# Fonction pour joindre aux agrégats d'un état d'alerte le résumé de ses anomalies de dépôt
+def agregats_etat(etat, projet):
+    anomalies = resumer_anomalies(etat['anomalies'], projet).set_index(CLES_GROUPE)
+    return etat['agregats'].join(anomalies['Jours de dépôt anormaux'])
+
+# Fonction pour calculer les alertes d'un export en dehors de l'état partagé du processus (calcul complet, par exemple dans un processus de calcul)
+def calculer_alertes_export(projet, chemin_fichier, regles):
+    etat = creer_etat_alertes()
+    integrer_depots(etat, lire_export_alertes(chemin_fichier), projet)
+    integrer_comptes(etat['anomalies'], comptes_journaliers(etat['depots']))
+    return evaluer_regles(completer_metriques(agregats_etat(etat, projet).reset_index()), regles)
+
+# Fonction pour construire les histogrammes d'indices cumulés semaine par semaine, en une seule passe sur les dépôts
+def construire_histogrammes_hebdomadaires(depots, projet):
+    datees = depots[depots['Jour dépôt'].notna()]
+    # Le jour 0 (1er janvier 1970) est un jeudi : on ramène chaque jour au lundi de sa semaine
+    jours = datees['Jour dépôt'].to_numpy().astype('int64')
+    datees = datees.assign(Semaine=pd.to_datetime(jours - (jours + 3) % 7, unit='D'))
+    empile = _empiler(datees, ['Semaine', 'Jour dépôt'])
+    groupes = empile.groupby(['Regroupement', 'Groupe', 'INDICE', 'Semaine'])
+    hebdomadaire = groupes.size().unstack('Semaine', fill_value=0)
+    if hebdomadaire.empty:
+        return histogramme_vide().assign(Semaine=pd.Series(dtype='datetime64[ns]'))
+
+    # Grille continue de semaines puis cumul : l'histogramme de chaque semaine contient tout le passé
+    toutes_semaines = pd.date_range(hebdomadaire.columns.min(), hebdomadaire.columns.max(), freq='7D')
+    cumule = hebdomadaire.reindex(columns=toutes_semaines, fill_value=0).cumsum(axis=1)
+    dernier_depot = groupes['Jour dépôt'].max().unstack('Semaine').reindex(columns=toutes_semaines).ffill(axis=1)
+    cumule.columns.name = dernier_depot.columns.name = 'Semaine'
+    historique = pd.DataFrame({
+        'Nombre de documents': cumule.stack(),
+        'Dernier dépôt': dernier_depot.stack(dropna=False)
+    }).reset_index()
+    historique = historique[historique['Nombre de documents'] > 0]
+    historique.insert(0, 'Projet', projet)
+    return historique
+
+# Fonction pour agréger l'historique hebdomadaire en métriques par groupe et par semaine
+def agreger_historique(historique):
+    return completer_metriques(agreger_histogramme(historique, cles=('Projet', 'Regroupement', 'Groupe', 'Semaine')), ('Projet', 'Semaine'))
+
+# Fonction pour calculer l'historique des métriques d'alerte d'un projet (mis en cache par date de modification de l'export)
+@st.cache_data(show_spinner=False)
+def _calculer_historique_alertes(projet, chemin_fichier, date_modification):
+    return agreger_historique(construire_histogrammes_hebdomadaires(lire_export_alertes(chemin_fichier), projet))
+
+# Fonction pour obtenir l'historique des niveaux d'alerte d'un projet (règles appliquées sur les agrégats en cache)
+def calculer_historique_alertes(projet, chemin_fichier, regles=None):
+    regles = charger_regles() if regles is None else regles
+    return evaluer_regles(_calculer_historique_alertes(projet, chemin_fichier, os.path.getmtime(chemin_fichier)), regles)
+
+# Fonction pour repérer les changements de niveau d'alerte d'une semaine à l'autre
+def detecter_transitions(niveaux, colonne_niveau):
+    niveaux = niveaux.sort_values(CLES_GROUPE + ['Semaine'])
+    precedent = niveaux.groupby(CLES_GROUPE)[colonne_niveau].shift()
+    transitions = niveaux[precedent.notna() & (precedent != niveaux[colonne_niveau])]
+    return transitions.assign(**{'Niveau précédent': precedent[transitions.index].astype(int)})
+
+# Fonction pour mettre en forme les alertes d'un projet et d'un regroupement au moment de l'affichage
+def formater_alertes(alertes, projet, group_column, regles=None, noms_colonnes=None):
+    regles = charger_regles() if regles is None else regles
+    selection = alertes[(alertes['Projet'] == projet) & (alertes['Regroupement'] == group_column)]
+    donnees_finales = pd.DataFrame({
+        group_column: selection['Groupe'].to_numpy(),
+        'Compteur Indice': selection['Compteur Indice'].to_numpy(),
+        'Dernier Indice': selection['Dernier Indice'].to_numpy()
+    })
+    for regle in regles:
+        if regle['metrique'] == 'Somme des deux principales proportions':
+            donnees_finales[regle['metrique']] = selection[regle['metrique']].astype(int).astype(str).to_numpy() + '%'
+        elif regle['metrique'] not in donnees_finales.columns:
+            donnees_finales[regle['metrique']] = selection[regle['metrique']].to_numpy()
+        donnees_finales[nom_colonne_regle(regle, noms_colonnes)] = selection[regle['colonne']].map(regle['libelles']).to_numpy()
+    return donnees_finales
+
+# Fonction pour retrouver le nom affiché d'une règle dans le tableau mis en forme
+def nom_colonne_regle(regle, noms_colonnes=None):
+    return (noms_colonnes or {}).get(regle['identifiant'], regle['nom'])
@@ -1,16 +1,24 @@
-import pandas as pd
+import os
 import streamlit as st
-import plotly.express as px
+from boites import figure_boites
+from pipeline_documents import charger_regroupe, lister_exports, nom_projet
 
 # crée les 
 
-# Charger le fichier CSV combiné
-fichier_sortie = 'GOODLIFE_régroupe1.csv'
-df_combine = pd.read_csv(fichier_sortie, encoding='iso-8859-1', sep=';')
+# Fonction pour charger la synthèse par document d'un export (matérialisée en Parquet, recalculée seulement si l'export a changé)
+@st.cache_data(show_spinner=False)
+def charger_synthese(chemin_export, date_modification):
+    return charger_regroupe(chemin_export)
 
 # Créer une application Streamlit avec un menu latéral
 st.sidebar.title("Menu")
 
+# Choix du projet : la synthèse est produite par pipeline_documents.py à partir de l'export brut
+exports = lister_exports()
+chemin_export = st.sidebar.selectbox("Choisissez le projet :", exports, format_func=nom_projet,
+                                     index=exports.index(os.path.join('.', 'GOODLIFE.csv')) if os.path.join('.', 'GOODLIFE.csv') in exports else 0)
+df_combine = charger_synthese(chemin_export, os.path.getmtime(chemin_export))
+
 # Choix de l'application à afficher
 app_mode = st.sidebar.selectbox(
     "Choisissez l'application :",
@@ -36,9 +44,9 @@ if app_mode == "Nombre d'indices par type de document":
 
     elif option == "Boxplot":
         # Créer le boxplot avec plotly.express
-        fig = px.box(df_combine, x='desc_lot', y='Nombre d\'indices', 
-                     title='Nombres d\'indices par Type de Document',
-                     labels={'desc_lot': 'Type de Document', 'Nombre d\'indices': 'Nombre d\'indices'})
+        fig = figure_boites(df_combine, 'desc_lot', 'Nombre d\'indices',
+                            title='Nombres d\'indices par Type de Document',
+                            labels={'desc_lot': 'Type de Document', 'Nombre d\'indices': 'Nombre d\'indices'})
         st.plotly_chart(fig)
 
 elif app_mode == "Durée entre versions de documents par type de document":
@@ -54,7 +62,7 @@ elif app_mode == "Durée entre versions de documents par type de document":
 
     elif option == "Boxplot":
         # Créer le boxplot avec plotly.express
-        fig = px.box(df_combine, x='TYPE DE DOCUMENT', y='Différence en jours', 
-                     title='Durée entre Versions par Type de Document',
-                     labels={'Différence en jours': 'Durée entre Versions (jours)', 'TYPE DE DOCUMENT': 'Type de Document'})
+        fig = figure_boites(df_combine, 'TYPE DE DOCUMENT', 'Différence en jours',
+                            title='Durée entre Versions par Type de Document',
+                            labels={'Différence en jours': 'Durée entre Versions (jours)', 'TYPE DE DOCUMENT': 'Type de Document'})
         st.plotly_chart(fig)
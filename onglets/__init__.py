@@ -0,0 +1,120 @@
+import importlib
+import os
+import threading
+import time
+import pandas as pd
+import streamlit as st
+from donnees_ged import etendue_export
+from instrumentation import etape, relance
+
+# Onglets du tableau de bord, dans l'ordre du menu : nom affiché, icône, module du paquet 'onglets' exposant afficher(contexte),
+# et portée de la fenêtre de dates proposée ('projet' : projet sélectionné, 'projets' : tous les projets, None : pas de fenêtre).
+# Le module d'un onglet (et ses dépendances : plotly, modèles, moteur d'alertes...) n'est importé qu'à la première ouverture de l'onglet.
+ONGLETS = []
+
+# Mesures de chargement et d'affichage de chaque onglet, partagées par toutes les sessions du processus
+MESURES = {}
+_verrou = threading.Lock()
+
+# Durée du premier démarrage de l'application dans le processus (imports compris)
+DEMARRAGE = {}
+
+# Fonction pour enregistrer un onglet (les extensions peuvent en ajouter avant le lancement de l'application)
+def enregistrer_onglet(nom, icone, module, fenetre='projet'):
+    ONGLETS.append({'nom': nom, 'icone': icone, 'module': module, 'fenetre': fenetre})
+
+enregistrer_onglet("Analyse des documents par lot et indice", "bar-chart", 'lots_indices')
+enregistrer_onglet("Nombre d'indices par type de document", "file-text", 'indices_types')
+enregistrer_onglet("Durée entre versions de documents", "clock", 'durees_versions')
+enregistrer_onglet("Évolution des types de documents", "line-chart", 'evolution_types')
+enregistrer_onglet("Flux des documents", "exchange", 'flux_documents')
+enregistrer_onglet("Identification des acteurs principaux", "users", 'acteurs')
+enregistrer_onglet("Analyse séquentielle des documents", "calendar", 'analyse_sequentielle')
+enregistrer_onglet("Analyse de la masse de documents par projet", "chart-bar", 'masse_documents', fenetre='projets')
+enregistrer_onglet("Calendrier des Projets", "calendar", 'calendrier_projets')
+enregistrer_onglet("Calendrier par Lot", "calendar", 'calendrier_lot')
+enregistrer_onglet("Prévision des dépôts", "graph-up-arrow", 'previsions', fenetre='projets')
+# La comparaison lit les profils calculés sur les exports complets
+enregistrer_onglet("Comparaison inter-projets", "trophy", 'comparaison', fenetre=None)
+# Les alertes sont tenues à jour sur l'export complet : la fenêtre de dates ne limite que leur chronologie
+enregistrer_onglet("Alertes des projets", "bell", 'alertes')
+enregistrer_onglet("Phases et anomalies de dépôt", "activity", 'phases_depots')
+# Le rapport de qualité porte sur l'export complet, tel qu'il a été lu
+enregistrer_onglet("Qualité des données", "clipboard-check", 'qualite', fenetre=None)
+
+# Fonction pour retrouver un onglet enregistré par son nom
+def onglet_par_nom(nom):
+    return next(onglet for onglet in ONGLETS if onglet['nom'] == nom)
+
+# Fonction pour enregistrer une mesure (en millisecondes) d'un onglet
+def _mesurer(nom, mesure, duree):
+    with _verrou:
+        mesures = MESURES.setdefault(nom, {'Import (ms)': None, 'Premier affichage (ms)': None, 'Dernier affichage (ms)': None, 'Affichages': 0})
+        if mesure == 'import':
+            mesures['Import (ms)'] = round(duree * 1000, 1)
+        else:
+            if mesures['Premier affichage (ms)'] is None:
+                mesures['Premier affichage (ms)'] = round(duree * 1000, 1)
+            mesures['Dernier affichage (ms)'] = round(duree * 1000, 1)
+            mesures['Affichages'] += 1
+
+# Fonction pour enregistrer la durée du premier démarrage de l'application (les relances suivantes ne la modifient pas)
+def mesurer_demarrage(duree):
+    return DEMARRAGE.setdefault('Démarrage (ms)', round(duree * 1000, 1))
+
+# Fonction pour importer le module d'un onglet à sa première ouverture (durée d'import mesurée une fois par processus)
+def charger_onglet(onglet):
+    nom_module = f"{__name__}.{onglet['module']}"
+    debut = time.perf_counter()
+    module = importlib.import_module(nom_module)
+    if onglet['nom'] not in MESURES or MESURES[onglet['nom']]['Import (ms)'] is None:
+        _mesurer(onglet['nom'], 'import', time.perf_counter() - debut)
+    return module
+
+# Fonction pour choisir la fenêtre de dates analysée par un onglet : curseur sur l'étendue des dépôts des projets lus par l'onglet
+# (None quand toute l'étendue est choisie ; sinon dates de début et de fin incluses)
+def choisir_fenetre(contexte, portee):
+    if portee == 'projet':
+        chemins = [contexte['chemins'][contexte['projet_selectionne']]]
+    else:
+        chemins = [chemin for chemin in contexte['chemins'].values() if os.path.exists(chemin)]
+    etendues = [etendue for etendue in map(etendue_export, chemins) if etendue is not None]
+    if not etendues:
+        return None
+    debut = min(etendue[0] for etendue in etendues).date()
+    fin = max(etendue[1] for etendue in etendues).date()
+    if debut == fin:
+        return None
+    cle = f"fenetre_{contexte['projet_selectionne']}" if portee == 'projet' else 'fenetre_projets'
+    choix = st.slider('Période analysée', min_value=debut, max_value=fin, value=(debut, fin), format='DD/MM/YYYY', key=cle)
+    if choix == (debut, fin):
+        return None
+    return pd.Timestamp(choix[0]), pd.Timestamp(choix[1])
+
+# Fonction pour afficher un onglet comme fragment Streamlit : une interaction avec un widget de l'onglet ne relance que ce fragment
+# (ni le logo, ni le téléversement, ni la sélection du projet), sur les données partagées du projet.
+# Une relance du fragment seul est mesurée comme relance partielle ; lors d'une relance complète, l'onglet est une étape de celle-ci.
+@st.fragment
+def _afficher_fragment(nom, contexte):
+    onglet = onglet_par_nom(nom)
+    module = charger_onglet(onglet)
+    debut = time.perf_counter()
+    try:
+        with relance(partielle=True) as mesures:
+            mesures['projet'] = contexte['projet_selectionne']
+            with etape(nom, 'onglet'):
+                if onglet['fenetre'] is not None:
+                    contexte = dict(contexte, periode=choisir_fenetre(contexte, onglet['fenetre']))
+                module.afficher(contexte)
+    finally:
+        _mesurer(nom, 'affichage', time.perf_counter() - debut)
+
+# Fonction pour afficher un onglet en mesurant le temps d'import et d'affichage
+def afficher_onglet(nom, contexte):
+    _afficher_fragment(nom, contexte)
+
+# Fonction pour présenter les mesures de tous les onglets déjà ouverts
+def tableau_mesures():
+    with _verrou:
+        lignes = [{'Onglet': nom, **mesures} for nom, mesures in MESURES.items()]
+    return pd.DataFrame(lignes, columns=['Onglet', 'Import (ms)', 'Premier affichage (ms)', 'Dernier affichage (ms)', 'Affichages'])
@@ -0,0 +1,18 @@
+import pandas as pd
+import streamlit as st
+import plotly.express as px
+from donnees_ged import donnees_projet
+from instrumentation import tracer_graphique
+
+# Fonction pour afficher l'onglet sur les acteurs principaux
+def afficher(contexte):
+    donnees = donnees_projet(contexte)
+    st.header("Identification des acteurs principaux")
+    donnees['Date dépôt GED'] = pd.to_datetime(donnees['Date dépôt GED'], format='%d/%m/%Y')
+    donnees['Année'] = donnees['Date dépôt GED'].dt.year
+    fig_emetteur = px.treemap(donnees, path=['EMET', 'TYPE DE DOCUMENT'], title='Répartition des types de documents par émetteur')
+    fig_emetteur.update_layout(margin=dict(l=20, r=20, t=40, b=20), height=480, width=1200)
+    tracer_graphique(fig_emetteur, use_container_width=True)
+    fig_ajoute_par = px.treemap(donnees, path=['Ajouté par', 'TYPE DE DOCUMENT'], title='Répartition des types de documents par acteur (Ajouté par)')
+    fig_ajoute_par.update_layout(margin=dict(l=20, r=20, t=40, b=20), height=480, width=1200)
+    tracer_graphique(fig_ajoute_par, use_container_width=True)
@@ -0,0 +1,128 @@
+import pandas as pd
+import streamlit as st
+import plotly.graph_objs as go
+from grille import afficher_grille
+from moteur_alertes import calculer_alertes_projets, calculer_historique_alertes, detecter_transitions, etat_alertes_projet, formater_alertes, nom_colonne_regle
+from regles_alertes import charger_regles, style_regle
+from instrumentation import tracer_graphique
+
+# Fonction pour créer un graphique circulaire de la répartition des niveaux d'une règle
+def creer_camembert(donnees, colonne, titre, couleurs):
+    comptes = donnees[colonne].value_counts()
+    fig = go.Figure(go.Pie(labels=comptes.index.tolist(), values=comptes.values.tolist(), hole=0.3,
+                           marker=dict(colors=[couleurs.get(libelle, 'lightgrey') for libelle in comptes.index]),
+                           textinfo='percent', insidetextorientation='horizontal'))
+    fig.update_layout(title=titre, margin=dict(l=20, r=20, t=30, b=20), legend=dict(orientation='h', xanchor='center', x=0.5, y=-0.1),
+                      annotations=[dict(text=titre, x=0.5, y=0.5, font_size=20, showarrow=False)])
+    return fig
+
+# Fonction pour afficher l'historique des niveaux d'une règle semaine par semaine et les passages d'un niveau à l'autre
+# (periode : fenêtre de dates de la chronologie, None pour tout l'export)
+def afficher_historique(projet, chemin_fichier, group_column, regles, periode):
+    st.subheader("Historique des alertes")
+    historique = calculer_historique_alertes(projet, chemin_fichier, regles)
+    historique = historique[historique['Regroupement'] == group_column]
+    if periode is not None:
+        historique = historique[(historique['Semaine'] >= periode[0]) & (historique['Semaine'] <= periode[1])]
+    # Seules les règles dont la métrique est renseignée dans l'historique sont proposées
+    regles_historique = {regle['nom']: regle for regle in regles if regle['metrique'] in historique.columns and historique[regle['metrique']].notna().any()}
+    if not regles_historique:
+        st.write("Pas d'historique d'alerte sur la période analysée.")
+        return
+
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        alerte_historique = st.selectbox("Alerte", list(regles_historique), key='historique_alerte')
+    regle = regles_historique[alerte_historique]
+    colonne_niveau, libelles = regle['colonne'], regle['libelles']
+    transitions = detecter_transitions(historique, colonne_niveau)
+
+    # Par défaut, les groupes ayant changé de niveau
+    groupes_modifies = list(transitions['Groupe'].unique())
+    with col2:
+        groupes = st.multiselect(f"{group_column} à afficher", list(historique['Groupe'].unique()), default=groupes_modifies[:10], key='historique_groupes')
+    if not groupes:
+        st.write("Sélectionnez au moins un groupe pour afficher la chronologie.")
+        return
+
+    fig = go.Figure()
+    for groupe in groupes:
+        serie = historique[historique['Groupe'] == groupe]
+        fig.add_trace(go.Scatter(x=serie['Semaine'], y=serie[colonne_niveau], mode='lines', line_shape='hv', name=str(groupe)))
+    passages = transitions[transitions['Groupe'].isin(groupes)]
+    fig.add_trace(go.Scatter(
+        x=passages['Semaine'], y=passages[colonne_niveau], mode='markers', name='Changement de niveau',
+        marker=dict(size=10, color='black', symbol='diamond'), text=passages['Groupe'].astype(str),
+        hovertemplate='%{text}<br>%{x|%d %b %Y}<extra></extra>'
+    ))
+    fig.update_layout(
+        title=f"Chronologie de l'{alerte_historique.split(':')[0].strip().lower()} par {group_column}",
+        xaxis_title='Semaine',
+        yaxis=dict(title='Niveau', tickmode='array', tickvals=list(libelles.keys()), ticktext=list(libelles.values())),
+        height=500
+    )
+    tracer_graphique(fig, use_container_width=True)
+
+    tableau_transitions = pd.DataFrame({
+        group_column: passages['Groupe'].to_numpy(),
+        'Semaine': passages['Semaine'].dt.strftime('%d/%m/%Y').to_numpy(),
+        'Niveau précédent': passages['Niveau précédent'].map(libelles).to_numpy(),
+        'Nouveau niveau': passages[colonne_niveau].map(libelles).to_numpy()
+    })
+    afficher_grille(tableau_transitions, cle='historique_transitions')
+
+# Fonction pour afficher les alertes du projet sélectionné par lot ou type de document
+# (état d'alerte tenu à jour sur l'export complet ; la fenêtre de dates limite la chronologie)
+def afficher(contexte):
+    projet = contexte['projet_selectionne']
+    chemins = contexte['chemins']
+    st.header("Alertes des projets")
+    group_column = st.selectbox("Catégorie", ['LOT', 'TYPE DE DOCUMENT'], format_func=lambda colonne: f'Par {colonne}', key='alertes_categorie')
+
+    # Règles d'alerte (seuils, niveaux et couleurs définis dans regles_alertes.json)
+    regles = charger_regles()
+    with st.expander("Règles d'alerte actives"):
+        st.dataframe(pd.DataFrame({
+            'Règle': [regle['nom'] for regle in regles],
+            'Métrique': [regle['metrique'] for regle in regles],
+            'Sens': ['valeur élevée défavorable' if regle['croissant'] else 'valeur faible défavorable' for regle in regles],
+            'Seuils': [', '.join(f'{seuil:g}' for seuil in regle['seuils']) for regle in regles],
+            'Surcharges': [len(regle['surcharges']) for regle in regles]
+        }), hide_index=True)
+
+    # Alertes des projets du tableau de bord (état partagé mis à jour depuis les derniers dépôts), mise en forme du projet sélectionné
+    alertes = calculer_alertes_projets(chemins, regles)
+    donnees_finales = formater_alertes(alertes, projet, group_column, regles)
+    nb_nouveaux, nb_groupes = etat_alertes_projet(projet)['derniere_actualisation']
+    st.caption(f"Dernière actualisation de l'export {projet} : {nb_nouveaux} nouveaux dépôts intégrés, {nb_groupes} groupes reclassés")
+
+    # Recherche par groupe et par niveau d'alerte
+    colonnes_recherche = st.columns(len(regles) + 1)
+    with colonnes_recherche[0]:
+        valeur_groupe = st.selectbox(f"Rechercher par {group_column}...", ["Tous"] + list(donnees_finales[group_column].unique()), key='alertes_groupe')
+    recherches_alertes = {}
+    for colonne_recherche, regle in zip(colonnes_recherche[1:], regles):
+        with colonne_recherche:
+            recherches_alertes[regle['nom']] = st.selectbox(f"Rechercher par {regle['nom']}...", ["Tous"] + list(regle['libelles'].values()), key=f"recherche_{regle['identifiant']}")
+    filtrees = donnees_finales
+    if valeur_groupe != "Tous":
+        filtrees = filtrees[filtrees[group_column] == valeur_groupe]
+    for nom_regle, valeur in recherches_alertes.items():
+        if valeur != "Tous":
+            filtrees = filtrees[filtrees[nom_regle] == valeur]
+
+    # Le style n'est appliqué qu'à la page affichée par la grille
+    def styler_page(page):
+        style = page.style
+        for regle in regles:
+            style = style.applymap(style_regle(regle), subset=[nom_colonne_regle(regle)])
+        return style
+    afficher_grille(filtrees, cle='alertes', style=styler_page, hauteur=600)
+
+    # Un graphique circulaire par règle, deux par ligne
+    for debut in range(0, len(regles), 2):
+        for colonne_graphique, regle in zip(st.columns(2), regles[debut:debut + 2]):
+            with colonne_graphique:
+                tracer_graphique(creer_camembert(filtrees, nom_colonne_regle(regle), regle['nom'].split(':')[0].strip(), regle['couleurs']), use_container_width=True)
+
+    afficher_historique(projet, chemins[projet], group_column, regles, contexte.get('periode'))
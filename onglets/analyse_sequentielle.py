@@ -0,0 +1,53 @@
+import streamlit as st
+import plotly.express as px
+from grille import afficher_grille, formater_date
+from donnees_ged import depots_lot_periode, index_projet, tranche_analyse
+from instrumentation import tracer_graphique
+from telechargements import afficher_telechargement
+
+# Fonction pour afficher l'onglet d'analyse séquentielle des documents d'un lot
+def afficher(contexte):
+    donnees, index = index_projet(contexte)
+    st.header("Analyse séquentielle des documents")
+    
+    # Sélection de la période d'analyse
+    periode = st.radio('Sélectionnez la période d\'analyse', ('6 mois', '1 an', 'Toute la période'), index=0)
+    
+    # Données triées par date : la période est une tranche de lignes trouvée par recherche dichotomique
+    tranche = tranche_analyse(index['jours'], periode)
+    donnees_filtrees = donnees.iloc[tranche[0]:tranche[1]]
+    
+    lot_selectionne = st.selectbox('Sélectionnez un Lot', donnees_filtrees['LOT'].unique(), key='analyse_lot')
+    donnees_lot = depots_lot_periode(donnees, index, lot_selectionne, tranche)
+
+    st.subheader(f"Analyse séquentielle des documents pour le Lot {lot_selectionne} sur {periode}")
+
+    # Téléchargement des dépôts du lot sur la période (données filtrées complètes)
+    afficher_telechargement(donnees_lot, cle='depots_lot', nom_fichier=f'depots_{lot_selectionne}', etat_vue=(contexte.get('periode'), periode, lot_selectionne))
+
+    # Distribution des types de documents dans le lot sélectionné
+    distribution_types = donnees_lot['TYPE DE DOCUMENT'].value_counts().reset_index()
+    distribution_types.columns = ['Type de Document', 'Nombre de Documents']
+    fig_distribution = px.bar(distribution_types, x='Type de Document', y='Nombre de Documents', title='Distribution des types de documents')
+    tracer_graphique(fig_distribution, use_container_width=True)
+
+    # Définir une palette de couleurs unique pour éviter les répétitions
+    unique_types = donnees_lot['TYPE DE DOCUMENT'].unique()
+    palette = px.colors.qualitative.Plotly  # Utilisation d'une palette de couleurs qualitative
+    color_map = {doc_type: palette[i % len(palette)] for i, doc_type in enumerate(unique_types)}
+
+    # Séquence de diffusion des documents
+    donnees_lot = donnees_lot.sort_values(by='Date dépôt GED')
+    fig_sequence = px.scatter(donnees_lot, x='Date dépôt GED', y='TYPE DE DOCUMENT', 
+                              color='TYPE DE DOCUMENT', color_discrete_map=color_map,
+                              title='Séquence de diffusion des documents', hover_data=['Libellé du document'])
+    tracer_graphique(fig_sequence, use_container_width=True)
+
+    # Résumé statistique
+    resume = donnees_lot.groupby('TYPE DE DOCUMENT').agg({
+        'Date dépôt GED': ['min', 'max'],
+        'Durée entre versions': 'mean'
+    }).reset_index()
+    resume.columns = ['Type de Document', 'Date début', 'Date fin', 'Durée moyenne entre versions (jours)']
+    st.subheader("Résumé statistique")
+    afficher_grille(resume, cle='resume_sequentiel', formats={'Date début': formater_date, 'Date fin': formater_date})
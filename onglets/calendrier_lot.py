@@ -0,0 +1,56 @@
+import pandas as pd
+import streamlit as st
+import plotly.express as px
+from grille import afficher_grille, formater_date
+from donnees_ged import index_projet
+from index_filtres import filtrer_positions
+from onglets.communs import generate_dynamic_colors
+from instrumentation import tracer_graphique
+
+# Fonction pour afficher l'onglet sur le calendrier d'un lot
+def afficher(contexte):
+    donnees, index = index_projet(contexte)
+    st.header("Calendrier par Lot")
+    lot_selectionne = st.selectbox('Sélectionnez un Lot', donnees['LOT'].unique())
+    # Lignes du lot lues dans l'index des filtres au lieu d'un parcours de toute la colonne
+    donnees_filtrees = donnees.iloc[filtrer_positions(index, {'LOT': [lot_selectionne]})]
+
+    donnees_gantt = donnees_filtrees.groupby('TYPE DE DOCUMENT').agg({
+        'Date dépôt GED': ['min', 'max'],
+        'Libellé du document': 'count'
+    }).reset_index()
+    donnees_gantt.columns = ['TYPE DE DOCUMENT', 'Date début', 'Date fin', 'Nombre de documents']
+    donnees_gantt['Durée en jours'] = (donnees_gantt['Date fin'] - donnees_gantt['Date début']).dt.days
+
+    donnees_sorted = donnees_filtrees.sort_values(by='Date dépôt GED')
+    donnees_gantt['Types de documents'] = donnees_sorted.groupby('TYPE DE DOCUMENT')['TYPE DE DOCUMENT'].apply(lambda x: ', '.join(x.drop_duplicates())).reset_index(drop=True)
+    donnees_gantt = donnees_gantt.sort_values('Date début')
+
+    # Utiliser une palette de couleurs dynamique pour éviter les répétitions
+    couleurs = generate_dynamic_colors(len(donnees_gantt['TYPE DE DOCUMENT']))
+
+    donnees_gantt['Date fin'] = donnees_gantt.apply(lambda x: x['Date fin'] if x['Durée en jours'] > 0 else x['Date début'] + pd.Timedelta(days=1), axis=1)
+
+    fig_gantt = px.timeline(
+        donnees_gantt,
+        x_start='Date début',
+        x_end='Date fin',
+        y='TYPE DE DOCUMENT',
+        color='TYPE DE DOCUMENT',
+        hover_data=['Durée en jours', 'Nombre de documents', 'Types de documents'],
+        color_discrete_sequence=couleurs,
+        title=f'Calendrier par Lot: {lot_selectionne}'
+    )
+    fig_gantt.update_layout(
+        xaxis_title='Date',
+        yaxis_title='TYPE DE DOCUMENT',
+        height=600,
+        width=1000
+    )
+    fig_gantt.update_traces(
+        hovertemplate=f'<b>Type de Document:</b> %{{y}}<br><b>Début:</b> %{{base|%d %b %Y}}<br><b>Fin:</b> %{{x|%d %b %Y}}<br><b>Durée:</b> %{{customdata[0]}} jours<br><b>Nombre de documents:</b> %{{customdata[1]}}<br><b>Types de documents:</b> %{{customdata[2]}}'
+    )
+    tracer_graphique(fig_gantt, use_container_width=True)
+
+    st.subheader("Détails du Lot")
+    afficher_grille(donnees_gantt, cle='details_lot', formats={'Date début': formater_date, 'Date fin': formater_date})
@@ -0,0 +1,60 @@
+import pandas as pd
+import streamlit as st
+import plotly.express as px
+from grille import afficher_grille, formater_date
+from donnees_ged import donnees_projet
+from onglets.communs import generate_dynamic_colors
+from instrumentation import tracer_graphique
+
+# Fonction pour afficher l'onglet sur le calendrier des projets par lot ou type de document
+def afficher(contexte):
+    donnees = donnees_projet(contexte)
+    st.header("Calendrier des Projets")
+    # Ajouter le selectbox pour choisir entre "Lot" et "Type de Document"
+    categorie_gantt = st.selectbox('Sélectionnez la catégorie', ['LOT', 'TYPE DE DOCUMENT'], key='categorie_gantt')  # Choix entre Lot et Type de Document
+
+    # Préparer les données pour le diagramme de Gantt
+    donnees_gantt = donnees.groupby(categorie_gantt).agg({
+        'Date dépôt GED': ['min', 'max'],
+        'Libellé du document': 'count'
+    }).reset_index()
+    donnees_gantt.columns = [categorie_gantt, 'Date début', 'Date fin', 'Nombre de documents']
+    donnees_gantt['Durée en jours'] = (donnees_gantt['Date fin'] - donnees_gantt['Date début']).dt.days
+
+    # Ajouter les types de documents utilisés pour chaque lot dans l'ordre d'apparition
+    donnees_sorted = donnees.sort_values(by='Date dépôt GED')
+    donnees_gantt['Types de documents'] = donnees_sorted.groupby(categorie_gantt)['TYPE DE DOCUMENT'].apply(lambda x: ', '.join(x.drop_duplicates())).reset_index(drop=True)
+
+    # Trier les catégories par date de début
+    donnees_gantt = donnees_gantt.sort_values('Date début')
+
+    # Utiliser une palette de couleurs dynamique pour éviter les répétitions
+    couleurs = generate_dynamic_colors(len(donnees_gantt[categorie_gantt]))
+
+    # S'assurer que les barres sont affichées même si la durée est nulle
+    donnees_gantt['Date fin'] = donnees_gantt.apply(lambda x: x['Date fin'] if x['Durée en jours'] > 0 else x['Date début'] + pd.Timedelta(days=1), axis=1)
+
+    fig_gantt = px.timeline(
+        donnees_gantt,
+        x_start='Date début',
+        x_end='Date fin',
+        y=categorie_gantt,
+        color=categorie_gantt,
+        hover_data=['Durée en jours', 'Nombre de documents', 'Types de documents'],
+        color_discrete_sequence=couleurs,
+        title=f'Calendrier des Projets par {categorie_gantt}'
+    )
+    fig_gantt.update_layout(
+        xaxis_title='Date',
+        yaxis_title=categorie_gantt,
+        height=600,
+        width=1000
+    )
+    fig_gantt.update_traces(
+        hovertemplate=f'<b>{categorie_gantt}:</b> %{{y}}<br><b>Début:</b> %{{base|%d %b %Y}}<br><b>Fin:</b> %{{x|%d %b %Y}}<br><b>Durée:</b> %{{customdata[0]}} jours<br><b>Nombre de documents:</b> %{{customdata[1]}}<br><b>Types de documents:</b> %{{customdata[2]}}'
+    )
+    tracer_graphique(fig_gantt, use_container_width=True)
+
+    # Afficher le tableau récapitulatif
+    st.subheader("Détails des projets")
+    afficher_grille(donnees_gantt, cle='details_projets', formats={'Date début': formater_date, 'Date fin': formater_date})
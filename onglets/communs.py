@@ -0,0 +1,6 @@
+import plotly.express as px
+
+# Fonction pour générer une palette de couleurs dynamique
+def generate_dynamic_colors(n):
+    colors = px.colors.sample_colorscale('Viridis', [i/n for i in range(n)])
+    return colors
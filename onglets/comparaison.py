@@ -0,0 +1,60 @@
+import os
+import pandas as pd
+import streamlit as st
+import plotly.express as px
+import plotly.graph_objects as go
+from grille import afficher_grille
+from pipeline_documents import lister_exports
+from profils_projets import calculer_profils, positionner_projet, tableau_indicateurs, tableau_types, tableau_volumes
+from regles_alertes import charger_regles
+from instrumentation import tracer_graphique
+
+# Fonction pour afficher la comparaison du projet sélectionné avec tous les projets profilés
+# (seuls les profils de projet sont lus, aucun export complet n'est chargé)
+def afficher(contexte):
+    projet_selectionne = contexte['projet_selectionne']
+    st.header("Comparaison inter-projets")
+    exports = {os.path.normpath(chemin) for chemin in contexte['chemins'].values() if os.path.exists(chemin)} | {os.path.normpath(chemin) for chemin in lister_exports()}
+    with st.spinner("Mise à jour des profils de projet..."):
+        profils = calculer_profils(sorted(exports), charger_regles())
+    if projet_selectionne not in profils:
+        st.write("Le projet sélectionné n'a pas encore de profil.")
+        return
+    tableau = tableau_indicateurs(profils)
+    st.caption(f"{len(profils)} projets profilés")
+
+    # Classement des projets sur un indicateur, projet sélectionné mis en évidence
+    indicateur = st.selectbox('Indicateur', list(tableau.columns), key='comparaison_indicateur')
+    classement = tableau[indicateur].dropna().sort_values(ascending=False)
+    fig_classement = go.Figure(go.Bar(
+        x=classement.index, y=classement.values, text=classement.round(1).values, textposition='auto',
+        marker_color=['#004080' if projet == projet_selectionne else 'lightgray' for projet in classement.index]
+    ))
+    fig_classement.add_hline(y=classement.median(), line_dash='dash', line_color='blue', annotation_text='Médiane')
+    fig_classement.update_layout(title=f'{indicateur} par projet', xaxis_title='Projet', yaxis_title=indicateur, height=450)
+    tracer_graphique(fig_classement, use_container_width=True)
+
+    st.subheader(f"Position de {projet_selectionne}")
+    afficher_grille(positionner_projet(tableau, projet_selectionne), cle='comparaison_position')
+
+    # Médianes par type de document : projet sélectionné face à la médiane et aux quartiles des autres projets
+    mesure = st.selectbox('Mesure par type de document', ['Médiane des indices', 'Médiane de la durée (jours)', 'Documents'], key='comparaison_mesure_type')
+    types = tableau_types(profils, mesure)
+    if projet_selectionne in types.columns:
+        autres = types.drop(columns=projet_selectionne)
+        comparaison_types = pd.DataFrame({
+            projet_selectionne: types[projet_selectionne],
+            'Premier quartile des projets': autres.quantile(0.25, axis=1),
+            'Médiane des projets': autres.median(axis=1),
+            'Troisième quartile des projets': autres.quantile(0.75, axis=1),
+            'Nombre de projets': autres.notna().sum(axis=1)
+        }).dropna(subset=[projet_selectionne]).rename_axis('Type de Document').reset_index()
+        afficher_grille(comparaison_types, cle='comparaison_types')
+
+    # Volumes mensuels alignés sur le début de chaque projet
+    volumes = tableau_volumes(profils)
+    fig_volumes = px.line(volumes, x='Mois depuis le début', y='Dépôts', color='Projet', title='Dépôts mensuels depuis le début de chaque projet')
+    fig_volumes.update_traces(opacity=0.4)
+    fig_volumes.update_traces(opacity=1, line_width=4, selector=dict(name=projet_selectionne))
+    fig_volumes.update_layout(height=450)
+    tracer_graphique(fig_volumes, use_container_width=True)
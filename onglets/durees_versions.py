@@ -0,0 +1,79 @@
+import pandas as pd
+import streamlit as st
+import plotly.express as px
+from grille import afficher_grille
+from doublons_libelles import regroupements_proposes
+from donnees_ged import donnees_projet
+from onglets.communs import generate_dynamic_colors
+from instrumentation import tracer_graphique
+
+# Fonction pour afficher l'onglet sur la durée entre versions de documents
+def afficher(contexte):
+    donnees = donnees_projet(contexte)
+    st.header("Durée entre versions de documents")
+
+    # Calculer la différence entre chaque version pour chaque document
+    donnees['Durée entre versions'] = donnees.groupby('Document')['Date dépôt GED'].diff().dt.days
+
+    # Remplacer les valeurs NaN (première version de chaque document) par 0
+    donnees['Durée entre versions'] = donnees['Durée entre versions'].fillna(0)
+
+    # Calculer la durée moyenne entre versions par type de document
+    resultats = donnees.groupby('TYPE DE DOCUMENT')['Durée entre versions'].mean().reset_index()
+    resultats.columns = ['TYPE DE DOCUMENT', 'Durée moyenne entre versions (jours)']
+    resultats = resultats.sort_values(by='Durée moyenne entre versions (jours)', ascending=False)
+
+    # Calculer la moyenne globale
+    moyenne_globale = resultats['Durée moyenne entre versions (jours)'].mean()
+
+    # Générer le graphique en barres
+    fig = px.bar(
+        resultats, 
+        x='TYPE DE DOCUMENT', 
+        y='Durée moyenne entre versions (jours)', 
+        title='Durée moyenne entre versions (jours) par Type de Document', 
+        color='TYPE DE DOCUMENT',
+        color_discrete_sequence=generate_dynamic_colors(len(resultats['TYPE DE DOCUMENT']))
+    )
+
+    # Ajouter une ligne horizontale représentant la moyenne globale
+    fig.add_hline(y=moyenne_globale, line_dash="dash", line_color="red", 
+                  annotation_text=f"Moyenne Globale: {moyenne_globale:.2f} jours",
+                  annotation_position="bottom right")
+
+    # Mettre à jour les détails du graphique
+    fig.update_layout(
+        showlegend=True, 
+        legend_title_text='Type de Document'
+    )
+    fig.update_traces(texttemplate='%{y:.2f}', textposition='outside')
+
+    # Afficher le graphique dans Streamlit
+    tracer_graphique(fig, use_container_width=True)
+
+    # Afficher le tableau "Durées entre indices par type de document"
+    st.subheader("Durées entre indices par type de document")
+    durées_indices = []
+    for doc_type, group in donnees.groupby('TYPE DE DOCUMENT'):
+        group = group.sort_values(by=['Document', 'INDICE'])
+        group['Durée entre indices'] = group.groupby('Document')['Date dépôt GED'].diff().dt.days
+        group['Passage indice'] = group.groupby('Document')['INDICE'].transform(lambda x: x.shift(1) + ' à ' + x)
+        group = group[group['Durée entre indices'] >= 0]  # Supprimer les durées négatives
+        for _, row in group.iterrows():
+            if pd.notna(row['Durée entre indices']):
+                durées_indices.append({
+                    'Type de Document': doc_type,
+                    'Document': row['Document'],
+                    'Passage indice': row['Passage indice'],
+                    'Durée entre indices (jours)': row['Durée entre indices']
+                })
+    df_durées_indices = pd.DataFrame(durées_indices)
+    if not df_durées_indices.empty:
+        afficher_grille(df_durées_indices, cle='durees_indices')
+    else:
+        st.write("Pas de données disponibles pour les durées entre indices.")
+
+    # Libellés rattachés à un même document pour le calcul des versions
+    regroupements = regroupements_proposes(donnees)
+    with st.expander(f"Regroupements de libellés proposés ({len(regroupements)} documents)"):
+        afficher_grille(regroupements, cle='regroupements_libelles')
@@ -0,0 +1,27 @@
+import streamlit as st
+import plotly.graph_objects as go
+from donnees_ged import donnees_projet
+from instrumentation import tracer_graphique
+
+# Fonction pour afficher l'onglet sur l'évolution des types de documents
+def afficher(contexte):
+    donnees = donnees_projet(contexte)
+    projet_selectionne = contexte['projet_selectionne']
+    st.header("Évolution des types de documents")
+    options_type_document = donnees['TYPE DE DOCUMENT'].unique()
+    types_selectionnes = st.multiselect('Sélectionnez les types de document', options_type_document, default=options_type_document[0], key='tab1_types')
+    donnees_groupees = donnees.groupby([donnees['Date dépôt GED'].dt.to_period("M"), 'TYPE DE DOCUMENT']).size().reset_index(name='Nombre de documents')
+    donnees_groupees['Date dépôt GED'] = donnees_groupees['Date dépôt GED'].dt.to_timestamp()
+    fig = go.Figure()
+    for t in types_selectionnes:
+        donnees_filtrees = donnees_groupees[donnees_groupees['TYPE DE DOCUMENT'] == t]
+        fig.add_trace(go.Scatter(x=donnees_filtrees['Date dépôt GED'], y=donnees_filtrees['Nombre de documents'].cumsum(), mode='lines+markers', name=f'Cumulé - {t}'))
+        fig.add_trace(go.Scatter(x=donnees_filtrees['Date dépôt GED'], y=donnees_filtrees['Nombre de documents'], mode='lines+markers', name=t, visible='legendonly'))
+    fig.update_layout(
+        title=f'Évolution du nombre de documents pour {projet_selectionne}',
+        xaxis_title='Date de Dépôt',
+        yaxis_title='Nombre de Documents',
+        legend_title='Type de Documents',
+        height=500, width=1200
+    )
+    tracer_graphique(fig, use_container_width=True)
@@ -0,0 +1,32 @@
+import pandas as pd
+import streamlit as st
+import plotly.graph_objects as go
+from donnees_ged import donnees_projet
+from instrumentation import tracer_graphique
+
+# Fonction pour afficher l'onglet sur le flux des documents (projet, émetteur, type, indice)
+def afficher(contexte):
+    donnees = donnees_projet(contexte)
+    st.header("Flux des documents")
+    total_par_indice = donnees['INDICE'].value_counts(normalize=True) * 100
+    total_par_indice = total_par_indice.reset_index()
+    total_par_indice.columns = ['INDICE', 'Pourcentage']
+    etiquettes_indices_avec_pourcentage = total_par_indice.apply(lambda row: f"{row['INDICE']} ({row['Pourcentage']:.2f}%)", axis=1)
+    map_pourcentage_indice = dict(zip(total_par_indice['INDICE'], etiquettes_indices_avec_pourcentage))
+    donnees['INDICE'] = donnees['INDICE'].map(map_pourcentage_indice)
+    tous_les_noeuds = pd.concat([donnees['PROJET'], donnees['EMET'], donnees['TYPE DE DOCUMENT'], donnees['INDICE']]).unique()
+    tous_les_noeuds = pd.Series(index=tous_les_noeuds, data=range(len(tous_les_noeuds)))
+    source = tous_les_noeuds[donnees['PROJET']].tolist() + tous_les_noeuds[donnees['EMET']].tolist() + tous_les_noeuds[donnees['TYPE DE DOCUMENT']].tolist()
+    cible = tous_les_noeuds[donnees['EMET']].tolist() + tous_les_noeuds[donnees['TYPE DE DOCUMENT']].tolist() + tous_les_noeuds[donnees['INDICE']].tolist()
+    valeur = [1] * len(donnees['PROJET']) + [1] * len(donnees['EMET']) + [1] * len(donnees['TYPE DE DOCUMENT'])
+    etiquettes_noeuds = tous_les_noeuds.index.tolist()
+    fig = go.Figure(data=[go.Sankey(
+        node=dict(pad=15, thickness=20, line=dict(color='black', width=0.5), label=etiquettes_noeuds),
+        link=dict(source=source, target=cible, value=valeur)
+    )])
+    fig.add_annotation(x=0.1, y=1.1, text="Projet", showarrow=False, font=dict(size=12, color="blue"))
+    fig.add_annotation(x=0.35, y=1.1, text="Émetteur", showarrow=False, font=dict(size=12, color="blue"))
+    fig.add_annotation(x=0.6, y=1.1, text="Type de Document", showarrow=False, font=dict(size=12, color="blue"))
+    fig.add_annotation(x=0.9, y=1.1, text="Indice", showarrow=False, font=dict(size=12, color="blue"))
+    fig.update_layout(title_text="", font_size=10, margin=dict(l=0, r=0, t=40, b=0))
+    tracer_graphique(fig, use_container_width=True)
@@ -0,0 +1,30 @@
+import streamlit as st
+import plotly.express as px
+from donnees_ged import donnees_projet
+from onglets.communs import generate_dynamic_colors
+from instrumentation import tracer_graphique
+
+# Fonction pour afficher l'onglet sur le nombre d'indices par type de document
+def afficher(contexte):
+    donnees = donnees_projet(contexte)
+    st.header("Nombre d'indices par type de document")
+    type_calcul = st.selectbox('Sélectionnez le type de calcul', ['mean', 'max'], key='calcul_indices_type')
+    if type_calcul == 'mean':
+        resultats = donnees.groupby('TYPE DE DOCUMENT')['Nombre d\'indices'].mean().reset_index()
+        title = 'Nombre moyen d\'indices par Type de Document'
+    elif type_calcul == 'max':
+        resultats = donnees.groupby('TYPE DE DOCUMENT')['Nombre d\'indices'].max().reset_index()
+        title = 'Nombre maximum d\'indices par Type de Document'
+    resultats = resultats.sort_values(by=resultats.columns[1], ascending=False)
+
+    # Calcul de la moyenne
+    moyenne = resultats[resultats.columns[1]].mean()
+
+    # Générer des couleurs uniques pour chaque type de document
+    couleurs = generate_dynamic_colors(len(resultats['TYPE DE DOCUMENT']))
+
+    fig = px.bar(resultats, x='TYPE DE DOCUMENT', y=resultats.columns[1], title=title, color='TYPE DE DOCUMENT', color_discrete_sequence=couleurs)
+    fig.add_hline(y=moyenne, line_dash="dash", line_color="red", annotation_text=f"Moyenne: {moyenne:.2f}")
+    fig.update_layout(showlegend=True, legend_title_text='Type de Document')
+    fig.update_traces(texttemplate='%{y:.2f}', textposition='outside')
+    tracer_graphique(fig, use_container_width=True)
@@ -0,0 +1,68 @@
+import streamlit as st
+import plotly.express as px
+from donnees_ged import index_projet
+from index_filtres import compter_combinaisons, filtrer_positions
+from instrumentation import tracer_graphique
+
+# Fonction pour afficher l'onglet sur l'analyse des documents par lot et indice
+def afficher(contexte):
+    donnees, index = index_projet(contexte)
+    st.header("Analyse des documents par lot et indice")
+    options_indice = donnees['INDICE'].unique()
+    indices_selectionnes = st.multiselect('Sélectionnez un ou plusieurs indices', options_indice, key='tab1_indices')
+    # Lignes des indices choisis lues dans l'index des filtres ; les comptages sont faits sur ces positions, sans copie des données
+    positions = filtrer_positions(index, {'INDICE': indices_selectionnes})
+    donnees_groupees_treemap = compter_combinaisons(index, ['LOT', 'INDICE'], positions)
+    fig_treemap = px.treemap(
+        donnees_groupees_treemap,
+        path=['LOT', 'INDICE'],
+        values='Nombre de documents',
+        title='Répartition des documents par lot et indice'
+    )
+    fig_treemap.update_layout(height=500, width=1200)
+    donnees_groupees_type_indice2 = compter_combinaisons(index, ['TYPE DE DOCUMENT', 'INDICE'], positions)
+    fig_type_indice2 = px.treemap(
+        donnees_groupees_type_indice2,
+        path=['TYPE DE DOCUMENT', 'INDICE'],
+        values='Nombre de documents',
+        title='Répartition des documents par type de documents et indice'
+    )
+    fig_type_indice2.update_layout(height=550, width=1200)
+    donnees_groupees_type_indice = compter_combinaisons(index, ['LOT', 'TYPE DE DOCUMENT', 'INDICE'], positions)
+    fig_type_indice = px.treemap(
+        donnees_groupees_type_indice,
+        path=['LOT', 'TYPE DE DOCUMENT', 'INDICE'],
+        values='Nombre de documents',
+        title='Répartition des documents par type de documents, lot et indice'
+    )
+    fig_type_indice.update_layout(height=800, width=1200)
+    documents_par_lot = compter_combinaisons(index, ['LOT'], positions)
+    fig_bar_lot = px.bar(
+        documents_par_lot,
+        y='LOT',
+        x='Nombre de documents',
+        orientation='h',
+        title="Nombre de documents par lot",
+        labels={"LOT": "Lot", "Nombre de documents": "Nombre de documents"},
+        color='Nombre de documents',
+        color_continuous_scale=px.colors.sequential.Viridis
+    )
+    fig_bar_lot.update_layout(yaxis={'categoryorder': 'total ascending'}, height=850, width=1000)
+    documents_par_type = compter_combinaisons(index, ['TYPE DE DOCUMENT'], positions)
+    fig_bar_type = px.bar(
+        documents_par_type,
+        y='TYPE DE DOCUMENT',
+        x='Nombre de documents',
+        orientation='h',
+        title="Nombre de documents par type de documents",
+        labels={"TYPE DE DOCUMENT": "Type de documents", "Nombre de documents": "Nombre de documents"},
+        color='Nombre de documents',
+        color_continuous_scale=px.colors.sequential.Viridis
+    )
+    fig_bar_type.update_layout(yaxis={'categoryorder': 'total ascending'}, height=850, width=1200)
+
+    tracer_graphique(fig_bar_lot, use_container_width=True)
+    tracer_graphique(fig_bar_type, use_container_width=True)
+    tracer_graphique(fig_treemap, use_container_width=True)
+    tracer_graphique(fig_type_indice2, use_container_width=True)
+    tracer_graphique(fig_type_indice, use_container_width=True)
@@ -0,0 +1,82 @@
+import pandas as pd
+import streamlit as st
+import plotly.express as px
+import plotly.graph_objects as go
+from index_temporel import HORIZON_MAX_MOIS, courbes_masse, date_debut, date_horizon, masse_a_horizon
+from donnees_ged import index_masse_projets
+from onglets.communs import generate_dynamic_colors
+from instrumentation import tracer_graphique
+
+# Fonction pour afficher l'onglet sur la masse de documents par projet
+def afficher(contexte):
+    # Index temporel de chaque projet : masse cumulée par jour depuis le premier dépôt de l'export, construit une fois par version
+    index_projets = index_masse_projets(contexte)
+    fenetre = contexte.get('periode')
+    st.header("Analyse de la masse de documents par projet")
+    toute_periode = st.checkbox('Toute la période', value=False, key='masse_toute_periode')
+    horizon_mois = st.slider('Horizon depuis le premier dépôt de chaque projet (mois)', 1, HORIZON_MAX_MOIS, 12, key='masse_horizon', disabled=toute_periode)
+    periode_selectionnee = None if toute_periode else horizon_mois
+    projets_selectionnes = st.multiselect('Sélectionnez les projets', list(index_projets.keys()), default=list(index_projets.keys()))
+    if fenetre is not None:
+        st.caption(f"Seuls les dépôts du {fenetre[0].strftime('%d/%m/%Y')} au {fenetre[1].strftime('%d/%m/%Y')} sont comptés ; l'horizon part toujours du premier dépôt du projet.")
+
+    def mise_a_jour_analyse_masse_documents(projets_selectionnes, periode_selectionnee):
+        donnees_barre = []
+        for projet in projets_selectionnes:
+            index = index_projets[projet]
+            if index['debut'] is None:
+                continue
+            donnees_barre.append({
+                'Chantier': projet,
+                'Masse de documents': masse_a_horizon(index, periode_selectionnee, fenetre),
+                'Date début': date_debut(index).strftime('%d %b %Y'),
+                'Date fin': date_horizon(index, periode_selectionnee).strftime('%d %b %Y')
+            })
+        df_barre = pd.DataFrame(donnees_barre)
+        df_barre = df_barre.sort_values(by='Masse de documents', ascending=False)
+        mediane_masse = df_barre['Masse de documents'].median()
+        df_barre['mediane'] = mediane_masse
+
+        # Générer des couleurs uniques pour chaque chantier
+        couleurs = generate_dynamic_colors(len(df_barre['Chantier']))
+
+        fig_barre = go.Figure()
+        fig_barre.add_trace(go.Bar(
+            x=df_barre['Chantier'], y=df_barre['Masse de documents'],
+            text=df_barre['Masse de documents'], textposition='auto',
+            name='Masse de documents',
+            marker_color=couleurs
+        ))
+        fig_barre.add_trace(go.Scatter(
+            x=df_barre['Chantier'], y=df_barre['mediane'],
+            mode='lines', name='Médiane',
+            line=dict(color='blue', dash='dash')
+        ))
+        for index, row in df_barre.iterrows():
+            fig_barre.add_annotation(
+                x=row['Chantier'], y=row['Masse de documents'],
+                text=f"{row['Masse de documents']}",
+                showarrow=True, arrowhead=2
+            )
+        fig_barre.update_layout(
+            title='Analyse de la masse de documents par projet',
+            xaxis_title='Chantier', yaxis_title='Masse de documents',
+            font=dict(size=15),
+            height=450,
+            width=1200,
+            yaxis=dict(title='Masse de documents', showgrid=True, zeroline=True, showline=True, showticklabels=True),
+            xaxis=dict(title='Chantier', showgrid=True, zeroline=True, showline=True, showticklabels=True)
+        )
+        return fig_barre
+
+    fig1 = mise_a_jour_analyse_masse_documents(projets_selectionnes, periode_selectionnee)
+    tracer_graphique(fig1, use_container_width=True)
+
+    # Courbes de masse cumulée alignées sur le début de chaque projet
+    courbes = courbes_masse({projet: index_projets[projet] for projet in projets_selectionnes}, fenetre)
+    fig_courbes = px.line(courbes, x='Jours depuis le début', y='Masse cumulée', color='Projet', line_shape='hv',
+                          title='Masse cumulée de documents depuis le premier dépôt de chaque projet')
+    if periode_selectionnee is not None and not courbes.empty:
+        fig_courbes.add_vline(x=periode_selectionnee * 365.25 / 12, line_dash='dash', line_color='grey')
+    fig_courbes.update_layout(height=450, xaxis_title='Jours depuis le premier dépôt', yaxis_title='Masse cumulée de documents')
+    tracer_graphique(fig_courbes, use_container_width=True)
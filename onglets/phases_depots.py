@@ -0,0 +1,6 @@
+import sal4
+from donnees_ged import index_projet
+
+# Fonction pour afficher l'onglet d'analyse des phases, séquences et anomalies de dépôt (page sal4.py appliquée au projet sélectionné)
+def afficher(contexte):
+    sal4.afficher_graphique(*index_projet(contexte))
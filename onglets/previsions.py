@@ -0,0 +1,64 @@
+import pandas as pd
+import streamlit as st
+import plotly.express as px
+import plotly.graph_objects as go
+from grille import afficher_grille
+from previsions_depots import HORIZON_MAX, calculer_previsions, premieres_semaines
+from donnees_ged import donnees_projets
+from instrumentation import tracer_graphique
+
+# Fonction pour afficher la prévision des dépôts par lot et type de document sur les prochaines semaines
+def afficher(contexte):
+    projets = donnees_projets(contexte)
+    projet_selectionne = contexte['projet_selectionne']
+    st.header("Prévision des dépôts")
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        projets_selectionnes = st.multiselect('Sélectionnez les projets', list(projets.keys()), default=[projet_selectionne], key='prevision_projets')
+    with col2:
+        horizon = st.slider('Horizon (semaines)', min_value=4, max_value=HORIZON_MAX, value=HORIZON_MAX, key='prevision_horizon')
+    with col3:
+        categorie = st.selectbox('Regrouper par', ['LOT', 'TYPE DE DOCUMENT'], key='prevision_categorie')
+    if not projets_selectionnes:
+        st.write("Sélectionnez au moins un projet.")
+        return
+
+    # Prévisions de toutes les séries LOT x TYPE de chaque projet, calculées une fois par export
+    tables_previsions, tables_historiques = [], []
+    for projet in projets_selectionnes:
+        previsions, historique = calculer_previsions(projets[projet])
+        tables_previsions.append(previsions.assign(Projet=projet))
+        tables_historiques.append(historique.assign(Projet=projet))
+    previsions = pd.concat(tables_previsions, ignore_index=True)
+    historique = pd.concat(tables_historiques, ignore_index=True)
+    previsions = premieres_semaines(previsions, horizon)
+
+    nb_series = previsions.drop_duplicates(['Projet', 'Lot', 'Type de Document'])
+    st.caption(f"{len(nb_series)} séries LOT x TYPE prévues : " + ', '.join(f"{nombre} {modele}" for modele, nombre in nb_series['Modèle'].value_counts().items()))
+
+    colonne = 'Lot' if categorie == 'LOT' else 'Type de Document'
+    charge = previsions.groupby(['Projet', colonne])['Prévision'].sum().round(1).reset_index()
+    charge = charge.rename(columns={colonne: categorie, 'Prévision': f'Dépôts attendus ({horizon} semaines)'}).sort_values(f'Dépôts attendus ({horizon} semaines)', ascending=False)
+
+    # Charge hebdomadaire attendue des principaux groupes
+    principaux = charge.head(10)
+    par_semaine = previsions.groupby(['Projet', colonne, 'Semaine'])['Prévision'].sum().reset_index()
+    par_semaine = par_semaine.merge(principaux[['Projet', categorie]].rename(columns={categorie: colonne}), on=['Projet', colonne])
+    par_semaine['Groupe'] = par_semaine['Projet'] + ' - ' + par_semaine[colonne].astype(str)
+    fig_charge = px.bar(par_semaine, x='Semaine', y='Prévision', color='Groupe', title=f'Dépôts attendus par semaine ({categorie}, 10 principaux)')
+    fig_charge.update_layout(xaxis_title='Semaine', yaxis_title='Dépôts attendus', height=500)
+    tracer_graphique(fig_charge, use_container_width=True)
+
+    # Historique récent et prévision d'un groupe
+    groupe_selectionne = st.selectbox(f'Détail d\'un {categorie}', (charge['Projet'] + ' - ' + charge[categorie].astype(str)).tolist(), key='prevision_groupe')
+    projet_groupe, nom_groupe = groupe_selectionne.split(' - ', 1)
+    serie = historique[(historique['Projet'] == projet_groupe) & (historique[colonne].astype(str) == nom_groupe)].groupby('Semaine')['Dépôts'].sum().tail(26)
+    prevue = previsions[(previsions['Projet'] == projet_groupe) & (previsions[colonne].astype(str) == nom_groupe)].groupby('Semaine')['Prévision'].sum()
+    fig_serie = go.Figure()
+    fig_serie.add_trace(go.Bar(x=serie.index, y=serie.values, name='Dépôts constatés', marker_color='lightgray'))
+    fig_serie.add_trace(go.Scatter(x=prevue.index, y=prevue.values, mode='lines+markers', name='Dépôts attendus', line=dict(color='#007BFF')))
+    fig_serie.update_layout(title=f'Dépôts hebdomadaires : {groupe_selectionne}', xaxis_title='Semaine', yaxis_title='Nombre de dépôts', height=400)
+    tracer_graphique(fig_serie, use_container_width=True)
+
+    st.subheader("Charge attendue")
+    afficher_grille(charge, cle='prevision_charge')
@@ -0,0 +1,43 @@
+import streamlit as st
+from grille import afficher_grille
+from donnees_ged import rapport_qualite
+from instrumentation import appel_en_cache
+
+# Anomalies présentées, avec la clé du rapport qui en donne le nombre
+ANOMALIES = {
+    'Dates de dépôt illisibles': 'dates_illisibles',
+    'Indices de format inconnu': None,
+    'Lignes décalées': 'lignes_decalees',
+    'Dépôts en double': 'doublons'
+}
+
+# Fonction pour afficher l'onglet de qualité des données du projet sélectionné (rapport calculé au chargement de l'export, sans relecture)
+def afficher(contexte):
+    projet = contexte['projet_selectionne']
+    rapport = appel_en_cache(f'Chargement {projet}', 'chargement', rapport_qualite, contexte['chemins'][projet])
+    st.header("Qualité des données")
+    st.caption(f"Contrôles faits au chargement de l'export {projet} : {rapport['nb_lignes']} dépôts lus")
+
+    nb_indices_inconnus = int(rapport['indices_inconnus']['Dépôts'].sum())
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric('Dates de dépôt illisibles', rapport['dates_illisibles'])
+    col2.metric('Indices manquants', rapport['indices_manquants'])
+    col3.metric('Indices de format inconnu', nb_indices_inconnus)
+    col4.metric('Lignes décalées', rapport['lignes_decalees'])
+    col5.metric('Dépôts en double', rapport['doublons'])
+
+    st.subheader("Valeurs manquantes et invalides par colonne")
+    colonnes = rapport['colonnes'].sort_values(['Taux invalide (%)', 'Taux manquant (%)'], ascending=False)
+    afficher_grille(colonnes, cle='qualite_colonnes')
+
+    if nb_indices_inconnus:
+        st.subheader("Indices de format inconnu")
+        st.dataframe(rapport['indices_inconnus'], hide_index=True)
+
+    # Premiers dépôts concernés par chaque anomalie
+    for anomalie, cle in ANOMALIES.items():
+        nombre = rapport[cle] if cle is not None else nb_indices_inconnus
+        if nombre:
+            exemples = rapport['exemples'][anomalie]
+            with st.expander(f"{anomalie} : {nombre} dépôts ({len(exemples)} premiers affichés)"):
+                st.dataframe(exemples, hide_index=True)
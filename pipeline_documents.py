@@ -0,0 +1,139 @@
+import argparse
+import glob
+import json
+import os
+import pandas as pd
+
+# Dossier des jeux de données dérivés (format Parquet, colonnes typées)
+DOSSIER_DERIVES = 'donnees_derivees'
+
+# Suffixes des fichiers dérivés : dépôts préparés et synthèse par document
+SUFFIXE_PRE = '_pré'
+SUFFIXE_REGROUPE = '_régroupe'
+
+# Catégorie de chaque type de document (les types inconnus sont classés dans CATEGORIE_DEFAUT)
+CATEGORIES_DOCUMENTS = {
+    'docs graphiques': ['CPE', 'DET', 'ELV', 'MQT', 'MTH', 'PCO', 'PDR', 'PFE', 'PGX', 'PIC', 'PLN', 'PMQ', 'PPH', 'PPR', 'PRE', 'PRX',
+                        'PSY', 'PTB', 'PTH', 'SCH', 'SYN', 'PLA', 'PLC', 'PLF', 'PLR', 'COU', 'COF', 'SYP'],
+    'docs écris': ['ANF', 'CRE', 'DAF', 'FAU', 'FEE', 'LDO', 'NDC', 'NTE', 'PAQ', 'PLG', 'PPS', 'PVX', 'RBC', 'NOT', 'NTC', 'NDH', 'NOM',
+                   'RAP', 'LIS', 'DOC', 'FTE', 'FTP', 'FTM', 'FQR', 'CAL', 'TAB', 'PRO', 'PVR', 'ORG', 'CCT', 'MET', 'MOP']
+}
+CATEGORIE_DEFAUT = 'autres docs'
+CATEGORIE_PAR_TYPE = {type_document: categorie for categorie, types in CATEGORIES_DOCUMENTS.items() for type_document in types}
+
+# Colonnes de l'export reprises dans les dépôts préparés (renommées comme dans les fichiers historiques)
+COLONNES_EXPORT = ['Date dépôt GED', 'LOT', 'LOT1', 'ZONE', 'NIVEAU', 'TYPE DE DOCUMENT', 'INDICE', 'Libellé du document', 'Dernier indice']
+
+# Clés d'un document dans la synthèse
+CLES_DOCUMENT = ['TYPE DE DOCUMENT', 'Categ_Docs', 'desc_lot', 'Libellé du document']
+
+# Fonction pour obtenir le nom de projet d'un export brut
+def nom_projet(chemin_export):
+    return os.path.splitext(os.path.basename(chemin_export))[0]
+
+# Fonction pour lister les exports bruts d'un dossier (les fichiers dérivés historiques sont ignorés)
+def lister_exports(dossier='.'):
+    return sorted(chemin for chemin in glob.glob(os.path.join(dossier, '*.csv'))
+                  if SUFFIXE_PRE not in chemin and SUFFIXE_REGROUPE not in chemin)
+
+# Fonction pour obtenir les chemins des fichiers dérivés d'un projet
+def chemins_derives(projet, dossier=DOSSIER_DERIVES):
+    return {
+        'pre': os.path.join(dossier, f'{projet}{SUFFIXE_PRE}.parquet'),
+        'regroupe': os.path.join(dossier, f'{projet}{SUFFIXE_REGROUPE}.parquet'),
+        'manifeste': os.path.join(dossier, f'{projet}.json')
+    }
+
+# Fonction pour préparer les dépôts d'un export brut en une passe vectorisée
+def preparer_depots(chemin_export):
+    donnees = pd.read_csv(chemin_export, encoding='iso-8859-1', sep=';', dtype=str, usecols=lambda colonne: colonne in COLONNES_EXPORT)
+    pre = pd.DataFrame({
+        'Date dépôt GED': pd.to_datetime(donnees['Date dépôt GED'], format='%d/%m/%Y', errors='coerce'),
+        # Numéro de lot quand l'export le fournit, sinon le libellé du lot
+        'LOT': donnees['LOT1'] if 'LOT1' in donnees.columns else donnees['LOT'],
+        'desc_lot': donnees['LOT']
+    })
+    for colonne in ['ZONE', 'NIVEAU']:
+        pre[colonne] = donnees[colonne] if colonne in donnees.columns else pd.Series(pd.NA, index=donnees.index, dtype='string')
+    pre['TYPE DE DOCUMENT'] = donnees['TYPE DE DOCUMENT']
+    pre['Categ_Docs'] = donnees['TYPE DE DOCUMENT'].map(CATEGORIE_PAR_TYPE).fillna(CATEGORIE_DEFAUT)
+    pre['INDICE'] = donnees['INDICE']
+    pre['Libellé du document'] = donnees['Libellé du document']
+    pre['Dernier indice'] = donnees['Dernier indice'] if 'Dernier indice' in donnees.columns else pd.NA
+    pre['Empreinte'] = pd.util.hash_pandas_object(pre, index=False).to_numpy()
+    return pre
+
+# Fonction pour résumer les dépôts par document : première et dernière date, écart, indices utilisés
+def synthetiser_documents(pre):
+    groupes = pre.groupby(CLES_DOCUMENT, dropna=False)
+    regroupe = groupes['Date dépôt GED'].agg(['min', 'max'])
+    regroupe['Différence en jours'] = (regroupe['max'] - regroupe['min']).dt.days
+    regroupe['Nombre d\'indices'] = groupes['INDICE'].nunique()
+    # Indices distincts triés, joints en une seule chaîne par document
+    indices = pre[CLES_DOCUMENT + ['INDICE']].dropna(subset=['INDICE']).drop_duplicates().sort_values('INDICE')
+    regroupe['Indices utilisés'] = indices.groupby(CLES_DOCUMENT, dropna=False)['INDICE'].agg(', '.join)
+    return regroupe.reset_index()
+
+# Fonction pour lire la signature d'un export (taille et date de modification)
+def signature_export(chemin_export):
+    etat = os.stat(chemin_export)
+    return {'source': os.path.abspath(chemin_export), 'taille': etat.st_size, 'date_modification': etat.st_mtime}
+
+# Fonction pour matérialiser les jeux dérivés d'un projet : rien n'est recalculé si l'export n'a pas changé,
+# seuls les documents dont des dépôts ont été ajoutés ou retirés sont resynthétisés sinon
+def materialiser_projet(chemin_export, dossier=DOSSIER_DERIVES, forcer=False):
+    os.makedirs(dossier, exist_ok=True)
+    chemins = chemins_derives(nom_projet(chemin_export), dossier)
+    signature = signature_export(chemin_export)
+    existants = all(os.path.exists(chemin) for chemin in chemins.values())
+    if existants and not forcer:
+        with open(chemins['manifeste'], encoding='utf-8') as fichier:
+            if {cle: valeur for cle, valeur in json.load(fichier).items() if cle in signature} == signature:
+                return chemins, 0
+
+    pre = preparer_depots(chemin_export)
+    if existants and not forcer:
+        ancien_pre = pd.read_parquet(chemins['pre'])
+        ancien_regroupe = pd.read_parquet(chemins['regroupe'])
+        # Dépôts ajoutés ou retirés (comparaison des empreintes de lignes, doublons compris)
+        nouveaux = pre['Empreinte'].groupby(pre['Empreinte']).cumcount()
+        anciens = ancien_pre['Empreinte'].groupby(ancien_pre['Empreinte']).cumcount()
+        cles_nouvelles = pd.MultiIndex.from_arrays([pre['Empreinte'], nouveaux])
+        cles_anciennes = pd.MultiIndex.from_arrays([ancien_pre['Empreinte'], anciens])
+        modifies = pd.concat([pre[~cles_nouvelles.isin(cles_anciennes)], ancien_pre[~cles_anciennes.isin(cles_nouvelles)]])
+        documents_touches = pd.MultiIndex.from_frame(modifies[CLES_DOCUMENT]).unique()
+        touches = pd.MultiIndex.from_frame(pre[CLES_DOCUMENT]).isin(documents_touches)
+        conserves = ~pd.MultiIndex.from_frame(ancien_regroupe[CLES_DOCUMENT]).isin(documents_touches)
+        regroupe = pd.concat([ancien_regroupe[conserves], synthetiser_documents(pre[touches])], ignore_index=True)
+        nb_documents = len(documents_touches)
+    else:
+        regroupe = synthetiser_documents(pre)
+        nb_documents = len(regroupe)
+
+    regroupe = regroupe.sort_values(CLES_DOCUMENT, na_position='last').reset_index(drop=True)
+    pre.to_parquet(chemins['pre'], index=False)
+    regroupe.to_parquet(chemins['regroupe'], index=False)
+    with open(chemins['manifeste'], 'w', encoding='utf-8') as fichier:
+        json.dump({**signature, 'nb_depots': len(pre), 'nb_documents': len(regroupe)}, fichier, ensure_ascii=False, indent=2)
+    return chemins, nb_documents
+
+# Fonction pour lire la synthèse par document d'un projet, matérialisée au besoin
+def charger_regroupe(chemin_export, dossier=DOSSIER_DERIVES):
+    chemins, _ = materialiser_projet(chemin_export, dossier)
+    return pd.read_parquet(chemins['regroupe'])
+
+# Fonction pour lire les dépôts préparés d'un projet, matérialisés au besoin
+def charger_pre(chemin_export, dossier=DOSSIER_DERIVES):
+    chemins, _ = materialiser_projet(chemin_export, dossier)
+    return pd.read_parquet(chemins['pre'])
+
+# Exécution en ligne de commande : python pipeline_documents.py [EXPORT.csv ...]
+if __name__ == '__main__':
+    analyseur = argparse.ArgumentParser(description="Matérialise les dépôts préparés et la synthèse par document de chaque export GED")
+    analyseur.add_argument('exports', nargs='*', help="exports bruts à traiter (par défaut : tous les exports du dossier courant)")
+    analyseur.add_argument('--dossier', default=DOSSIER_DERIVES, help="dossier de sortie des fichiers Parquet")
+    analyseur.add_argument('--forcer', action='store_true', help="reconstruit même si l'export n'a pas changé")
+    arguments = analyseur.parse_args()
+    for chemin_export in arguments.exports or lister_exports():
+        chemins, nb_documents = materialiser_projet(chemin_export, arguments.dossier, arguments.forcer)
+        print(f"{nom_projet(chemin_export)} : {nb_documents} documents recalculés -> {chemins['regroupe']}")
@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from clusters_depots import empreinte_colonnes
+
+# Horizon maximal de prévision, en semaines (les horizons plus courts sont lus dans la même prévision)
+HORIZON_MAX = 8
+
+# Période saisonnière du modèle naïf saisonnier, en semaines (cycle mensuel des dépôts)
+SAISON = 4
+
+# Paramètres de lissage : Croston (taille et intervalle des dépôts), Holt amorti (niveau, tendance, amortissement)
+ALPHA_CROSTON = 0.1
+ALPHA_HOLT = 0.3
+BETA_HOLT = 0.1
+AMORTISSEMENT_HOLT = 0.9
+
+# Intervalle moyen entre semaines avec dépôt au-delà duquel une série est intermittente (seuil de Syntetos-Boylan)
+SEUIL_INTERMITTENCE = 1.32
+
+# Fonction pour ramener des numéros de jour au lundi de leur semaine (le jour 0, 1er janvier 1970, est un jeudi)
+def lundi_semaine(jours):
+    jours = np.asarray(jours, dtype='int64')
+    return jours - (jours + 3) % 7
+
+# Fonction pour construire la matrice des dépôts hebdomadaires : une ligne par couple (LOT, TYPE), une colonne par semaine
+def series_hebdomadaires(donnees, colonne_lot='LOT', colonne_type='TYPE DE DOCUMENT', colonne_date='Date dépôt GED'):
+    jours = (pd.to_datetime(donnees[colonne_date]) - pd.Timestamp('1970-01-01')).dt.days
+    valides = jours.notna().to_numpy() & donnees[colonne_lot].notna().to_numpy() & donnees[colonne_type].notna().to_numpy()
+    # Numéro de semaine compté depuis le lundi 29 décembre 1969 (jour -3) : le lundi de la semaine n est le jour 7 * n - 3
+    semaines = (lundi_semaine(jours.to_numpy()[valides]) + 3) // 7
+    if len(semaines) == 0:
+        return pd.MultiIndex.from_tuples([], names=['Lot', 'Type de Document']), np.zeros((0, 0)), np.zeros(0, dtype='int64')
+    cles = pd.MultiIndex.from_arrays([donnees[colonne_lot].to_numpy()[valides], donnees[colonne_type].to_numpy()[valides]], names=['Lot', 'Type de Document'])
+    codes, index_series = cles.factorize()
+    premiere = semaines.min()
+    matrice = np.zeros((len(index_series), semaines.max() - premiere + 1))
+    np.add.at(matrice, (codes, semaines - premiere), 1)
+    return pd.MultiIndex.from_tuples(list(index_series), names=['Lot', 'Type de Document']), matrice, np.arange(premiere, semaines.max() + 1) * 7 - 3
+
+# Fonction pour repérer la première semaine avec dépôt de chaque série
+def debut_series(matrice):
+    return np.where(matrice.any(axis=1), np.argmax(matrice > 0, axis=1), matrice.shape[1])
+
+# Fonction pour prévoir toutes les séries avec le modèle naïf saisonnier (même semaine du cycle précédent)
+def prevoir_naif_saisonnier(matrice, horizon):
+    nb_semaines = matrice.shape[1]
+    saison = min(SAISON, nb_semaines)
+    colonnes = nb_semaines - saison + np.arange(horizon) % saison
+    return matrice[:, colonnes]
+
+# Fonction pour prévoir toutes les séries avec la méthode de Croston (taille moyenne des dépôts / intervalle moyen)
+def prevoir_croston(matrice, horizon):
+    nb_series = matrice.shape[0]
+    taille = np.zeros(nb_series)
+    intervalle = np.ones(nb_series)
+    attente = np.ones(nb_series)
+    initialise = np.zeros(nb_series, dtype=bool)
+    for semaine in range(matrice.shape[1]):
+        valeurs = matrice[:, semaine]
+        depot = valeurs > 0
+        premiers = depot & ~initialise
+        suivants = depot & initialise
+        taille[premiers] = valeurs[premiers]
+        intervalle[premiers] = attente[premiers]
+        taille[suivants] += ALPHA_CROSTON * (valeurs[suivants] - taille[suivants])
+        intervalle[suivants] += ALPHA_CROSTON * (attente[suivants] - intervalle[suivants])
+        initialise |= depot
+        attente = np.where(depot, 1, attente + 1)
+    niveau = np.where(initialise, taille / intervalle, 0.0)
+    return np.repeat(niveau[:, None], horizon, axis=1)
+
+# Fonction pour prévoir toutes les séries avec le lissage de Holt à tendance amortie (chaque série démarre à son premier dépôt)
+def prevoir_holt(matrice, horizon):
+    nb_series, nb_semaines = matrice.shape
+    debuts = debut_series(matrice)
+    niveau = np.zeros(nb_series)
+    tendance = np.zeros(nb_series)
+    for semaine in range(nb_semaines):
+        valeurs = matrice[:, semaine]
+        demarre = debuts == semaine
+        actifs = debuts < semaine
+        niveau[demarre] = valeurs[demarre]
+        nouveau_niveau = ALPHA_HOLT * valeurs + (1 - ALPHA_HOLT) * (niveau + AMORTISSEMENT_HOLT * tendance)
+        nouvelle_tendance = BETA_HOLT * (nouveau_niveau - niveau) + (1 - BETA_HOLT) * AMORTISSEMENT_HOLT * tendance
+        niveau = np.where(actifs, nouveau_niveau, niveau)
+        tendance = np.where(actifs, nouvelle_tendance, tendance)
+    cumul_amortissement = np.cumsum(AMORTISSEMENT_HOLT ** np.arange(1, horizon + 1))
+    return np.maximum(niveau[:, None] + tendance[:, None] * cumul_amortissement[None, :], 0.0)
+
+# Modèles disponibles, appliqués à toutes les séries à la fois
+MODELES = {
+    'Naïf saisonnier': prevoir_naif_saisonnier,
+    'Croston': prevoir_croston,
+    'Holt': prevoir_holt
+}
+
+# Fonction pour choisir un modèle par série : Croston pour les séries intermittentes, sinon le meilleur
+# des modèles naïf saisonnier et Holt sur les dernières semaines mises de côté
+def choisir_modeles(matrice, horizon=HORIZON_MAX):
+    nb_series, nb_semaines = matrice.shape
+    debuts = debut_series(matrice)
+    semaines_actives = nb_semaines - debuts
+    nb_depots = (matrice > 0).sum(axis=1)
+    intervalle_moyen = np.where(nb_depots > 0, semaines_actives / np.maximum(nb_depots, 1), np.inf)
+    choix = np.where(intervalle_moyen > SEUIL_INTERMITTENCE, 'Croston', 'Holt').astype(object)
+
+    if nb_semaines > 2 * horizon:
+        apprentissage, controle = matrice[:, :-horizon], matrice[:, -horizon:]
+        erreur_naif = np.abs(prevoir_naif_saisonnier(apprentissage, horizon) - controle).mean(axis=1)
+        erreur_holt = np.abs(prevoir_holt(apprentissage, horizon) - controle).mean(axis=1)
+        choix[(choix == 'Holt') & (erreur_naif < erreur_holt)] = 'Naïf saisonnier'
+    return choix
+
+# Fonction pour prévoir les dépôts hebdomadaires de toutes les séries d'un projet
+def prevoir_depots(donnees, horizon=HORIZON_MAX):
+    series, matrice, lundis = series_hebdomadaires(donnees)
+    if len(series) == 0:
+        return pd.DataFrame(columns=['Lot', 'Type de Document', 'Semaine', 'Prévision', 'Modèle']), pd.DataFrame(columns=['Lot', 'Type de Document', 'Semaine', 'Dépôts'])
+    choix = choisir_modeles(matrice, horizon)
+    prevision = np.zeros((len(series), horizon))
+    for nom, modele in MODELES.items():
+        lignes = choix == nom
+        if lignes.any():
+            prevision[lignes] = modele(matrice[lignes], horizon)
+
+    semaines_futures = pd.to_datetime(lundis[-1] + 7 * np.arange(1, horizon + 1), unit='D')
+    previsions = pd.DataFrame({
+        'Lot': np.repeat(series.get_level_values('Lot'), horizon),
+        'Type de Document': np.repeat(series.get_level_values('Type de Document'), horizon),
+        'Semaine': np.tile(semaines_futures, len(series)),
+        'Prévision': prevision.ravel(),
+        'Modèle': np.repeat(choix, horizon)
+    })
+    historique = pd.DataFrame({
+        'Lot': np.repeat(series.get_level_values('Lot'), len(lundis)),
+        'Type de Document': np.repeat(series.get_level_values('Type de Document'), len(lundis)),
+        'Semaine': np.tile(pd.to_datetime(lundis, unit='D'), len(series)),
+        'Dépôts': matrice.ravel()
+    })
+    return previsions, historique
+
+# Fonction pour garder les premières semaines de prévision de chaque projet (chaque projet est prévu à partir de sa dernière semaine de dépôts)
+def premieres_semaines(previsions, horizon):
+    return previsions[previsions.groupby('Projet')['Semaine'].rank(method='dense') <= horizon]
+
+# Fonction pour calculer les prévisions d'un projet (mis en cache par empreinte, les données ne sont pas hachées)
+@st.cache_data(show_spinner=False)
+def _calculer_previsions(empreinte, _donnees, horizon):
+    return prevoir_depots(_donnees, horizon)
+
+# Fonction pour obtenir les prévisions et l'historique hebdomadaire d'un projet
+def calculer_previsions(donnees, horizon=HORIZON_MAX):
+    empreinte = empreinte_colonnes(donnees, ['LOT', 'TYPE DE DOCUMENT', 'Date dépôt GED'])
+    return _calculer_previsions(empreinte, donnees, horizon)
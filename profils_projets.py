@@ -0,0 +1,143 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from pipeline_documents import DOSSIER_DERIVES, lister_exports, materialiser_projet, nom_projet, signature_export
+from moteur_alertes import calculer_alertes_export
+from regles_alertes import FICHIER_REGLES, compiler_regles
+
+# Dossier des profils de projet (un petit fichier JSON par projet)
+DOSSIER_PROFILS = os.path.join(DOSSIER_DERIVES, 'profils')
+
+# Nombre de mois suivis dans le profil, comptés depuis le premier dépôt du projet
+NB_MOIS_PROFIL = 36
+
+# Nombre de processus utilisés pour profiler les projets (None : un par cœur)
+NB_PROCESSUS = None
+
+# Indicateurs comparés entre projets et sens favorable de chacun (True : une valeur élevée est défavorable)
+INDICATEURS = {
+    'Masse de documents': False,
+    'Nombre de documents': False,
+    'Durée du projet (jours)': False,
+    'Indices moyens par document': True,
+    'Durée moyenne entre versions (jours)': True,
+    'Masse des 12 premiers mois': False
+}
+
+# Fonction pour calculer le profil d'un projet : quelques indicateurs, médianes par type de document,
+# volumes mensuels depuis le début du projet et part des groupes en alerte pour chaque règle
+def profil_projet(chemin_export, regles, dossier=DOSSIER_DERIVES):
+    chemins, _ = materialiser_projet(chemin_export, dossier)
+    pre = pd.read_parquet(chemins['pre'], columns=['Date dépôt GED'])
+    regroupe = pd.read_parquet(chemins['regroupe'])
+
+    # Volumes mensuels : mois écoulés depuis le premier dépôt, bornés à NB_MOIS_PROFIL
+    dates = pre['Date dépôt GED'].dropna()
+    volumes = np.zeros(NB_MOIS_PROFIL, dtype='int64')
+    if len(dates):
+        debut = dates.min()
+        mois = (dates.dt.year - debut.year) * 12 + dates.dt.month - debut.month
+        volumes = np.bincount(mois[mois < NB_MOIS_PROFIL], minlength=NB_MOIS_PROFIL)
+
+    types = regroupe.groupby('TYPE DE DOCUMENT').agg(**{
+        'Documents': ('Libellé du document', 'size'),
+        'Médiane des indices': ('Nombre d\'indices', 'median'),
+        'Médiane de la durée (jours)': ('Différence en jours', 'median')
+    })
+
+    # Part des groupes (LOT et TYPE) dont le niveau d'alerte dépasse le premier niveau, pour chaque règle
+    niveaux = calculer_alertes_export(nom_projet(chemin_export), chemin_export, regles)
+    alertes = {regle['nom']: round(float((niveaux[regle['colonne']] > 0).mean() * 100), 1) if len(niveaux) else 0.0 for regle in regles}
+
+    indicateurs = {
+        'Masse de documents': int(len(dates)),
+        'Nombre de documents': int(len(regroupe)),
+        'Durée du projet (jours)': int((dates.max() - dates.min()).days) if len(dates) else 0,
+        'Indices moyens par document': round(float(regroupe['Nombre d\'indices'].mean()), 2) if len(regroupe) else None,
+        'Durée moyenne entre versions (jours)': round(float(regroupe['Différence en jours'].mean()), 1) if len(regroupe) else None,
+        'Masse des 12 premiers mois': int(volumes[:12].sum())
+    }
+    return {
+        'projet': nom_projet(chemin_export),
+        'signature': signature_export(chemin_export),
+        'debut': dates.min().strftime('%Y-%m-%d') if len(dates) else None,
+        'indicateurs': indicateurs,
+        'alertes': alertes,
+        'volumes_mensuels': volumes.tolist(),
+        'types': json.loads(types.to_json(orient='index'))
+    }
+
+# Fonction pour lire le profil enregistré d'un projet (None s'il n'existe pas ou si l'export a changé depuis)
+def lire_profil(chemin_export, dossier_profils=DOSSIER_PROFILS):
+    chemin_profil = os.path.join(dossier_profils, f'{nom_projet(chemin_export)}.json')
+    if not os.path.exists(chemin_profil):
+        return None
+    with open(chemin_profil, encoding='utf-8') as fichier:
+        profil = json.load(fichier)
+    return profil if profil['signature'] == signature_export(chemin_export) else None
+
+# Fonction pour profiler un projet et enregistrer son profil (exécutée dans un processus de calcul)
+def _profiler_et_enregistrer(chemin_export, regles, dossier_profils):
+    profil = profil_projet(chemin_export, regles)
+    with open(os.path.join(dossier_profils, f"{profil['projet']}.json"), 'w', encoding='utf-8') as fichier:
+        json.dump(profil, fichier, ensure_ascii=False)
+    return profil
+
+# Fonction pour obtenir les profils de projets : les profils à jour sont relus, les autres sont recalculés en parallèle,
+# un projet par processus (chaque processus ne charge qu'un export à la fois)
+def calculer_profils(chemins_exports, regles, dossier_profils=DOSSIER_PROFILS, nb_processus=NB_PROCESSUS):
+    os.makedirs(dossier_profils, exist_ok=True)
+    profils = {chemin: lire_profil(chemin, dossier_profils) for chemin in chemins_exports}
+    a_calculer = [chemin for chemin, profil in profils.items() if profil is None]
+    if len(a_calculer) == 1:
+        profils[a_calculer[0]] = _profiler_et_enregistrer(a_calculer[0], regles, dossier_profils)
+    elif a_calculer:
+        with ProcessPoolExecutor(max_workers=nb_processus) as executeur:
+            for chemin, profil in zip(a_calculer, executeur.map(_profiler_et_enregistrer, a_calculer, [regles] * len(a_calculer), [dossier_profils] * len(a_calculer))):
+                profils[chemin] = profil
+    return {profil['projet']: profil for profil in profils.values()}
+
+# Fonction pour assembler les indicateurs et les parts d'alerte de tous les profils en un tableau (une ligne par projet)
+def tableau_indicateurs(profils):
+    lignes = [{'Projet': projet, **profil['indicateurs'], **{f'Groupes en alerte (%) - {nom}': part for nom, part in profil['alertes'].items()}}
+              for projet, profil in profils.items()]
+    return pd.DataFrame(lignes).set_index('Projet')
+
+# Fonction pour positionner un projet parmi les autres : rang (1 = valeur la plus favorable) et centile de chaque indicateur
+# (100 = valeur la plus favorable, dans le même sens que le rang)
+def positionner_projet(tableau, projet):
+    defavorables = {colonne: INDICATEURS.get(colonne, colonne.startswith('Groupes en alerte')) for colonne in tableau.columns}
+    rangs = pd.DataFrame({colonne: tableau[colonne].rank(ascending=defavorables[colonne], method='min') for colonne in tableau.columns})
+    centiles = pd.DataFrame({colonne: tableau[colonne].rank(ascending=not defavorables[colonne], pct=True, method='max') * 100 for colonne in tableau.columns})
+    return pd.DataFrame({
+        'Indicateur': tableau.columns,
+        'Valeur': tableau.loc[projet].to_numpy(),
+        'Médiane des projets': tableau.median().to_numpy(),
+        'Rang': rangs.loc[projet].to_numpy(),
+        'Centile': centiles.loc[projet].round(0).to_numpy(),
+        'Nombre de projets': tableau.notna().sum().to_numpy()
+    })
+
+# Fonction pour assembler une médiane par type de document de tous les profils (une ligne par type, une colonne par projet)
+def tableau_types(profils, mesure='Médiane des indices'):
+    return pd.DataFrame({projet: {type_document: valeurs[mesure] for type_document, valeurs in profil['types'].items()}
+                         for projet, profil in profils.items()})
+
+# Fonction pour assembler les volumes mensuels de tous les profils, alignés sur le début de chaque projet
+def tableau_volumes(profils):
+    return pd.DataFrame([{'Projet': projet, 'Mois depuis le début': mois + 1, 'Dépôts': volume}
+                         for projet, profil in profils.items() for mois, volume in enumerate(profil['volumes_mensuels'])])
+
+# Exécution en ligne de commande : python profils_projets.py [EXPORT.csv ...]
+if __name__ == '__main__':
+    analyseur = argparse.ArgumentParser(description="Calcule les profils de comparaison des projets GED")
+    analyseur.add_argument('exports', nargs='*', help="exports bruts à profiler (par défaut : tous les exports du dossier courant)")
+    analyseur.add_argument('--processus', type=int, default=NB_PROCESSUS, help="nombre de processus de calcul")
+    arguments = analyseur.parse_args()
+    with open(FICHIER_REGLES, encoding='utf-8') as fichier:
+        regles = compiler_regles(json.load(fichier))
+    profils = calculer_profils(arguments.exports or lister_exports(), regles, nb_processus=arguments.processus)
+    print(tableau_indicateurs(profils).to_string())
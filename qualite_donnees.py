@@ -0,0 +1,79 @@
+import pandas as pd
+
+# Colonnes qui identifient un dépôt : deux lignes identiques sur ces colonnes sont un dépôt en double
+COLONNES_DEPOT = ['PROJET', 'EMET', 'LOT', 'TYPE DE DOCUMENT', 'Numéro', 'Numéro de document', 'INDICE', 'Libellé du document', 'Date dépôt GED']
+
+# Formats d'indice reconnus : indice numérique initial (0) ou une à deux lettres majuscules (A, B, ..., AA)
+MOTIF_INDICE = r'[0-9]|[A-Z]{1,2}'
+
+# Motif d'une date au format des exports, pour repérer une date lue dans une colonne voisine
+MOTIF_DATE = r'\d{2}/\d{2}/\d{4}'
+
+# Nombre de colonnes de part et d'autre de la date de dépôt examinées pour repérer une ligne décalée
+DECALAGE_MAX = 2
+
+# Nombre de lignes d'exemple gardées pour chaque anomalie
+NB_EXEMPLES = 50
+
+# Fonction pour extraire les premières lignes d'une anomalie, numérotées dans l'ordre des dépôts du fichier
+# (avec le texte lu de la date de dépôt quand il est fourni)
+def _exemples(donnees, masque, colonnes, dates_lues=None):
+    exemples = donnees.loc[masque, [colonne for colonne in colonnes if colonne in donnees.columns]].head(NB_EXEMPLES)
+    if dates_lues is not None:
+        exemples.insert(0, 'Date lue', dates_lues.loc[exemples.index])
+    exemples.index = exemples.index + 1
+    return exemples.rename_axis('N° du dépôt').reset_index()
+
+# Fonction pour contrôler la qualité d'un export pendant son chargement, sur les valeurs lues dans le fichier
+# (dates_lues : texte de la date de dépôt avant conversion ; donnees : export lu, date de dépôt convertie, lignes dans l'ordre du fichier)
+def controler_qualite(donnees, dates_lues):
+    nb_lignes = len(donnees)
+    manquants = donnees.isna().sum()
+
+    # Dates de dépôt présentes dans le fichier mais illisibles (remplacées par une date manquante au chargement)
+    dates_illisibles = dates_lues.notna() & dates_lues.str.strip().ne('') & donnees['Date dépôt GED'].isna()
+
+    # Lignes décalées : date de dépôt illisible alors qu'une colonne voisine contient une date
+    decalees = pd.Series(False, index=donnees.index)
+    if dates_illisibles.any():
+        position = donnees.columns.get_loc('Date dépôt GED')
+        voisines = [donnees.columns[position + ecart] for ecart in range(-DECALAGE_MAX, DECALAGE_MAX + 1)
+                    if ecart != 0 and 0 <= position + ecart < len(donnees.columns)]
+        suspectes = donnees.loc[dates_illisibles, voisines].astype(str)
+        decalees.loc[suspectes.index] = suspectes.apply(lambda colonne: colonne.str.fullmatch(MOTIF_DATE)).any(axis=1)
+
+    # Indices absents ou de format inconnu (contrôlés sur les valeurs distinctes)
+    indices = donnees['INDICE'].value_counts()
+    indices_inconnus = indices[~indices.index.to_series().str.fullmatch(MOTIF_INDICE).to_numpy()]
+    indices_invalides = donnees['INDICE'].isin(indices_inconnus.index)
+
+    # Dépôts en double : toutes les colonnes qui identifient un dépôt sont identiques
+    colonnes_depot = [colonne for colonne in COLONNES_DEPOT if colonne in donnees.columns]
+    doublons = donnees.duplicated(subset=colonnes_depot, keep='first')
+
+    invalides = pd.Series(0, index=donnees.columns)
+    invalides['Date dépôt GED'] = int(dates_illisibles.sum())
+    invalides['INDICE'] = int(indices_invalides.sum())
+    colonnes = pd.DataFrame({
+        'Colonne': donnees.columns,
+        'Valeurs manquantes': manquants.to_numpy(),
+        'Taux manquant (%)': (100 * manquants / max(nb_lignes, 1)).round(1).to_numpy(),
+        'Valeurs invalides': invalides.to_numpy(),
+        'Taux invalide (%)': (100 * invalides / max(nb_lignes, 1)).round(1).to_numpy()
+    })
+    colonnes_exemple = ['PROJET', 'LOT', 'TYPE DE DOCUMENT', 'INDICE', 'Libellé du document']
+    return {
+        'nb_lignes': nb_lignes,
+        'colonnes': colonnes,
+        'dates_illisibles': int(dates_illisibles.sum()),
+        'indices_manquants': int(manquants['INDICE']),
+        'indices_inconnus': indices_inconnus.rename_axis('INDICE').reset_index(name='Dépôts'),
+        'lignes_decalees': int(decalees.sum()),
+        'doublons': int(doublons.sum()),
+        'exemples': {
+            'Dates de dépôt illisibles': _exemples(donnees, dates_illisibles, colonnes_exemple, dates_lues),
+            'Indices de format inconnu': _exemples(donnees, indices_invalides, colonnes_exemple),
+            'Lignes décalées': _exemples(donnees, decalees, colonnes_exemple, dates_lues),
+            'Dépôts en double': _exemples(donnees, doublons, colonnes_depot)
+        }
+    }
@@ -0,0 +1,96 @@
+import json
+import os
+import re
+import numpy as np
+import streamlit as st
+
+# Fichier de règles utilisé par défaut
+FICHIER_REGLES = 'regles_alertes.json'
+
+# Sens possibles d'une règle : 'croissant' = une valeur élevée est défavorable
+SENS_REGLE = ('croissant', 'decroissant')
+
+# Fonction pour vérifier qu'une liste de seuils est cohérente avec les niveaux d'une règle
+def _verifier_seuils(seuils, nb_niveaux, identifiant):
+    seuils = np.asarray(seuils, dtype=float)
+    if seuils.ndim != 1 or len(seuils) + 1 != nb_niveaux:
+        raise ValueError(f"Règle '{identifiant}' : {nb_niveaux} niveaux demandent {nb_niveaux - 1} seuils, {len(seuils)} fournis")
+    if np.any(np.diff(seuils) < 0):
+        raise ValueError(f"Règle '{identifiant}' : les seuils doivent être rangés par ordre croissant")
+    return seuils
+
+# Fonction pour compiler une règle déclarative (seuils en tableaux, surcharges prêtes à être appliquées par masque)
+def compiler_regle(regle):
+    identifiant = regle['identifiant']
+    if regle.get('sens', 'croissant') not in SENS_REGLE:
+        raise ValueError(f"Règle '{identifiant}' : sens inconnu '{regle.get('sens')}'")
+    niveaux = regle['niveaux']
+    surcharges = []
+    for surcharge in regle.get('surcharges', []):
+        surcharges.append({
+            'projets': set(surcharge['projets']) if surcharge.get('projets') else None,
+            'regroupement': surcharge.get('regroupement'),
+            'groupes': re.compile(surcharge['groupes']) if surcharge.get('groupes') else None,
+            'seuils': _verifier_seuils(surcharge['seuils'], len(niveaux), identifiant)
+        })
+    return {
+        'identifiant': identifiant,
+        'nom': regle.get('nom', identifiant),
+        'metrique': regle['metrique'],
+        'croissant': regle.get('sens', 'croissant') == 'croissant',
+        'seuils': _verifier_seuils(regle['seuils'], len(niveaux), identifiant),
+        'surcharges': surcharges,
+        'colonne': f"Niveau {identifiant}",
+        'libelles': {i: niveau['libelle'] for i, niveau in enumerate(niveaux)},
+        'couleurs': {niveau['libelle']: niveau['couleur'] for niveau in niveaux}
+    }
+
+# Fonction pour compiler l'ensemble des règles d'une définition
+def compiler_regles(definition):
+    regles = [compiler_regle(regle) for regle in definition['regles']]
+    identifiants = [regle['identifiant'] for regle in regles]
+    if len(set(identifiants)) != len(identifiants):
+        raise ValueError("Chaque règle doit avoir un identifiant unique")
+    return regles
+
+# Fonction pour charger et compiler un fichier de règles (recompilé seulement si le fichier change)
+@st.cache_resource(show_spinner=False)
+def _charger_regles(chemin_fichier, date_modification):
+    with open(chemin_fichier, encoding='utf-8') as fichier:
+        return compiler_regles(json.load(fichier))
+
+# Fonction pour obtenir les règles compilées du fichier de règles
+def charger_regles(chemin_fichier=FICHIER_REGLES):
+    return _charger_regles(chemin_fichier, os.path.getmtime(chemin_fichier))
+
+# Fonction pour évaluer une règle compilée sur la table des agrégats (une comparaison vectorisée par seuil)
+def evaluer_regle(agregats, regle):
+    nb_groupes = len(agregats)
+    seuils = np.tile(regle['seuils'], (nb_groupes, 1))
+    for surcharge in regle['surcharges']:
+        masque = np.ones(nb_groupes, dtype=bool)
+        if surcharge['projets'] is not None:
+            masque &= agregats['Projet'].isin(surcharge['projets']).to_numpy()
+        if surcharge['regroupement'] is not None:
+            masque &= (agregats['Regroupement'] == surcharge['regroupement']).to_numpy()
+        if surcharge['groupes'] is not None:
+            masque &= agregats['Groupe'].astype(str).str.contains(surcharge['groupes']).to_numpy()
+        seuils[masque] = surcharge['seuils']
+
+    # Le niveau est le nombre de seuils franchis ; une métrique manquante (ou absente de la table) reste au premier niveau
+    if regle['metrique'] in agregats.columns:
+        valeurs = agregats[regle['metrique']].to_numpy(dtype=float)[:, None]
+    else:
+        valeurs = np.full((nb_groupes, 1), np.nan)
+    franchis = valeurs > seuils if regle['croissant'] else valeurs < seuils
+    return franchis.sum(axis=1)
+
+# Fonction pour ajouter à la table des agrégats le niveau de chaque règle
+def evaluer_regles(agregats, regles):
+    return agregats.assign(**{regle['colonne']: evaluer_regle(agregats, regle) for regle in regles})
+
+# Fonction pour produire la fonction de style d'une cellule à partir des couleurs d'une règle
+def style_regle(regle):
+    def colorer(valeur):
+        return f"background-color: {regle['couleurs'].get(valeur, 'white')}"
+    return colorer
@@ -1,14 +1,20 @@
 import pandas as pd
 import streamlit as st
 import plotly.express as px
-from sklearn.cluster import KMeans
-from sklearn.ensemble import IsolationForest
-from datetime import datetime, timedelta
+import plotly.graph_objs as go
+from datetime import timedelta
 from PIL import Image
 import os
+from grille import afficher_grille, formater_date
+from donnees_ged import depots_lot_periode, tranche_analyse
+from doublons_libelles import cle_document
+from clusters_depots import K_MAX, attribuer_phases, part_expliquee, segmenter_lots
+from anomalies_depots import SEUIL_SCORE, detecter_anomalies_lots
+from sequences_depots import calculer_sequences, jours_depuis_epoque, ordre_type_diffusion, sequence_lot
 
-# Configurer le thème Streamlit
-st.set_page_config(layout="wide")
+# Configurer le thème Streamlit (déjà configuré quand la page est ouverte comme onglet de app_ged.py)
+if __name__ == '__main__':
+    st.set_page_config(layout="wide")
 st.markdown("""
     <style>
     .css-18e3th9 {
@@ -59,8 +65,10 @@ def charger_donnees_uploaded(file):
 # Fonction pour prétraiter les données
 @st.cache_data
 def pretraiter_donnees(donnees):
+    # Clé de document corrigée : les libellés quasi identiques d'un même document (révisions, formats) sont regroupés
+    donnees = donnees.assign(Document=cle_document(donnees))
     donnees = donnees.sort_values(by=['TYPE DE DOCUMENT', 'Date dépôt GED'])
-    group = donnees.groupby(['TYPE DE DOCUMENT', 'LOT', 'Libellé du document'])
+    group = donnees.groupby(['TYPE DE DOCUMENT', 'LOT', 'Document'])
     donnees['Date première version'] = group['Date dépôt GED'].transform('min')
     donnees['Date dernière version'] = group['Date dépôt GED'].transform('max')
     donnees['Différence en jours'] = (donnees['Date dernière version'] - donnees['Date première version']).dt.days
@@ -75,8 +83,8 @@ def pretraiter_donnees(donnees):
     donnees['Date fin'] = donnees.groupby('LOT')['Date dépôt GED'].transform('max')
     
     # Calculer les durées entre chaque version pour chaque document
-    donnees = donnees.sort_values(by=['Libellé du document', 'Date dépôt GED'])
-    donnees['Durée entre versions'] = donnees.groupby('Libellé du document')['Date dépôt GED'].diff().dt.days
+    donnees = donnees.sort_values(by=['Document', 'Date dépôt GED'])
+    donnees['Durée entre versions'] = donnees.groupby('Document')['Date dépôt GED'].diff().dt.days
 
     # Remplacer les valeurs manquantes dans 'Durée entre versions' par 0
     donnees['Durée entre versions'] = donnees['Durée entre versions'].fillna(0)
@@ -112,33 +120,41 @@ def filtrer_donnees_par_periode(donnees, periode):
     
     return donnees[(donnees['Date dépôt GED'] >= date_debut) & (donnees['Date dépôt GED'] <= date_fin)]
 
-# Calculer la séquence moyenne des documents par type
-def calculer_sequence_moyenne(donnees):
-    donnees['Date dépôt GED Ordinale'] = donnees['Date dépôt GED'].map(pd.Timestamp.toordinal)
-    moyenne_dates = donnees.groupby('TYPE DE DOCUMENT')['Date dépôt GED Ordinale'].mean()
-    moyenne_dates = moyenne_dates.map(lambda x: datetime.fromordinal(int(round(x))))
-    moyenne_dates = moyenne_dates.reset_index()
-    moyenne_dates.columns = ['Type de Document', 'Date Moyenne de Dépôt GED']
-    return moyenne_dates
-
-# Détection des anomalies dans la séquence de diffusion des documents
-def detecter_anomalies(donnees):
-    donnees['Timestamp'] = donnees['Date dépôt GED'].map(pd.Timestamp.timestamp)
-    model = IsolationForest(contamination=0.05)
-    donnees['Anomalie'] = model.fit_predict(donnees[['Timestamp']])
+# Calculer la séquence moyenne des documents par type (lue dans les statistiques précalculées pour tous les lots)
+def calculer_sequence_moyenne(sequences, lot):
+    return sequence_lot(sequences, lot)
+
+# Détection des anomalies dans la séquence de diffusion des documents : un dépôt est anormal s'il tombe un jour
+# où le rythme de dépôt du lot dépasse nettement sa moyenne mobile (séries précalculées pour tous les lots)
+def detecter_anomalies(donnees, scores_lot):
+    jours_anormaux = scores_lot.loc[scores_lot['Anomalie'], 'Jour'].to_numpy()
+    jours = (donnees['Date dépôt GED'] - pd.Timestamp('1970-01-01')).dt.days
+    donnees['Anomalie'] = jours.isin(jours_anormaux).map({True: 'Pic de dépôts inhabituel', False: 'Rythme habituel'})
     return donnees
 
-# Fonction pour afficher les graphiques selon l'onglet sélectionné
-def afficher_graphique(donnees):
+# Fonction pour afficher les graphiques selon l'onglet sélectionné (avec l'index des filtres du projet quand il est fourni)
+def afficher_graphique(donnees, index=None):
     st.header("Analyse séquentielle des documents")
     
     # Sélection de la période d'analyse
     periode = st.radio('Sélectionnez la période d\'analyse', ('6 mois', '1 an', 'Toute la période'), index=0)
     
-    donnees_filtrees = filtrer_donnees_par_periode(donnees, periode)
+    if index is not None:
+        # Données triées par date : la période est une tranche de lignes trouvée par recherche dichotomique
+        tranche = tranche_analyse(index['jours'], periode)
+        donnees_filtrees = donnees.iloc[tranche[0]:tranche[1]]
+    else:
+        donnees_filtrees = filtrer_donnees_par_periode(donnees, periode)
+    # Phases de dépôt de tous les lots de la période, calculées une seule fois pour tous les nombres de phases
+    segmentations = segmenter_lots(donnees_filtrees)
+    scores_journaliers = detecter_anomalies_lots(donnees_filtrees)
+    sequences = calculer_sequences(donnees_filtrees)
     
     lot_selectionne = st.selectbox('Sélectionnez un Lot', donnees_filtrees['LOT'].unique(), key='analyse_lot')
-    donnees_lot = donnees_filtrees[donnees_filtrees['LOT'] == lot_selectionne]
+    if index is not None:
+        donnees_lot = depots_lot_periode(donnees, index, lot_selectionne, tranche)
+    else:
+        donnees_lot = donnees_filtrees[donnees_filtrees['LOT'] == lot_selectionne]
 
     st.subheader(f"Analyse séquentielle des documents pour le Lot {lot_selectionne} sur {periode}")
 
@@ -155,28 +171,62 @@ def afficher_graphique(donnees):
     st.plotly_chart(fig_sequence, use_container_width=True)
 
     # Séquence moyenne de diffusion des documents
-    moyenne_dates = calculer_sequence_moyenne(donnees_lot)
+    moyenne_dates = calculer_sequence_moyenne(sequences, lot_selectionne)
     fig_sequence_moyenne = px.scatter(moyenne_dates, x='Date Moyenne de Dépôt GED', y='Type de Document', 
-                                      title='Séquence moyenne de diffusion des documents', labels={'Date Moyenne de Dépôt GED': 'Date Moyenne de Dépôt GED'})
+                                      title='Séquence moyenne de diffusion des documents', labels={'Date Moyenne de Dépôt GED': 'Date Moyenne de Dépôt GED'},
+                                      hover_data=['Médiane', 'Premier quartile', 'Troisième quartile', 'Nombre de dépôts'])
+    # Intervalle interquartile des dates de dépôt de chaque type
+    for _, ligne in moyenne_dates.iterrows():
+        fig_sequence_moyenne.add_shape(type='line', x0=ligne['Premier quartile'], x1=ligne['Troisième quartile'], y0=ligne['Type de Document'], y1=ligne['Type de Document'], line=dict(color='lightgray', width=6), layer='below')
     st.plotly_chart(fig_sequence_moyenne, use_container_width=True)
 
-    # Analyse par clustering
-    donnees_lot['Timestamp'] = donnees_lot['Date dépôt GED'].map(pd.Timestamp.timestamp)
-    kmeans = KMeans(n_clusters=3)
-    donnees_lot['Cluster'] = kmeans.fit_predict(donnees_lot[['Timestamp']])
-    fig_clustering = px.scatter(donnees_lot, x='Date dépôt GED', y='TYPE DE DOCUMENT', color='Cluster', 
+    # Ordre type de diffusion : place de chaque type de document dans la durée de chaque lot
+    st.subheader("Ordre type de diffusion")
+    positions, ordre_type = ordre_type_diffusion(sequences)
+    fig_ordre = px.imshow(positions, aspect='auto', color_continuous_scale='Viridis', zmin=0, zmax=1,
+                          labels=dict(x='Lot', y='Type de Document', color='Position relative'),
+                          title="Position de la date médiane de chaque type dans la durée du lot (0 = début, 1 = fin)")
+    fig_ordre.update_layout(height=max(400, 22 * len(positions)))
+    st.plotly_chart(fig_ordre, use_container_width=True)
+    afficher_grille(ordre_type, cle='ordre_type_diffusion', formats={'Position type': '{:.2f}'.format, 'Dispersion entre lots': '{:.2f}'.format})
+
+    # Analyse par clustering : phases de dépôt précalculées, le nombre de phases ne demande aucun nouveau calcul
+    segmentation = segmentations.get(lot_selectionne)
+    nb_phases_max = len(segmentation['couts']) if segmentation is not None else 0
+    if nb_phases_max > 1:
+        nb_phases = st.slider('Nombre de phases de dépôt', min_value=1, max_value=nb_phases_max, value=min(3, nb_phases_max), key='analyse_nb_phases')
+    else:
+        nb_phases = 1
+    if segmentation is not None:
+        donnees_lot['Cluster'] = attribuer_phases(donnees_lot['Date dépôt GED'], segmentation, nb_phases).map(lambda phase: f'Phase {phase:.0f}' if pd.notna(phase) else None)
+        st.caption(f"Part de la dispersion des dates expliquée par {nb_phases} phase(s) : {part_expliquee(segmentation)[nb_phases - 1]:.0%}")
+    else:
+        donnees_lot['Cluster'] = None
+    fig_clustering = px.scatter(donnees_lot, x='Date dépôt GED', y='TYPE DE DOCUMENT', color='Cluster', category_orders={'Cluster': [f'Phase {phase}' for phase in range(1, K_MAX + 1)]},
                                 title='Clustering des documents par date de dépôt', hover_data=['Libellé du document'])
     st.plotly_chart(fig_clustering, use_container_width=True)
 
     # Détection des anomalies
-    donnees_lot = detecter_anomalies(donnees_lot)
+    scores_lot = scores_journaliers[scores_journaliers['Groupe'] == lot_selectionne]
+    donnees_lot = detecter_anomalies(donnees_lot, scores_lot)
     fig_anomalies = px.scatter(donnees_lot, x='Date dépôt GED', y='TYPE DE DOCUMENT', color='Anomalie',
                                title='Détection des anomalies dans la séquence de diffusion des documents', hover_data=['Libellé du document'])
     st.plotly_chart(fig_anomalies, use_container_width=True)
 
+    # Rythme de dépôt journalier du lot et bande attendue (moyenne mobile + seuil d'anomalie)
+    dates_scores = pd.to_datetime(scores_lot['Jour'], unit='D')
+    fig_rythme = go.Figure()
+    fig_rythme.add_trace(go.Bar(x=dates_scores, y=scores_lot['Nombre de dépôts'], name='Dépôts du jour', marker_color='lightgray'))
+    fig_rythme.add_trace(go.Scatter(x=dates_scores, y=scores_lot['Moyenne attendue'], mode='lines', name='Moyenne attendue'))
+    fig_rythme.add_trace(go.Scatter(x=dates_scores, y=scores_lot['Moyenne attendue'] + SEUIL_SCORE * scores_lot['Echelle'], mode='lines', name="Seuil d'anomalie", line=dict(dash='dash')))
+    pics = scores_lot[scores_lot['Anomalie']]
+    fig_rythme.add_trace(go.Scatter(x=pd.to_datetime(pics['Jour'], unit='D'), y=pics['Nombre de dépôts'], mode='markers', name='Pic inhabituel', marker=dict(color='red', size=9)))
+    fig_rythme.update_layout(title='Rythme de dépôt journalier du lot', xaxis_title='Date', yaxis_title='Nombre de dépôts')
+    st.plotly_chart(fig_rythme, use_container_width=True)
+
     # Analyse de corrélation
     st.subheader("Analyse de corrélation")
-    donnees_lot['Date Ordinale'] = donnees_lot['Date dépôt GED'].map(pd.Timestamp.toordinal)
+    donnees_lot['Date Ordinale'] = jours_depuis_epoque(donnees_lot['Date dépôt GED'])
     corr_matrix = donnees_lot[['Date Ordinale', 'Durée entre versions']].corr()
     fig_corr = px.imshow(corr_matrix, text_auto=True, title='Matrice de corrélation')
     st.plotly_chart(fig_corr, use_container_width=True)
@@ -188,7 +238,7 @@ def afficher_graphique(donnees):
     }).reset_index()
     resume.columns = ['Type de Document', 'Date début', 'Date fin', 'Durée moyenne entre versions (jours)']
     st.subheader("Résumé statistique")
-    st.dataframe(resume)
+    afficher_grille(resume, cle='resume_sequentiel', formats={'Date début': formater_date, 'Date fin': formater_date})
 
     # Ajout de Synthèse et Recommandations
     st.subheader("Synthèse et Recommandations")
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from clusters_depots import empreinte_colonnes
+
+# Origine des numéros de jour
+EPOQUE = pd.Timestamp('1970-01-01')
+
+# Quantiles calculés pour chaque type de document
+QUANTILES = {'Premier quartile': 0.25, 'Médiane': 0.5, 'Troisième quartile': 0.75}
+
+# Fonction pour convertir des dates en numéros de jour (les dates manquantes restent manquantes)
+def jours_depuis_epoque(dates):
+    return (pd.to_datetime(dates) - EPOQUE).dt.days
+
+# Fonction pour convertir des numéros de jour (éventuellement fractionnaires) en dates
+def dates_depuis_jours(jours):
+    return EPOQUE + pd.to_timedelta(np.round(np.asarray(jours, dtype=float)), unit='D')
+
+# Fonction pour calculer les dates de dépôt moyenne, médiane et quartiles de chaque type de document dans chaque lot, en une passe groupée
+def statistiques_sequences(donnees, colonne_lot='LOT', colonne_type='TYPE DE DOCUMENT', colonne_date='Date dépôt GED'):
+    jours = pd.DataFrame({
+        'Lot': donnees[colonne_lot].to_numpy(),
+        'Type de Document': donnees[colonne_type].to_numpy(),
+        'Jour': jours_depuis_epoque(donnees[colonne_date]).to_numpy()
+    }).dropna()
+    groupes = jours.groupby(['Lot', 'Type de Document'])['Jour']
+    statistiques = groupes.agg(['size', 'mean', 'min', 'max']).rename(columns={
+        'size': 'Nombre de dépôts', 'mean': 'Moyenne', 'min': 'Premier dépôt', 'max': 'Dernier dépôt'
+    })
+    quantiles = groupes.quantile(list(QUANTILES.values())).unstack()
+    quantiles.columns = list(QUANTILES)
+    statistiques = statistiques.join(quantiles)
+
+    # Position de la médiane dans la durée du lot (0 = premier dépôt du lot, 1 = dernier) et rang de diffusion dans le lot
+    bornes = jours.groupby('Lot')['Jour'].agg(['min', 'max']).reindex(statistiques.index.get_level_values('Lot'))
+    duree = (bornes['max'] - bornes['min']).to_numpy()
+    statistiques['Position relative'] = np.where(duree > 0, (statistiques['Médiane'].to_numpy() - bornes['min'].to_numpy()) / np.where(duree > 0, duree, 1), 0.0)
+    statistiques['Rang de diffusion'] = statistiques.groupby(level='Lot')['Médiane'].rank(method='min').astype('int64')
+    return statistiques.reset_index()
+
+# Fonction pour calculer les statistiques de séquence (mis en cache par empreinte, les données ne sont pas hachées)
+@st.cache_data(show_spinner=False)
+def _calculer_sequences(empreinte, _donnees, colonne_lot, colonne_type, colonne_date):
+    return statistiques_sequences(_donnees, colonne_lot, colonne_type, colonne_date)
+
+# Fonction pour obtenir les statistiques de séquence de tous les lots d'un projet
+def calculer_sequences(donnees, colonne_lot='LOT', colonne_type='TYPE DE DOCUMENT', colonne_date='Date dépôt GED'):
+    empreinte = empreinte_colonnes(donnees, [colonne_lot, colonne_type, colonne_date])
+    return _calculer_sequences(empreinte, donnees, colonne_lot, colonne_type, colonne_date)
+
+# Fonction pour construire la séquence moyenne d'un lot (dates moyenne, médiane et quartiles de chaque type)
+def sequence_lot(sequences, lot):
+    sequence = sequences[sequences['Lot'] == lot].sort_values('Moyenne')
+    resultat = pd.DataFrame({'Type de Document': sequence['Type de Document'].to_numpy()})
+    resultat['Date Moyenne de Dépôt GED'] = dates_depuis_jours(sequence['Moyenne'])
+    for nom in QUANTILES:
+        resultat[nom] = dates_depuis_jours(sequence[nom])
+    resultat['Nombre de dépôts'] = sequence['Nombre de dépôts'].to_numpy()
+    return resultat
+
+# Fonction pour comparer l'ordre de diffusion des types de document entre lots
+# (position relative de la médiane de chaque type dans son lot ; ordre type = médiane de ces positions)
+def ordre_type_diffusion(sequences, nb_min_lots=1):
+    positions = sequences.pivot_table(index='Type de Document', columns='Lot', values='Position relative')
+    resume = pd.DataFrame({
+        'Position type': positions.median(axis=1),
+        'Dispersion entre lots': positions.quantile(0.75, axis=1) - positions.quantile(0.25, axis=1),
+        'Nombre de lots': positions.notna().sum(axis=1)
+    })
+    resume = resume[resume['Nombre de lots'] >= nb_min_lots].sort_values('Position type')
+    resume['Ordre type'] = np.arange(1, len(resume) + 1)
+    return positions.loc[resume.index], resume.reset_index()
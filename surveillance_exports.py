@@ -0,0 +1,54 @@
+import os
+import threading
+from donnees_ged import ACTUALISATION, actualiser_projet, signature_fichier
+from pipeline_documents import chemins_derives, materialiser_projet, nom_projet
+
+# Intervalle entre deux vérifications des exports surveillés, en secondes
+INTERVALLE_SURVEILLANCE = 30
+
+# État du fil de surveillance, unique dans le processus : exports surveillés, dernière signature vue, erreurs de relecture
+SURVEILLANCE = {'fil': None, 'chemins': set(), 'signatures': {}, 'erreurs': {}, 'reveil': threading.Event()}
+_verrou = threading.Lock()
+
+# Fonction pour actualiser un export modifié : version partagée des données (si elle est en mémoire)
+# puis jeux dérivés Parquet (si déjà matérialisés, seuls les documents touchés sont resynthétisés)
+def actualiser_export(chemin_fichier):
+    actualiser_projet(chemin_fichier)
+    if os.path.exists(chemins_derives(nom_projet(chemin_fichier))['manifeste']):
+        materialiser_projet(chemin_fichier)
+
+# Fonction pour vérifier une fois les exports surveillés et actualiser ceux dont la signature a changé
+def verifier_exports():
+    with _verrou:
+        chemins = sorted(SURVEILLANCE['chemins'])
+    for chemin in chemins:
+        try:
+            signature = signature_fichier(chemin)
+        except FileNotFoundError:
+            continue
+        if SURVEILLANCE['signatures'].get(chemin) == signature:
+            continue
+        try:
+            actualiser_export(chemin)
+        except Exception as erreur:
+            # Export illisible (en cours d'écriture par exemple) : l'ancienne version reste servie, nouvel essai au prochain passage
+            SURVEILLANCE['erreurs'][chemin] = str(erreur)
+            continue
+        SURVEILLANCE['erreurs'].pop(chemin, None)
+        SURVEILLANCE['signatures'][chemin] = signature
+
+# Fonction exécutée par le fil de surveillance : vérification périodique, ou immédiate quand une relance signale un export modifié
+def _surveiller(intervalle):
+    while True:
+        verifier_exports()
+        SURVEILLANCE['reveil'].wait(intervalle)
+        SURVEILLANCE['reveil'].clear()
+
+# Fonction pour ajouter des exports à la surveillance, le fil étant démarré au premier appel dans le processus
+def surveiller(chemins, intervalle=INTERVALLE_SURVEILLANCE):
+    with _verrou:
+        SURVEILLANCE['chemins'].update(chemins)
+        if SURVEILLANCE['fil'] is None:
+            ACTUALISATION['reveil'] = SURVEILLANCE['reveil']
+            SURVEILLANCE['fil'] = threading.Thread(target=_surveiller, args=(intervalle,), name='surveillance_exports', daemon=True)
+            SURVEILLANCE['fil'].start()
@@ -0,0 +1,144 @@
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+from api_ged import publier_fichier
+
+# Nombre de lignes converties et écrites à la fois : la mémoire utilisée ne dépend pas de la taille du tableau
+TAILLE_BLOC_TELECHARGEMENT = 20000
+
+# Formats proposés : extension et type de contenu du fichier
+FORMATS_TELECHARGEMENT = {
+    'CSV': ('.csv', 'text/csv'),
+    'Parquet': ('.parquet', 'application/vnd.apache.parquet'),
+    'XLSX': ('.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+}
+
+# Nombre maximal de lignes d'une feuille Excel (en-tête compris)
+NB_LIGNES_MAX_XLSX = 1048576
+
+# Dossier des fichiers préparés, et durée après laquelle un fichier abandonné est supprimé
+DOSSIER_TELECHARGEMENTS = os.path.join(tempfile.gettempdir(), 'ged_telechargements')
+DUREE_CONSERVATION = 3600
+
+# Fonction pour parcourir un tableau (ou les lignes d'un tableau aux positions données) par blocs de lignes
+# (une vue vide donne un bloc vide : le fichier garde ses en-têtes)
+def blocs_tableau(tableau, positions=None, taille_bloc=TAILLE_BLOC_TELECHARGEMENT):
+    positions = np.arange(len(tableau)) if positions is None else positions
+    for debut in range(0, max(len(positions), 1), taille_bloc):
+        yield tableau.iloc[positions[debut:debut + taille_bloc]]
+
+# Fonction pour écrire les blocs en CSV (séparateur ;, encodage lu par Excel)
+def ecrire_csv(blocs, chemin_fichier):
+    with open(chemin_fichier, 'w', encoding='utf-8-sig', newline='') as sortie:
+        for numero, bloc in enumerate(blocs):
+            bloc.to_csv(sortie, sep=';', index=False, header=numero == 0, date_format='%d/%m/%Y')
+
+# Fonction pour préparer un bloc pour Arrow : les colonnes texte de types mélangés sont écrites en texte
+def _bloc_arrow(bloc):
+    colonnes = {colonne: bloc[colonne].astype(str).where(bloc[colonne].notna(), None)
+                for colonne in bloc.columns if bloc[colonne].dtype == object}
+    return bloc.assign(**colonnes) if colonnes else bloc
+
+# Fonction pour écrire les blocs en Parquet (un groupe de lignes par bloc, schéma fixé par le premier bloc)
+def ecrire_parquet(blocs, chemin_fichier):
+    ecrivain = None
+    try:
+        for bloc in blocs:
+            bloc = _bloc_arrow(bloc)
+            if ecrivain is None:
+                schema = pa.Schema.from_pandas(bloc, preserve_index=False)
+                # Les colonnes entièrement vides du premier bloc sont typées en texte
+                schema = pa.schema([champ.with_type(pa.string()) if pa.types.is_null(champ.type) else champ for champ in schema])
+                ecrivain = pq.ParquetWriter(chemin_fichier, schema)
+            ecrivain.write_table(pa.Table.from_pandas(bloc, schema=schema, preserve_index=False))
+    finally:
+        if ecrivain is not None:
+            ecrivain.close()
+
+# Fonction pour écrire les blocs en XLSX en mémoire constante (chaque ligne est écrite sur disque dès qu'elle est complète)
+def ecrire_xlsx(blocs, chemin_fichier):
+    import xlsxwriter
+
+    classeur = xlsxwriter.Workbook(chemin_fichier, {'constant_memory': True, 'nan_inf_to_errors': True, 'default_date_format': 'dd/mm/yyyy'})
+    feuille = classeur.add_worksheet()
+    try:
+        ligne = 0
+        for bloc in blocs:
+            if ligne == 0:
+                feuille.write_row(0, 0, [str(colonne) for colonne in bloc.columns])
+                ligne = 1
+            for valeurs in bloc.astype(object).where(bloc.notna(), None).itertuples(index=False):
+                feuille.write_row(ligne, 0, [valeur if valeur is None or isinstance(valeur, (int, float, pd.Timestamp)) else str(valeur) for valeur in valeurs])
+                ligne += 1
+    finally:
+        classeur.close()
+
+# Écrivains de chaque format
+ECRIVAINS = {'CSV': ecrire_csv, 'Parquet': ecrire_parquet, 'XLSX': ecrire_xlsx}
+
+# Fonction pour supprimer les fichiers préparés abandonnés (sessions fermées sans nouvelle préparation)
+def purger_telechargements(dossier=DOSSIER_TELECHARGEMENTS, duree_conservation=DUREE_CONSERVATION):
+    if not os.path.isdir(dossier):
+        return
+    limite = time.time() - duree_conservation
+    for nom in os.listdir(dossier):
+        chemin = os.path.join(dossier, nom)
+        try:
+            if os.path.getmtime(chemin) < limite:
+                os.remove(chemin)
+        except OSError:
+            pass
+
+# Fonction pour écrire un tableau (ou les lignes aux positions données) dans un fichier temporaire au format demandé
+def ecrire_telechargement(tableau, format_fichier, positions=None, dossier=DOSSIER_TELECHARGEMENTS):
+    nb_lignes = len(tableau) if positions is None else len(positions)
+    if format_fichier == 'XLSX' and nb_lignes >= NB_LIGNES_MAX_XLSX:
+        raise ValueError(f"{nb_lignes} lignes : une feuille Excel en contient au plus {NB_LIGNES_MAX_XLSX - 1}, choisissez CSV ou Parquet.")
+    os.makedirs(dossier, exist_ok=True)
+    descripteur, chemin = tempfile.mkstemp(suffix=FORMATS_TELECHARGEMENT[format_fichier][0], dir=dossier)
+    os.close(descripteur)
+    try:
+        ECRIVAINS[format_fichier](blocs_tableau(tableau, positions), chemin)
+    except Exception:
+        os.remove(chemin)
+        raise
+    return chemin
+
+# Fonction pour afficher le téléchargement d'un tableau : le fichier n'est écrit qu'à la demande, puis servi depuis le disque
+# par l'API locale (lien vers le fichier, jamais chargé dans Streamlit) tant que la vue téléchargée (état des filtres et du tri) ne change pas
+def afficher_telechargement(tableau, cle, nom_fichier, positions=None, etat_vue=None):
+    nb_lignes = len(tableau) if positions is None else len(positions)
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        format_fichier = st.selectbox('Format', list(FORMATS_TELECHARGEMENT), key=f'{cle}_format', label_visibility='collapsed')
+    vue = (format_fichier, nb_lignes, etat_vue)
+    prepare = st.session_state.get(f'{cle}_telechargement')
+    with col2:
+        if st.button(f'Préparer ({nb_lignes} lignes)', key=f'{cle}_preparer'):
+            purger_telechargements()
+            if prepare is not None and os.path.exists(prepare['chemin']):
+                os.remove(prepare['chemin'])
+            try:
+                with st.spinner('Écriture du fichier...'):
+                    chemin = ecrire_telechargement(tableau, format_fichier, positions)
+                extension, type_contenu = FORMATS_TELECHARGEMENT[format_fichier]
+                prepare = {'chemin': chemin, 'vue': vue, 'lien': publier_fichier(chemin, f'{nom_fichier}{extension}', type_contenu)}
+            except ValueError as erreur:
+                prepare = None
+                st.error(str(erreur))
+            st.session_state[f'{cle}_telechargement'] = prepare
+    with col3:
+        if prepare is not None and prepare['vue'] == vue and os.path.exists(prepare['chemin']):
+            extension, type_contenu = FORMATS_TELECHARGEMENT[format_fichier]
+            if prepare['lien'] is not None:
+                st.link_button(f'Télécharger {nom_fichier}{extension}', prepare['lien'])
+            else:
+                # API non démarrée dans ce processus (port occupé) : le fichier passe par Streamlit, qui le garde en mémoire
+                with open(prepare['chemin'], 'rb') as fichier:
+                    st.download_button(f'Télécharger {nom_fichier}{extension}', fichier, file_name=f'{nom_fichier}{extension}',
+                                       mime=type_contenu, key=f'{cle}_telecharger')
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from anomalies_depots import ALPHA, CLES_SERIE, compter_depots_journaliers, creer_etat_anomalies, detecter_anomalies_comptes, integrer_comptes
+
+
+# Fonction pour tirer des dépôts journaliers de trois lots, avec quelques pics de dépôts
+def tirer_depots():
+    generateur = np.random.default_rng(0)
+    lots = generateur.choice(['GROS OEUVRE', 'ELECTRICITE', 'PLOMBERIE'], size=600)
+    jours = generateur.integers(19000, 19120, size=600)
+    pics = np.repeat(['ELECTRICITE', 'GROS OEUVRE'], 25), np.repeat([19050, 19100], 25)
+    return np.r_[lots, pics[0]], np.r_[jours, pics[1]]
+
+
+# Fonction pour compter les dépôts jusqu'à un jour donné
+def compter(lots, jours, jusqua):
+    garde = jours <= jusqua
+    return compter_depots_journaliers('LOT', lots[garde], jours[garde])
+
+
+# Fonction pour ordonner les anomalies retenues avant comparaison
+def trier(anomalies):
+    return anomalies.sort_values(CLES_SERIE + ['Jour']).reset_index(drop=True)
+
+
+# Des comptes intégrés en trois exports donnent les mêmes anomalies et le même dernier état qu'un calcul complet
+def test_integration_incrementale_egale_calcul_complet():
+    lots, jours = tirer_depots()
+    etat = creer_etat_anomalies()
+    for jusqua in [19040, 19080, 19119]:
+        integrer_comptes(etat, compter(lots, jours, jusqua))
+    scores, statistiques = detecter_anomalies_comptes(compter(lots, jours, 19119))
+    assert etat['anomalies']['Anomalie'].all() and len(etat['anomalies']) > 0
+    assert_frame_equal(trier(etat['anomalies']), trier(scores[scores['Anomalie']]), check_dtype=False)
+    assert_frame_equal(etat['statistiques'].sort_index(), statistiques.sort_index(), check_dtype=False)
+
+
+# Un dépôt antidaté dans un jour déjà scoré fait rescorer son groupe depuis le premier jour
+def test_depot_antidate_rescore_le_groupe():
+    lots, jours = tirer_depots()
+    etat = creer_etat_anomalies()
+    integrer_comptes(etat, compter(lots, jours, 19080))
+    lots, jours = np.r_[lots, ['PLOMBERIE'] * 8], np.r_[jours, [19030] * 8]
+    integrer_comptes(etat, compter(lots, jours, 19119))
+    scores, statistiques = detecter_anomalies_comptes(compter(lots, jours, 19119))
+    assert_frame_equal(trier(etat['anomalies']), trier(scores[scores['Anomalie']]), check_dtype=False)
+    assert_frame_equal(etat['statistiques'].sort_index(), statistiques.sort_index(), check_dtype=False)
+
+
+# La moyenne reprise d'un export à l'autre est celle d'une EWMA pandas sur la série journalière complétée par des zéros
+def test_moyenne_reprise_egale_ewm_pandas():
+    lots, jours = tirer_depots()
+    etat = creer_etat_anomalies()
+    for jusqua in [19040, 19119]:
+        integrer_comptes(etat, compter(lots, jours, jusqua))
+    for lot in ['GROS OEUVRE', 'ELECTRICITE', 'PLOMBERIE']:
+        serie = pd.Series(jours[lots == lot]).value_counts()
+        serie = serie.reindex(range(serie.index.min(), 19120), fill_value=0).astype(float)
+        attendu = serie.ewm(alpha=ALPHA, adjust=False).mean().iloc[-1]
+        assert np.isclose(etat['statistiques'].loc[('LOT', lot), 'Moyenne'], attendu)
@@ -0,0 +1,44 @@
+import itertools
+import numpy as np
+from clusters_depots import part_expliquee, phases_segmentation, segmenter_jours
+
+
+# Fonction pour calculer l'inertie d'un découpage des jours distincts en phases contiguës (chaque jour pesé par ses dépôts)
+def inertie(valeurs, poids, phases):
+    total = 0.0
+    for phase in np.unique(phases):
+        x, w = valeurs[phases == phase], poids[phases == phase]
+        total += (w * (x - np.average(x, weights=w)) ** 2).sum()
+    return total
+
+
+# Fonction pour trouver l'inertie minimale en k phases en essayant toutes les coupures possibles
+def inertie_force_brute(valeurs, poids, k):
+    meilleure = np.inf
+    for coupures in itertools.combinations(range(1, len(valeurs)), k - 1):
+        phases = np.searchsorted(coupures, np.arange(len(valeurs)), side='right')
+        meilleure = min(meilleure, inertie(valeurs, poids, phases))
+    return meilleure
+
+
+# Le k-means exact par programmation dynamique trouve l'inertie minimale de la recherche exhaustive, pour chaque k
+def test_segmentation_egale_force_brute():
+    generateur = np.random.default_rng(3)
+    for _ in range(5):
+        jours = generateur.choice(generateur.integers(19000, 19200, size=9), size=25)
+        segmentation = segmenter_jours(jours, k_max=5)
+        valeurs, poids = np.unique(jours, return_counts=True)
+        for k in range(1, len(segmentation['couts']) + 1):
+            attendue = inertie_force_brute(valeurs, poids, k)
+            assert np.isclose(segmentation['couts'][k - 1], attendue)
+            # Les phases renvoyées réalisent ce découpage optimal
+            assert np.isclose(inertie(valeurs, poids, phases_segmentation(segmentation, k)), attendue)
+        assert np.isclose(part_expliquee(segmentation)[0], 0) and (np.diff(part_expliquee(segmentation)) >= -1e-12).all()
+
+
+# Une série plus courte que k_max donne autant de phases que de jours distincts, d'inertie nulle
+def test_moins_de_jours_que_de_phases():
+    segmentation = segmenter_jours([19000, 19000, 19010, 19030], k_max=8)
+    assert len(segmentation['couts']) == 3
+    assert segmentation['couts'][-1] == 0
+    assert list(phases_segmentation(segmentation, 8)) == [0, 1, 2]
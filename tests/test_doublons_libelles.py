@@ -0,0 +1,22 @@
+import pandas as pd
+from doublons_libelles import cle_document, regrouper_textes
+
+
+# Un libellé sans caractère ASCII en dernière position ne fait pas échouer le calcul des signatures
+def test_libelle_non_ascii_en_dernier():
+    donnees = pd.DataFrame({'Libellé du document': ['PLAN-0009-A _BAT.pdf', '€'], 'INDICE': ['A', 'A']})
+    cles = cle_document(donnees)
+    assert list(cles) == ['PLAN-0009-A _BAT.pdf', '€']
+
+
+# Un libellé sans caractère ASCII au milieu n'est pas rattaché au libellé suivant
+def test_libelle_non_ascii_au_milieu():
+    donnees = pd.DataFrame({'Libellé du document': ['PLAN-0009-A', '€', 'PLAN', 'PLAN'], 'INDICE': [None, None, None, None]})
+    cles = cle_document(donnees)
+    assert list(cles) == ['PLAN-0009-A', '€', 'PLAN', 'PLAN']
+
+
+# Les textes trop courts pour former un fragment restent chacun dans leur propre groupe
+def test_textes_courts_isoles():
+    groupes = regrouper_textes(['€', 'plan a', '', 'ab'], ['', '', '', ''])
+    assert len(set(groupes)) == 4
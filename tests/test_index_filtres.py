@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from index_filtres import compter_combinaisons, construire_index_filtres, filtrer_positions, restreindre_index
+
+
+# Fonction pour tirer des dépôts avec des valeurs manquantes dans les colonnes filtrables
+def tirer_depots(nb_lignes=203):
+    generateur = np.random.default_rng(1)
+    return pd.DataFrame({
+        'LOT': generateur.choice(['GROS OEUVRE', 'ELECTRICITE', 'PLOMBERIE', None], size=nb_lignes),
+        'TYPE DE DOCUMENT': generateur.choice(['PLN', 'NOT', 'SCH'], size=nb_lignes),
+        'INDICE': generateur.choice(['0', 'A', 'B', None], size=nb_lignes),
+        'EMET': generateur.choice(['ARCHI', 'BET'], size=nb_lignes)
+    })
+
+
+# Fonction pour filtrer des dépôts avec des masques isin (union dans une colonne, intersection entre colonnes)
+def masque_isin(donnees, filtres):
+    masque = np.ones(len(donnees), dtype=bool)
+    for colonne, valeurs in filtres.items():
+        if valeurs:
+            masque &= donnees[colonne].isin(valeurs).to_numpy()
+    return masque
+
+
+FILTRES = [
+    {},
+    {'LOT': ['GROS OEUVRE']},
+    {'LOT': ['GROS OEUVRE', 'PLOMBERIE'], 'INDICE': ['A']},
+    {'LOT': [], 'TYPE DE DOCUMENT': ['NOT', 'SCH'], 'EMET': ['BET']},
+    {'LOT': ['INCONNU']},
+]
+
+
+# Les positions lues dans les ensembles de bits sont celles des masques isin, sur tout le projet et sur une tranche de lignes
+def test_positions_egales_masques_isin():
+    donnees = tirer_depots()
+    index = construire_index_filtres(donnees)
+    for debut, fin in [(0, len(donnees)), (13, 150), (9, 9)]:
+        restreint = restreindre_index(index, debut, fin)
+        tranche = donnees.iloc[debut:fin]
+        for filtres in FILTRES:
+            np.testing.assert_array_equal(filtrer_positions(restreint, filtres), np.flatnonzero(masque_isin(tranche, filtres)))
+
+
+# Une tranche d'une tranche donne les mêmes positions qu'une restriction directe
+def test_restriction_imbriquee():
+    donnees = tirer_depots()
+    index = construire_index_filtres(donnees)
+    imbrique = restreindre_index(restreindre_index(index, 20, 180), 5, 100)
+    direct = restreindre_index(index, 25, 120)
+    for filtres in FILTRES:
+        np.testing.assert_array_equal(filtrer_positions(imbrique, filtres), filtrer_positions(direct, filtres))
+
+
+# Les comptes par combinaison sont ceux d'un groupby().size() sur les lignes sélectionnées
+def test_comptes_egaux_groupby():
+    donnees = tirer_depots()
+    restreint = restreindre_index(construire_index_filtres(donnees), 13, 150)
+    tranche = donnees.iloc[13:150]
+    for colonnes in [['LOT'], ['LOT', 'INDICE'], ['TYPE DE DOCUMENT', 'EMET', 'INDICE']]:
+        for filtres in FILTRES[:3]:
+            positions = filtrer_positions(restreint, filtres)
+            attendu = tranche.iloc[positions].groupby(colonnes).size().rename('Nombre de documents').reset_index()
+            assert_frame_equal(compter_combinaisons(restreint, colonnes, positions), attendu, check_dtype=False)
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+from donnees_ged import depots_lot_periode
+from index_filtres import construire_index_filtres
+from index_temporel import jours_tries, tranche_periode
+
+
+# Fonction pour tirer des dépôts triés par date, les dépôts sans date en fin de tableau
+def tirer_depots():
+    generateur = np.random.default_rng(2)
+    dates = pd.Timestamp('2024-01-01') + pd.to_timedelta(generateur.integers(0, 120, size=300), unit='D')
+    donnees = pd.DataFrame({
+        'Date dépôt GED': pd.Series(dates).where(generateur.random(300) > 0.05),
+        'LOT': generateur.choice(['GROS OEUVRE', 'ELECTRICITE', 'PLOMBERIE'], size=300)
+    })
+    return donnees.sort_values('Date dépôt GED', na_position='last', kind='mergesort').reset_index(drop=True)
+
+
+PERIODES = [
+    (None, None),
+    (pd.Timestamp('2024-02-01'), pd.Timestamp('2024-02-29')),
+    (pd.Timestamp('2023-06-01'), pd.Timestamp('2024-01-10')),
+    (pd.Timestamp('2024-03-15'), None),
+    (None, pd.Timestamp('2024-01-01')),
+    (pd.Timestamp('2024-06-01'), pd.Timestamp('2024-07-01')),
+    (pd.Timestamp('2024-02-10'), pd.Timestamp('2024-02-01')),
+]
+
+
+# Fonction pour sélectionner les dépôts datés d'une période par un masque booléen (bornes incluses)
+def masque_periode(donnees, debut, fin):
+    dates = donnees['Date dépôt GED']
+    masque = dates.notna()
+    if debut is not None:
+        masque &= dates >= debut
+    if fin is not None:
+        masque &= dates <= fin
+    return masque.to_numpy()
+
+
+# La tranche trouvée par recherche dichotomique couvre exactement les lignes du masque de dates
+def test_tranche_egale_masque_dates():
+    donnees = tirer_depots()
+    jours = jours_tries(donnees['Date dépôt GED'])
+    for debut, fin in PERIODES:
+        premiere, derniere = tranche_periode(jours, debut, fin)
+        np.testing.assert_array_equal(np.arange(premiere, derniere), np.flatnonzero(masque_periode(donnees, debut, fin)))
+
+
+# Les dépôts d'un lot sur une période sont ceux d'un filtrage par masques
+def test_depots_lot_periode_egaux_masques():
+    donnees = tirer_depots()
+    index = construire_index_filtres(donnees)
+    jours = jours_tries(donnees['Date dépôt GED'])
+    for debut, fin in PERIODES:
+        tranche = tranche_periode(jours, debut, fin)
+        for lot in ['GROS OEUVRE', 'PLOMBERIE', 'INCONNU']:
+            attendu = donnees[masque_periode(donnees, debut, fin) & (donnees['LOT'] == lot).to_numpy()]
+            pd.testing.assert_frame_equal(depots_lot_periode(donnees, index, lot, tranche), attendu)
@@ -0,0 +1,70 @@
+import os
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from moteur_alertes import CLES_GROUPE, calculer_alertes_projets, etat_alertes_projet
+from regles_alertes import charger_regles
+
+REGLES = charger_regles(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'regles_alertes.json'))
+
+
+# Fonction pour construire des dépôts au format d'un export GED (un visa par dépôt)
+def depots(lignes):
+    return pd.DataFrame(lignes, columns=['LOT', 'TYPE DE DOCUMENT', 'INDICE', 'Libellé du document', 'Date dépôt GED', 'Date demande visaMOE', 'VisaMOE'])
+
+
+# Fonction pour écrire un export et lui donner une date de modification distincte de la précédente
+def ecrire_export(donnees, chemin, date_modification):
+    donnees.to_csv(chemin, sep=';', index=False, encoding='iso-8859-1')
+    os.utime(chemin, (date_modification, date_modification))
+
+
+# Premier export : deux lots, plusieurs indices, des visas rendus et en retard
+PREMIER = depots([
+    ['GROS OEUVRE', 'PLAN', '0', 'PLAN 1', '02/01/2024', '03/01/2024', '5'],
+    ['GROS OEUVRE', 'PLAN', 'A', 'PLAN 1', '09/01/2024', '10/01/2024', '-2'],
+    ['GROS OEUVRE', 'NOTE', '0', 'NOTE 1', '15/01/2024', None, None],
+    ['ELECTRICITE', 'PLAN', '0', 'PLAN 2', '16/01/2024', '17/01/2024', '-1'],
+    ['ELECTRICITE', 'PLAN', 'A', 'PLAN 2', '25/01/2024', None, None],
+    ['ELECTRICITE', 'PLAN', 'B', 'PLAN 2', '01/02/2024', '02/02/2024', '3'],
+])
+
+
+# Compare les alertes d'un projet intégré en deux exports avec celles de l'export complet intégré en une fois
+def verifier_parite(projet, ajouts, tmp_path):
+    chemin_incremental = str(tmp_path / f'{projet}.csv')
+    ecrire_export(PREMIER, chemin_incremental, 1_700_000_000)
+    calculer_alertes_projets({projet: chemin_incremental}, REGLES)
+    complet = pd.concat([PREMIER, ajouts], ignore_index=True)
+    ecrire_export(complet, chemin_incremental, 1_700_000_100)
+    incremental = calculer_alertes_projets({projet: chemin_incremental}, REGLES)
+    # Seuls les dépôts postérieurs au dernier jour intégré sont repris
+    assert etat_alertes_projet(projet)['derniere_actualisation'][0] < len(complet)
+
+    chemin_complet = str(tmp_path / f'{projet}_COMPLET.csv')
+    ecrire_export(complet, chemin_complet, 1_700_000_000)
+    reference = calculer_alertes_projets({f'{projet}_COMPLET': chemin_complet}, REGLES)
+
+    colonnes = [colonne for colonne in reference.columns if colonne != 'Projet']
+    incremental = incremental.sort_values(CLES_GROUPE[1:]).reset_index(drop=True)[colonnes]
+    reference = reference.sort_values(CLES_GROUPE[1:]).reset_index(drop=True)[colonnes]
+    assert_frame_equal(incremental, reference, check_dtype=False)
+
+
+# Les dépôts d'un nouvel export créent un lot absent du premier export
+def test_parite_nouveau_groupe(tmp_path):
+    ajouts = depots([
+        ['PLOMBERIE', 'PLAN', '0', 'PLAN 3', '05/02/2024', '06/02/2024', '-4'],
+        ['PLOMBERIE', 'NOTE', '0', 'NOTE 3', '06/02/2024', None, None],
+        ['GROS OEUVRE', 'PLAN', 'B', 'PLAN 1', '07/02/2024', None, None],
+    ])
+    verifier_parite('PARITE_NOUVEAU', ajouts, tmp_path)
+
+
+# Les dépôts d'un nouvel export tombent la même semaine (et le même jour) que les derniers dépôts déjà intégrés
+def test_parite_meme_semaine(tmp_path):
+    ajouts = depots([
+        ['ELECTRICITE', 'PLAN', 'B', 'PLAN 2', '01/02/2024', '02/02/2024', '-1'],
+        ['ELECTRICITE', 'NOTE', '0', 'NOTE 2', '02/02/2024', None, None],
+        ['GROS OEUVRE', 'NOTE', 'A', 'NOTE 1', '31/01/2024', None, None],
+    ])
+    verifier_parite('PARITE_SEMAINE', ajouts, tmp_path)
@@ -0,0 +1,66 @@
+import json
+import os
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from pipeline_documents import CATEGORIE_PAR_TYPE, CATEGORIE_DEFAUT, materialiser_projet
+
+COLONNES = ['LOT', 'LOT1', 'NIVEAU', 'ZONE', 'TYPE DE DOCUMENT', 'INDICE', 'Libellé du document', 'Dernier indice', 'Date dépôt GED']
+
+# Premier export : trois documents, dont un déposé deux fois au même indice
+PREMIER = [
+    ['GROS OEUVRE', '01', 'R+1', 'A', 'PLN', '0', 'PLAN 1', 'A', '02/01/2024'],
+    ['GROS OEUVRE', '01', 'R+1', 'A', 'PLN', 'A', 'PLAN 1', 'A', '09/01/2024'],
+    ['GROS OEUVRE', '01', 'R+1', 'A', 'NOT', '0', 'NOTE 1', '0', '15/01/2024'],
+    ['ELECTRICITE', '02', 'R+2', 'B', 'XYZ', '0', 'DIVERS 2', '0', '16/01/2024'],
+    ['ELECTRICITE', '02', 'R+2', 'B', 'XYZ', '0', 'DIVERS 2', '0', '16/01/2024'],
+]
+
+
+# Fonction pour écrire un export brut avec une date de modification donnée
+def ecrire_export(lignes, chemin, date_modification):
+    pd.DataFrame(lignes, columns=COLONNES).to_csv(chemin, sep=';', index=False, encoding='iso-8859-1')
+    os.utime(chemin, (date_modification, date_modification))
+
+
+# Fonction pour synthétiser un export par document directement en pandas
+def synthese_pandas(chemin):
+    export = pd.read_csv(chemin, encoding='iso-8859-1', sep=';', dtype=str)
+    export['Date dépôt GED'] = pd.to_datetime(export['Date dépôt GED'], format='%d/%m/%Y')
+    export['Categ_Docs'] = export['TYPE DE DOCUMENT'].map(CATEGORIE_PAR_TYPE).fillna(CATEGORIE_DEFAUT)
+    groupes = export.rename(columns={'LOT': 'desc_lot'}).groupby(['TYPE DE DOCUMENT', 'Categ_Docs', 'desc_lot', 'Libellé du document'])
+    synthese = pd.DataFrame({
+        'min': groupes['Date dépôt GED'].min(),
+        'max': groupes['Date dépôt GED'].max(),
+        'Nombre d\'indices': groupes['INDICE'].nunique(),
+        'Indices utilisés': groupes['INDICE'].agg(lambda indices: ', '.join(sorted(set(indices))))
+    })
+    synthese.insert(2, 'Différence en jours', (synthese['max'] - synthese['min']).dt.days)
+    return synthese.reset_index()
+
+
+# Un export modifié (dépôts ajoutés, document créé, doublon retiré) ne resynthétise que les documents touchés,
+# et la synthèse obtenue est celle d'un recalcul complet
+def test_reconstruction_par_manifeste(tmp_path):
+    chemin = str(tmp_path / 'PROJET.csv')
+    dossier = str(tmp_path / 'derives')
+    ecrire_export(PREMIER, chemin, 1_700_000_000)
+    _, nb_documents = materialiser_projet(chemin, dossier)
+    assert nb_documents == 3
+    assert materialiser_projet(chemin, dossier)[1] == 0
+
+    second = PREMIER[:4] + [
+        ['GROS OEUVRE', '01', 'R+1', 'A', 'PLN', 'B', 'PLAN 1', 'B', '01/02/2024'],
+        ['PLOMBERIE', '03', 'RDC', 'C', 'SCH', '0', 'SCHEMA 3', '0', '05/02/2024'],
+    ]
+    ecrire_export(second, chemin, 1_700_000_100)
+    chemins, nb_documents = materialiser_projet(chemin, dossier)
+    assert nb_documents == 3
+    with open(chemins['manifeste'], encoding='utf-8') as fichier:
+        assert json.load(fichier)['nb_depots'] == len(second)
+
+    regroupe = pd.read_parquet(chemins['regroupe'])
+    reference = pd.read_parquet(materialiser_projet(chemin, str(tmp_path / 'complet'), forcer=True)[0]['regroupe'])
+    assert_frame_equal(regroupe, reference)
+    attendu = synthese_pandas(chemin)
+    assert_frame_equal(regroupe[attendu.columns].sort_values('Libellé du document').reset_index(drop=True),
+                       attendu.sort_values('Libellé du document').reset_index(drop=True), check_dtype=False)
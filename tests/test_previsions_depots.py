@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+from previsions_depots import HORIZON_MAX, premieres_semaines, prevoir_depots
+
+
+# Fonction pour tirer des dépôts quotidiens entre deux dates
+def tirer_depots(debut, fin, graine):
+    generateur = np.random.default_rng(graine)
+    jours = pd.date_range(debut, fin, freq='D')
+    return pd.DataFrame({
+        'Date dépôt GED': generateur.choice(jours, size=400),
+        'LOT': generateur.choice(['GROS OEUVRE', 'ELECTRICITE'], size=400),
+        'TYPE DE DOCUMENT': generateur.choice(['PLN', 'NOT'], size=400)
+    })
+
+
+# Les semaines de l'historique et de la prévision sont datées du lundi, la prévision suit la dernière semaine de dépôts
+def test_semaines_datees_du_lundi():
+    # Le dernier dépôt tombe un dimanche : sa semaine commence le lundi 6 mai 2024
+    previsions, historique = prevoir_depots(tirer_depots('2024-01-03', '2024-05-12', 3))
+    assert (historique['Semaine'].dt.dayofweek == 0).all()
+    assert (previsions['Semaine'].dt.dayofweek == 0).all()
+    assert historique['Semaine'].max() == pd.Timestamp('2024-05-06')
+    assert previsions['Semaine'].min() == pd.Timestamp('2024-05-13')
+    assert previsions.groupby(['Lot', 'Type de Document']).size().eq(HORIZON_MAX).all()
+
+
+# L'horizon est compté depuis la dernière semaine de chaque projet, même quand les projets s'arrêtent à des semaines différentes
+def test_horizon_par_projet():
+    previsions = pd.concat([
+        prevoir_depots(tirer_depots('2024-01-03', '2024-05-12', 4))[0].assign(Projet='A'),
+        prevoir_depots(tirer_depots('2024-02-01', '2024-07-17', 5))[0].assign(Projet='B')
+    ], ignore_index=True)
+    coupees = premieres_semaines(previsions, 4)
+    for projet, attendues in [('A', pd.date_range('2024-05-13', periods=4, freq='W-MON')), ('B', pd.date_range('2024-07-22', periods=4, freq='W-MON'))]:
+        semaines = coupees.loc[coupees['Projet'] == projet]
+        assert list(np.sort(semaines['Semaine'].unique())) == list(attendues)
+        assert semaines.groupby(['Lot', 'Type de Document']).size().eq(4).all()